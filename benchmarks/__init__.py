@@ -0,0 +1 @@
+""" Benchmarks for soapy. Run each module from the root of the repository, e.g. python -m benchmarks.async_throughput """
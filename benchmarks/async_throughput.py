@@ -0,0 +1,49 @@
+""" Measures the throughput of AsyncClient calls at increasing concurrency against the local stub server of
+ benchmarks.stub, which answers each call after a fixed delay to simulate the latency of a real service. A
+ concurrency of 1 is equivalent to calling the operation sequentially. """
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.stub import StubServer
+from soapy.client import AsyncClient, Client
+
+
+def concurrent(location, calls, concurrency) -> float:
+    client = AsyncClient(Client("file://sample.wsdl", 0, "getBank"), concurrency=concurrency)
+    client.client.location = location
+
+    async def call(value):
+        inputs = client.inputs("getBank")
+        inputs[0].blz.value = value
+        return await client.call("getBank", *inputs)
+
+    async def gather():
+        return await asyncio.gather(*(call(str(i)) for i in range(calls)))
+
+    start = time.perf_counter()
+    try:
+        responses = asyncio.run(gather())
+    finally:
+        client.close()
+    elapsed = time.perf_counter() - start
+    assert all(responses), "Every call should succeed"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--delay", type=float, default=0.01, help="Stub server latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+    args = parser.parse_args()
+
+    with StubServer(delay=args.delay) as server:
+        for concurrency in args.concurrency:
+            elapsed = concurrent(server.location, args.calls, concurrency)
+            print("{0:<24}{1:>10.1f} calls/s".format("AsyncClient ({0})".format(concurrency), args.calls / elapsed))
+
+
+if __name__ == "__main__":
+    main()
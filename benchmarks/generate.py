@@ -0,0 +1,93 @@
+""" Generators of synthetic WSDL documents and responses for the benchmarks. The shape of a WSDL is set by a few
+ parameters, so each can be scaled on its own: the number of operations, the depth of nested complex types, the
+ width of their sequences, the size of an enumeration and whether a recursive type is used. """
+
+from xml.sax.saxutils import quoteattr
+
+TNS = "http://example.com/synthetic/"
+
+
+def wsdl(operations=1, depth=1, width=4, enums=0, recursive=False) -> str:
+
+    """ Return the text of a document/literal WSDL with the given number of operations, named op0, op1, ...
+
+    The input element of each operation holds a "node" of type Level0, which has width string fields and a "child"
+    of type Level1, and so on, depth levels deep. If enums is more than 0, the input also holds a "choice" element
+    with that many enumeration values, and if recursive is True, a "tree" of a type that contains itself. The output
+    element of each operation holds a "result" and any number of "item" elements, each with width fields. """
+
+    types = list()
+    for level in range(depth):
+        fields = ['<xsd:element name="field{0}" type="xsd:string"/>'.format(j) for j in range(width)]
+        if level < depth - 1:
+            fields.append('<xsd:element minOccurs="0" name="child" type="tns:Level{0}"/>'.format(level + 1))
+        types.append('<xsd:complexType name="Level{0}"><xsd:sequence>{1}</xsd:sequence></xsd:complexType>'
+                     .format(level, "".join(fields)))
+    types.append('<xsd:complexType name="Item"><xsd:sequence>{0}</xsd:sequence></xsd:complexType>'.format(
+        "".join('<xsd:element name="field{0}" type="xsd:string"/>'.format(j) for j in range(width))))
+    if enums:
+        types.append('<xsd:simpleType name="Choice"><xsd:restriction base="xsd:string">{0}</xsd:restriction>'
+                     '</xsd:simpleType>'.format("".join('<xsd:enumeration value="value{0}"/>'.format(j)
+                                                        for j in range(enums))))
+    if recursive:
+        types.append('<xsd:complexType name="Tree"><xsd:sequence>'
+                     '<xsd:element name="label" type="xsd:string"/>'
+                     '<xsd:element minOccurs="0" name="left" type="tns:Tree"/>'
+                     '<xsd:element minOccurs="0" name="right" type="tns:Tree"/>'
+                     '</xsd:sequence></xsd:complexType>')
+
+    inputs = ['<xsd:element name="node" type="tns:Level0"/>']
+    if enums:
+        inputs.append('<xsd:element name="choice" type="tns:Choice"/>')
+    if recursive:
+        inputs.append('<xsd:element minOccurs="0" name="tree" type="tns:Tree"/>')
+
+    elements = list()
+    messages = list()
+    port_operations = list()
+    binding_operations = list()
+    for i in range(operations):
+        name = "op{0}".format(i)
+        elements.append('<xsd:element name="{0}"><xsd:complexType><xsd:sequence>{1}</xsd:sequence>'
+                        '</xsd:complexType></xsd:element>'.format(name, "".join(inputs)))
+        elements.append('<xsd:element name="{0}Response"><xsd:complexType><xsd:sequence>'
+                        '<xsd:element name="result" type="xsd:string"/>'
+                        '<xsd:element minOccurs="0" maxOccurs="unbounded" name="item" type="tns:Item"/>'
+                        '</xsd:sequence></xsd:complexType></xsd:element>'.format(name))
+        messages.append('<wsdl:message name="{0}"><wsdl:part name="parameters" element="tns:{0}"/></wsdl:message>'
+                        '<wsdl:message name="{0}Response"><wsdl:part name="parameters" element="tns:{0}Response"/>'
+                        '</wsdl:message>'.format(name))
+        port_operations.append('<wsdl:operation name="{0}"><wsdl:input message="tns:{0}"/>'
+                               '<wsdl:output message="tns:{0}Response"/></wsdl:operation>'.format(name))
+        binding_operations.append('<wsdl:operation name="{0}"><soap:operation soapAction={1}/>'
+                                  '<wsdl:input><soap:body use="literal"/></wsdl:input>'
+                                  '<wsdl:output><soap:body use="literal"/></wsdl:output></wsdl:operation>'
+                                  .format(name, quoteattr(TNS + name)))
+
+    return """<?xml version="1.0"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/" xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+ xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/" xmlns:tns="{0}" targetNamespace="{0}">
+<wsdl:types><xsd:schema elementFormDefault="qualified" targetNamespace="{0}">
+{1}
+{2}
+</xsd:schema></wsdl:types>
+{3}
+<wsdl:portType name="SyntheticPortType">{4}</wsdl:portType>
+<wsdl:binding name="SyntheticBinding" type="tns:SyntheticPortType">
+<soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>{5}</wsdl:binding>
+<wsdl:service name="SyntheticService"><wsdl:port name="SyntheticPort" binding="tns:SyntheticBinding">
+<soap:address location="http://localhost/synthetic"/></wsdl:port></wsdl:service>
+</wsdl:definitions>""".format(TNS, "\n".join(types), "\n".join(elements), "\n".join(messages),
+                              "".join(port_operations), "".join(binding_operations))
+
+
+def response(operation="op0", width=4, items=100) -> bytes:
+
+    """ Return a SOAP response envelope for the operation of a WSDL from wsdl(), with the given number of items """
+
+    item = "<tns:item>{0}</tns:item>".format("".join("<tns:field{0}>value {0}</tns:field{0}>".format(j)
+                                                     for j in range(width)))
+    return """<?xml version="1.0" encoding="UTF-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"><soapenv:Body>
+<tns:{0}Response xmlns:tns="{1}"><tns:result>ok</tns:result>{2}</tns:{0}Response>
+</soapenv:Body></soapenv:Envelope>""".format(operation, TNS, item * items).encode("utf-8")
@@ -0,0 +1,96 @@
+""" Measures the construction time and the memory held by the input objects (soapy.inputs.Factory) of a request with
+ many elements, built from a synthetic WSDL (see benchmarks.generate) whose types have already been resolved, e.g.
+ python -m benchmarks.input_model --width 2000
+
+ Also measures cloning the inputs with Factory.clone and setting a few of their values, which should cost the same
+ whatever the width.
+
+ With --scaling, the construction time is measured for sequences of increasing width instead, up to 50,000 elements,
+ to show that it grows linearly: the time per input should stay flat. """
+
+import argparse
+import gc
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import generate
+from soapy.inputs import Factory as InputFactory
+from soapy.wsdl import Wsdl
+
+SCALING_WIDTHS = (1000, 5000, 10000, 25000, 50000)
+
+
+def input_part(directory, width, depth):
+
+    """ Return the type of the input part of a synthetic WSDL, with its types resolved """
+
+    path = os.path.join(directory, "inputs-{0}-{1}.wsdl".format(width, depth))
+    with open(path, "w") as f:
+        f.write(generate.wsdl(depth=depth, width=width))
+    wsdl = Wsdl("file://" + path, parser="lxml")
+    part = wsdl.services[0].ports[0].binding.type.operations[0].input.parts[0].type
+    InputFactory(part)
+    return part
+
+
+def construction_times(part, repeat) -> list:
+    times = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        InputFactory(part)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def scaling(directory, depth, repeat):
+    print("{0:>10}{1:>10}{2:>16}{3:>16}".format("Width", "Inputs", "Median (ms)", "Per input (us)"))
+    for width in SCALING_WIDTHS:
+        part = input_part(directory, width, depth)
+        median = statistics.median(construction_times(part, repeat))
+        inputs = len(InputFactory(part).items)
+        print("{0:>10}{1:>10}{2:>16.2f}{3:>16.2f}".format(width, inputs, median * 1e3, median / inputs * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=2000, help="Elements in the sequence of each nested type")
+    parser.add_argument("--depth", type=int, default=1, help="Levels of nested types")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--scaling", action="store_true", help="Measure widths up to 50,000 elements")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.scaling:
+            scaling(directory, args.depth, min(args.repeat, 3))
+            return
+        part = input_part(directory, args.width, args.depth)
+        times = construction_times(part, args.repeat)
+
+        template = InputFactory(part).snapshot()
+        clone_times = list()
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            clone = template.clone()
+            for name in ("field0", "field1", "field2"):
+                setattr(clone.node, name, "value")
+            clone_times.append(time.perf_counter() - start)
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        factory = InputFactory(part)
+        held = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+    print("{0:<24}{1:>10}".format("Inputs", len(factory.items)))
+    print("{0:<24}{1:>10.2f} ms".format("Construction (median)", statistics.median(times) * 1e3))
+    print("{0:<24}{1:>10.2f} ms".format("Clone, set 3 (median)", statistics.median(clone_times) * 1e3))
+    print("{0:<24}{1:>10.1f} KiB".format("Memory held", held / 1024))
+    print("{0:<24}{1:>10.0f} B".format("Memory per input", held / len(factory.items)))
+
+
+if __name__ == "__main__":
+    main()
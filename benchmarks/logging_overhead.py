@@ -0,0 +1,59 @@
+""" Profiles the cost of logging on the hot paths when it is disabled: building the inputs.Factory of an operation
+ (and loading values into it) and rendering its envelope with marshal.Envelope, for the updateCustomer operation of
+ types.wsdl with many phone elements. Logging is left at warnings only, so no debug or info message is ever emitted,
+ and whatever the log calls cost is overhead. Reports the time of each phase, and from a profile of one run, the
+ str.format calls and the time spent in the logging module, e.g. python -m benchmarks.logging_overhead --phones 2000 """
+
+import argparse
+import cProfile
+import logging
+import pstats
+import timeit
+
+from soapy.client import Client
+from soapy.inputs import Factory
+from soapy.marshal import Envelope
+
+
+def profile(func) -> tuple:
+
+    """ Return the number of str.format calls made by func, and the seconds spent in the logging module """
+
+    profiler = cProfile.Profile()
+    profiler.runcall(func)
+    formats = 0
+    in_logging = 0.0
+    for (filename, _, name), (_, calls, total, _, _) in pstats.Stats(profiler).stats.items():
+        if name == "<method 'format' of 'str' objects>":
+            formats += calls
+        elif filename == logging.__file__:
+            in_logging += total
+    return formats, in_logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--phones", type=int, default=2000, help="Repeated phone elements in the request")
+    parser.add_argument("--number", type=int, default=10, help="Runs of each phase; the best is kept")
+    args = parser.parse_args()
+
+    client = Client("file://types.wsdl", 2, "updateCustomer")
+    values = {"id": "7", "address": {"street": "Main"}, "phone": [{"number": str(i)} for i in range(args.phones)]}
+    client.inputs[0].load(values)
+    part = client.operation.input.parts[0].type
+
+    def build():
+        Factory(part).load(values)
+
+    def render():
+        Envelope(client).render()
+
+    print("{0:<10}{1:>14}{2:>16}{3:>18}".format("Phase", "Time (ms)", "str.format", "In logging (ms)"))
+    for name, func in (("build", build), ("render", render)):
+        elapsed = min(timeit.repeat(func, number=1, repeat=args.number))
+        formats, in_logging = profile(func)
+        print("{0:<10}{1:>14.2f}{2:>16}{3:>18.2f}".format(name, elapsed * 1e3, formats, in_logging * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+""" Measures the memory each worker of a pre-fork server saves when the master preloads the WSDL model. A master
+ process creates a Client for a synthetic WSDL (see benchmarks.generate) and forks workers, as gunicorn does with
+ preload_app. Each worker then serves its "first requests": it renders an envelope for every operation. The memory
+ private to each worker (pages it wrote, so no longer shares with the master, from /proc/self/smaps_rollup) is
+ compared when the master built nothing (each worker resolves the model lazily), when it called Client.preload, and
+ when it also called gc.freeze. Linux only, e.g. python -m benchmarks.prefork_memory --operations 40 --workers 4 """
+
+import argparse
+import gc
+import os
+import tempfile
+
+from benchmarks import generate
+from soapy.client import Client
+
+
+def private_memory() -> int:
+
+    """ The bytes of memory private to this process: pages written since it forked, and pages it mapped itself """
+
+    with open("/proc/self/smaps_rollup") as smaps:
+        return sum(int(line.split()[1]) * 1024 for line in smaps
+                   if line.startswith(("Private_Clean:", "Private_Dirty:")))
+
+
+def serve(client) -> None:
+    """ The work of a worker's first requests: render an envelope for every operation """
+    for operation in client.port.binding.type.operations:
+        client._template(operation).render({})
+
+
+def fork_workers(client, workers) -> list:
+
+    """ Fork workers that serve their first requests, and return the private memory of each, in bytes """
+
+    results = list()
+    for _ in range(workers):
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            serve(client)
+            os.write(write, str(private_memory()).encode("ascii"))
+            os._exit(0)
+        os.close(write)
+        with os.fdopen(read) as pipe:
+            results.append(int(pipe.read()))
+        os.waitpid(pid, 0)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--operations", type=int, default=40, help="Operations in the WSDL")
+    parser.add_argument("--depth", type=int, default=4, help="Levels of nested types in each input")
+    parser.add_argument("--width", type=int, default=40, help="Elements in the sequence of each nested type")
+    parser.add_argument("--workers", type=int, default=4, help="Workers forked by the master")
+    parser.add_argument("--parser", default="lxml", choices=("bs4", "lxml"), help="Parser of the WSDL")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.wsdl")
+        with open(path, "w") as f:
+            f.write(generate.wsdl(operations=args.operations, depth=args.depth, width=args.width))
+
+        print("{0:<20}{1:>22}{2:>18}".format("Master", "Per worker (MiB)", "Saved (MiB)"))
+        lazy = None
+        for name in ("lazy", "preload", "preload+gc.freeze"):
+            client = Client("file://" + path, 0, "op0", parser=args.parser)
+            if name != "lazy":
+                client.preload()
+            if name.endswith("freeze"):
+                gc.freeze()
+            private = fork_workers(client, args.workers)
+            gc.unfreeze()
+            per_worker = sum(private) / len(private)
+            lazy = per_worker if lazy is None else lazy
+            print("{0:<20}{1:>22.1f}{2:>18.1f}".format(name, per_worker / 2 ** 20, (lazy - per_worker) / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main()
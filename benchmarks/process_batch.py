@@ -0,0 +1,49 @@
+""" Compares the throughput of Client.batch (a pool of threads, sharing one GIL) against soapy.pool.batch (a pool of
+ processes) for CPU-bound calls: the updateCustomer operation of types.wsdl with many phone elements per request,
+ sent to a local server that discards them. Speedup is bounded by the number of cores available, e.g.
+ python -m benchmarks.process_batch --calls 400 --phones 500 --workers 4 """
+
+import argparse
+import time
+
+from benchmarks.stub import CUSTOMER_RESPONSE, StubServer
+from soapy.client import Client
+from soapy.pool import batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=400, help="Calls in the batch")
+    parser.add_argument("--phones", type=int, default=500, help="Repeated phone elements in each request")
+    parser.add_argument("--workers", type=int, default=4, help="Threads, or processes, sending the batch")
+    args = parser.parse_args()
+
+    server = StubServer(CUSTOMER_RESPONSE, discard=True)
+    client = Client("file://types.wsdl", 0, "updateCustomer")
+    client.location = server.location
+
+    def rows():
+        for i in range(args.calls):
+            yield {"id": str(i), "phone": [{"number": "{0}-{1}".format(i, j)} for j in range(args.phones)]}
+
+    def threads():
+        for response in client.batch("updateCustomer", rows(), concurrency=args.workers):
+            response.outputs
+
+    def processes():
+        for _ in batch(client, "updateCustomer", rows(), processes=args.workers):
+            pass
+
+    print("{0:<12}{1:>12}{2:>14}".format("Pool", "Time (s)", "Calls/s"))
+    try:
+        for name, run in (("threads", threads), ("processes", processes)):
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            print("{0:<12}{1:>12.2f}{2:>14.1f}".format(name, elapsed, args.calls / elapsed))
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
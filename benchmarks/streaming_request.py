@@ -0,0 +1,51 @@
+""" Compares the peak memory of sending a large request rendered whole (client(**values), where the envelope is a
+ str, then encoded) against streaming it with chunked transfer encoding (client(chunked=True, **values), with the
+ repeated values given by a generator), for the updateCustomer operation of types.wsdl with many tag elements. The
+ request is sent to a local server that discards it, e.g. python -m benchmarks.streaming_request --tags 1000000 """
+
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.stub import CUSTOMER_RESPONSE, StubServer
+from soapy.client import Client
+
+
+def measure(call) -> tuple:
+
+    """ The time of a call, and the peak memory allocated during a second call. Tracing allocations slows the
+    interpreter down, so the two are measured separately """
+
+    start = time.perf_counter()
+    call()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tags", type=int, default=200000, help="Repeated tag elements in the request")
+    args = parser.parse_args()
+
+    client = Client("file://types.wsdl", 0, "updateCustomer")
+    client.template
+
+    def tags():
+        return ("tag number {0}".format(i) for i in range(args.tags))
+
+    with StubServer(CUSTOMER_RESPONSE, discard=True) as server:
+        client.location = server.location
+        whole = measure(lambda: client(id="1", tag=list(tags())))
+        chunked = measure(lambda: client(id="1", tag=tags(), chunked=True))
+
+    print("{0:<12}{1:>12}{2:>16}".format("Request", "Time (s)", "Peak (MiB)"))
+    for name, (elapsed, peak) in (("whole", whole), ("chunked", chunked)):
+        print("{0:<12}{1:>12.2f}{2:>16.1f}".format(name, elapsed, peak / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+""" The local stub server the benchmarks send their calls to, so the numbers of every scenario are measured against
+ the same server. It answers each POST with a configurable response, after a configurable delay simulating the
+ latency of a real service, and can discard large requests as they are read rather than hold them """
+
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BANK_RESPONSE = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/">
+<soapenv:Body>
+<ns1:getBankResponse xmlns:ns1="http://thomas-bayer.com/blz/">
+<ns1:details><ns1:bezeichnung>Stub Bank {0}</ns1:bezeichnung><ns1:plz>12345</ns1:plz></ns1:details>
+</ns1:getBankResponse>
+</soapenv:Body>
+</soapenv:Envelope>"""
+
+# An updateCustomer response (of types.wsdl)
+CUSTOMER_RESPONSE = b"""<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"><soapenv:Body>
+<tns:updateCustomerResponse xmlns:tns="http://example.com/customers/"><tns:result>ok</tns:result>
+</tns:updateCustomerResponse></soapenv:Body></soapenv:Envelope>"""
+
+
+def bank_response(request) -> bytes:
+    """ A getBank response (of sample.wsdl) naming the blz of the request """
+    blz = re.search(rb"<tns:blz>(.*)</tns:blz>", request or b"")
+    return BANK_RESPONSE.format(blz.group(1).decode("utf-8") if blz else "").encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """ Answers every POST as configured on its StubServer, keeping the connection alive """
+
+    protocol_version = "HTTP/1.1"
+    # Responses are buffered and flushed once, so the headers and body go out together rather than as two small
+    # segments, which Nagle's algorithm and delayed ACKs would hold back for tens of milliseconds
+    wbufsize = -1
+
+    def do_POST(self):
+        stub = self.server.stub
+        request = self.read_body(stub.discard)
+        body = stub.response(request) if callable(stub.response) else stub.response
+        time.sleep(stub.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.wfile.flush()
+
+    def read_body(self, discard):
+        """ Read the request body, sent with a Content-Length or with chunked transfer encoding. If discard is True,
+        it is read in pieces and dropped, and None is returned """
+        pieces = list()
+        if self.headers.get("Transfer-Encoding") != "chunked":
+            self.read(int(self.headers.get("Content-Length", 0)), pieces, discard)
+        else:
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                self.read(size, pieces, discard)
+                self.rfile.readline()
+                if not size:
+                    break
+        return None if discard else b"".join(pieces)
+
+    def read(self, size, pieces, discard):
+        while size:
+            piece = self.rfile.read(min(size, 1 << 16))
+            size -= len(piece)
+            if not discard:
+                pieces.append(piece)
+
+    def log_message(self, *args):
+        """ Keep benchmark output quiet """
+
+
+class StubServer:
+    """ Serves calls on a free local port from a background thread until closed. Use as a context manager. The options
+    may be changed while it runs, e.g. to answer each scenario with its own response
+
+    :param response: The response body (bytes), or a function returning it from the request body (None if discarded)
+    :param delay: Seconds to wait before answering each call
+    :param discard: If True, request bodies are read in pieces and dropped, so large requests aren't held in memory
+    """
+
+    def __init__(self, response=bank_response, delay=0, discard=False):
+        self.response = response
+        self.delay = delay
+        self.discard = discard
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.stub = self
+        self.location = "http://127.0.0.1:{0}/service".format(self.server.server_port)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,135 @@
+""" Times the main phases of a call separately, on synthetic WSDLs of different shapes (see benchmarks.generate):
+ loading the Wsdl, building the inputs.Factory of an operation (the first time, when its types are resolved, and
+ again), rendering the envelope with marshal.Envelope, and parsing the Response. Calls are answered by a local stub
+ server. Results are printed, and written as JSON if an output file is given, so runs can be compared across
+ versions, e.g. python -m benchmarks.suite --output results.json """
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+
+import soapy.inputs
+from benchmarks import generate
+from benchmarks.stub import StubServer
+from soapy.client import Client, Response
+from soapy.inputs import Factory as InputFactory
+from soapy.marshal import Envelope
+from soapy.wsdl import Wsdl
+
+# Keyword arguments of generate.wsdl for each scenario
+SCENARIOS = {
+    "baseline": {},
+    "many_operations": {"operations": 300},
+    "deep_nesting": {"depth": 40, "width": 2},
+    "wide_sequence": {"width": 1000},
+    "large_enumeration": {"enums": 2000},
+    "recursive": {"depth": 3, "recursive": True},
+}
+
+
+def timed(func, repeat, setup=None) -> dict:
+
+    """ Run func repeat times, calling setup (if any) untimed before each run and passing func its result """
+
+    times = list()
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        func(argument) if setup is not None else func()
+        times.append(time.perf_counter() - start)
+    return {"runs": repeat, "min": min(times), "median": statistics.median(times), "mean": statistics.mean(times)}
+
+
+def fill(factory) -> None:
+    """ Give every setable input a value, so the whole envelope is rendered """
+    for item in factory.items:
+        if isinstance(item, soapy.inputs.Element):
+            item.value = "value"
+
+
+def run_scenario(name, shape, server, directory, repeat, items, parser="bs4") -> dict:
+    path = os.path.join(directory, name + ".wsdl")
+    with open(path, "w") as f:
+        f.write(generate.wsdl(**shape))
+    url = "file://" + path
+
+    def load_wsdl():
+        # Reading the definitions forces the document to be parsed
+        return Wsdl(url, parser=parser).wsdl
+
+    def operation_of(wsdl):
+        return wsdl.services[0].ports[0].binding.type.operations[0]
+
+    def fresh_part():
+        return operation_of(Wsdl(url, parser=parser)).input.parts[0].type
+
+    results = dict()
+    results["wsdl_load"] = timed(load_wsdl, repeat)
+    results["factory_first"] = timed(InputFactory, repeat, fresh_part)
+    part = fresh_part()
+    InputFactory(part)
+    results["factory_again"] = timed(lambda: InputFactory(part), repeat)
+
+    client = Client(url, 0, "op0", parser=parser)
+    client.location = server.location
+    fill(client.inputs[0])
+    results["envelope_render"] = timed(lambda: Envelope(client).render(), repeat)
+
+    server.response = generate.response("op0", shape.get("width", 4), items)
+    results["call"] = timed(client, repeat)
+    http_response = client.response
+
+    def parse():
+        response = Response(http_response, client)
+        return response.outputs, response.simple_outputs
+
+    results["response_parse"] = timed(parse, repeat)
+    results["response_bytes"] = len(http_response.content)
+    return results
+
+
+def environment() -> dict:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        revision = None
+    return {"python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "revision": revision or None,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of each phase; min, median and mean are kept")
+    parser.add_argument("--items", type=int, default=200, help="Repeated items in each response")
+    parser.add_argument("--scenario", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--parser", choices=Wsdl.supported_parsers, default="bs4", help="Parser of the WSDLs")
+    parser.add_argument("--output", help="File to write the results to, as JSON")
+    args = parser.parse_args()
+
+    results = dict()
+    with StubServer(discard=True) as server:
+        with tempfile.TemporaryDirectory() as directory:
+            for name in args.scenario:
+                results[name] = run_scenario(name, SCENARIOS[name], server, directory, args.repeat, args.items,
+                                             args.parser)
+                for phase, result in results[name].items():
+                    if isinstance(result, dict):
+                        print("{0:<20}{1:<18}{2:>12.2f} ms".format(name, phase, result["median"] * 1e3))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "parser": args.parser, "scenarios": SCENARIOS,
+                       "results": results}, f, indent=2)
+        print("Results written to {0}".format(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+""" Compares the per-request CPU cost of rendering an envelope with the marshaller (soapy.marshal.Envelope) against
+ filling a compiled soapy.marshal.Template, for the updateCustomer operation of types.wsdl. Also measures setting the
+ values of the inputs one attribute at a time against loading them with Factory.load. """
+
+import argparse
+import timeit
+
+from soapy.client import Client
+from soapy.marshal import Envelope
+
+VALUES = {
+    "id": "7",
+    "nickname": "Jo",
+    "note": "Prefers email",
+    "tag": ["a", "b", "c"],
+    "address": {"street": "Main", "city": "Springfield", "@kind": "work"},
+    "phone": [{"number": "1", "status": "active"}, {"number": "2"}]
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    client = Client("file://types.wsdl", 0, "updateCustomer")
+    inputs = client.inputs[0]
+    inputs.id.value = VALUES["id"]
+    inputs.nickname.value = VALUES["nickname"]
+    inputs.note.value = VALUES["note"]
+    inputs.tag.extend(*VALUES["tag"])
+    inputs.address.street.value = VALUES["address"]["street"]
+    inputs.address.city.value = VALUES["address"]["city"]
+    inputs.address["kind"].value = VALUES["address"]["@kind"]
+    inputs.phone.append()
+    inputs.phone[0].number.value = "1"
+    inputs.phone[0].status.value = "active"
+    inputs.phone[1].number.value = "2"
+
+    def marshal():
+        Envelope(client).render()
+
+    def assign():
+        inputs.id.value = VALUES["id"]
+        inputs.nickname.value = VALUES["nickname"]
+        inputs.note.value = VALUES["note"]
+        del inputs.tag.elements[1:]
+        inputs.tag.extend(*VALUES["tag"])
+        inputs.address.street.value = VALUES["address"]["street"]
+        inputs.address.city.value = VALUES["address"]["city"]
+        inputs.address["kind"].value = VALUES["address"]["@kind"]
+        del inputs.phone.elements[1:]
+        inputs.phone.append()
+        inputs.phone[0].number.value = "1"
+        inputs.phone[0].status.value = "active"
+        inputs.phone[1].number.value = "2"
+
+    def load():
+        inputs.load(VALUES)
+
+    template = client.template
+
+    def fill():
+        template.render(VALUES)
+
+    compile_time = timeit.timeit(lambda: type(template)(client.operation, client.wsdl.version), number=100) / 100
+    marshal_time = timeit.timeit(marshal, number=args.number) / args.number
+    fill_time = timeit.timeit(fill, number=args.number) / args.number
+    assign_time = timeit.timeit(assign, number=args.number) / args.number
+    load_time = timeit.timeit(load, number=args.number) / args.number
+    print("{0:<24}{1:>10.1f} us".format("Template compile", compile_time * 1e6))
+    print("{0:<24}{1:>10.1f} us/request".format("Envelope.render", marshal_time * 1e6))
+    print("{0:<24}{1:>10.1f} us/request".format("Template.render", fill_time * 1e6))
+    print("{0:<24}{1:>10.1f}x".format("Speedup", marshal_time / fill_time))
+    print("{0:<24}{1:>10.1f} us/request".format("Attribute assignment", assign_time * 1e6))
+    print("{0:<24}{1:>10.1f} us/request".format("Factory.load", load_time * 1e6))
+
+
+if __name__ == "__main__":
+    main()
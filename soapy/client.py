@@ -1,18 +1,31 @@
+import asyncio
 import logging
-
-import requests
-from bs4 import BeautifulSoup, Tag
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from io import BytesIO
+
+from bs4 import BeautifulSoup
 from requests.auth import HTTPBasicAuth
 from requests.exceptions import ConnectionError
 
 import soapy.marshal
+import soapy.metrics
+import soapy.unmarshal
 from soapy.inputs import Factory as InputFactory
+from soapy.transport import AsyncTransport, HttpTransport, Transport
 from soapy.wsdl import Wsdl
 from soapy.wsdl.model import Port, Service, Operation
 
 # Initialize logger for this module
 logger = logging.getLogger(__name__)
 
+# The logger of the soapy package, the parent of the logger of every module. The trace level of a Client sets its
+# level, and nothing else, so the logging configuration of the application is left alone
+package_logger = logging.getLogger("soapy")
+
 
 class Client:
     
@@ -27,7 +40,9 @@ class Client:
                           "proxy_user",
                           "proxy_pass",
                           "secure",
-                          "version"
+                          "version",
+                          "transport",
+                          "metrics"
                           )
 
     # A list of supported namespaces for bindings. If not one of these, it is an unknown protocol/spec
@@ -49,6 +64,14 @@ class Client:
         :keyword proxy_pass: The password paired with the username for proxy authentication
         :keyword secure: A boolean flag, defaults to True, if SSL verification should be performed
         :keyword version: A number representing the SOAP version (1.1 or 1.2) of the request. Defaults to 1.1
+        :keyword cache: A soapy.wsdl.cache.WsdlCache, or a directory path, to load the WSDL documents from/store them to
+        :keyword parser: "bs4" (the default) or "lxml", the parser of the WSDL and schema documents. See Wsdl.__init__
+        :keyword catalog: A soapy.wsdl.catalog.Catalog, or the path of a catalog file or directory, to read the WSDL
+        and schemas from local files instead of the network where possible. See Wsdl.__init__
+        :keyword transport: The soapy.transport.Transport used to send requests. Defaults to the HttpTransport shared
+        by all clients calling the same host
+        :keyword metrics: A list of soapy.metrics.MetricsHook objects to notify of the timings, sizes and status of
+        each call. See Client.metrics
 
         Tracelevels:
 
@@ -60,23 +83,16 @@ class Client:
         4: (Informational)
         5: (Debug information)
 
+        The trace level sets the level of the "soapy" logger (and so of every soapy module) only. If logging isn't
+        configured at all, a handler printing to stderr is added to that logger, so traces are shown
+
         If service is not provided, but operation is, the first operation in any service
         matching the name will be user. If service is provided, then only that service will
         be searched for a matching operation. You can also select a service or operation later
         by setting self.service and/or self.operation. This allows you to explore the wsdl
         and get a list of possible services and operations within each service """
 
-        # Handle some backwards compat issues with tracelevel so logging level gets set based on tl provided
-        levels = {
-            -1: logging.NOTSET,
-            0: logging.CRITICAL,
-            1: logging.ERROR,
-            2: logging.WARNING,
-            3: logging.INFO,
-            4: logging.INFO,
-            5: logging.DEBUG
-        }
-        logging.basicConfig(level=levels[tl])
+        self.trace_level(tl)
 
         # Attributes that are evaluated lazy
         self.__inputs = None
@@ -85,6 +101,10 @@ class Client:
         self.__schema = None
         self.__request_envelope = None
         self.__port = None
+        self.__templates = {}
+        self.__namespace_tables = {}
+        # Guards the lazy attributes above, which may be first used by several threads at once
+        self.__lock = threading.RLock()
 
         # Initialize some default values
 
@@ -94,13 +114,18 @@ class Client:
         self.proxy_user = ""
         self.proxy_pass = ""
         self.__auth = None
+        self.__transport = None
         self.headers = {"Content-Type": "text/xml;charset=UTF-8"}
+        self.secure = True
+        self.__metrics = list()
 
         # Update values with kwargs if provided
 
         for each in kwargs:
             if each in self.constructor_kwargs:
                 setattr(self, each, kwargs[each])
+            elif each in Wsdl.constructor_kwargs:
+                " Only used to initialize the Wsdl, below "
             else:
                 raise ValueError("Unexpected keyword argument for {} initializer, {}".format(
                     self.__class__.__name__,
@@ -108,7 +133,7 @@ class Client:
                 ))
 
         # Initialize instance of Wsdl using provided information
-        logger.info("Initializing new wsdl object using url: {0}".format(wsdl_location))
+        logger.info("Initializing new wsdl object using url: %s", wsdl_location)
 
         # Initialize the Wsdl for this client with any key word args that are valid for that class
         self.__wsdl = Wsdl(
@@ -119,15 +144,36 @@ class Client:
         # If either operation or service is set, initialize them to starting values
 
         if service is not None:
-            logger.debug("Initializing service with name {0}".format(service))
+            logger.debug("Initializing service with name %s", service)
             self.service = service
 
         if operation is not None:
-            logger.debug("Initializing operation with name {0}".format(operation))
+            logger.debug("Initializing operation with name %s", operation)
             self.operation = operation
 
         logger.info("Client successfully initialized")
 
+    @staticmethod
+    def trace_level(tl) -> None:
+
+        """ Set the level of the soapy logger from a trace level (see Client.__init__) """
+
+        # Handle some backwards compat issues with tracelevel so logging level gets set based on tl provided
+        levels = {
+            -1: logging.CRITICAL + 10,
+            0: logging.CRITICAL,
+            1: logging.ERROR,
+            2: logging.WARNING,
+            3: logging.INFO,
+            4: logging.INFO,
+            5: logging.DEBUG
+        }
+        package_logger.setLevel(levels[tl])
+        if tl > 0 and not package_logger.handlers and not logging.getLogger().handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+            package_logger.addHandler(handler)
+
     @property
     def service(self) -> Service:
         """ The service that the client is interacting with. May be one of a list, or the only service defined"""
@@ -136,14 +182,13 @@ class Client:
     @service.setter
     def service(self, service):
         found = False
-        logger.debug("Searching for service with name {0}".format(service))
+        logger.debug("Searching for service with name %s", service)
         for each in self.wsdl.services:
             if each.name == service:
                 self.__service = each
                 found = True
         if not found:
-            logger.error("Search for service matching name {0} failed; WDSL does not contain this service"
-                         .format(service))
+            logger.error("Search for service matching name %s failed; WDSL does not contain this service", service)
             raise ValueError("WSDL contains no service named {0}".format(service))
 
     @property
@@ -154,6 +199,18 @@ class Client:
     def auth(self, obj):
         self.__auth = obj
 
+    @property
+    def transport(self) -> Transport:
+        """ The Transport used to send requests. Unless set, the pooled HttpTransport shared for the host of location
+        is used """
+        if self.__transport is None:
+            return HttpTransport.shared(self.location)
+        return self.__transport
+
+    @transport.setter
+    def transport(self, transport: Transport):
+        self.__transport = transport
+
     @property
     def username(self):
         """ The username for HTTP Basic Auth, if needed """
@@ -206,40 +263,36 @@ class Client:
 
     @operation.setter
     def operation(self, operation_name):
+        self.__service, self.__port, self.__operation = self._find_operation(operation_name)
+        logger.info("Set client operation to %s", self.operation)
+        # Clear any input object and envelope, as a new operation will have a new input object
+        self.__inputs = None
+        self.__request_envelope = None
+
+    def _find_operation(self, operation_name) -> tuple:
+
+        """ Search the selected service, or all services if none is selected, for the operation with the given name.
+        :return: A tuple of the Service, Port and Operation found """
+
         def ops(service):
             for port in service.ports:
                 if port.binding.ns in self.supported_namespaces:
                     for operation in port.binding.type.operations:
                         yield (port, operation)
                 else:
-                    logger.info('Ignoring operations in port binding "{}" as it is not a supported SOAP version'
-                                .format(port.binding.name))
+                    logger.info('Ignoring operations in port binding "%s" as it is not a supported SOAP version',
+                                port.binding.name)
 
-        found = False
-        if self.service is None:
-            for service in self.wsdl.services:
-                for port, operation in ops(service):
-                    if operation.name == operation_name:
-                        found = True
-                        self.__operation = operation
-                        self.__port = port
-                        self.__service = service
-        else:
-            for port, operation in ops(self.service):
+        found = None
+        services = self.wsdl.services if self.service is None else (self.service,)
+        for service in services:
+            for port, operation in ops(service):
                 if operation.name == operation_name:
-                    found = True
-                    self.__operation = operation
-                    self.__port = port
-        if not found:
-            logger.error("Search for operation matching name {0} failed; No such operation".format(operation_name), 1)
+                    found = (service, port, operation)
+        if found is None:
+            logger.error("Search for operation matching name %s failed; No such operation", operation_name)
             raise ValueError("No such operation: {0}".format(operation_name))
-        else:
-            logger.info("Set client operation to {0}".format(self.operation))
-            # Clear any input object, as a new operation will have a new input object
-            try:
-                self.__inputs = None
-            except AttributeError:
-                " Do nothing, as this means inputs were never generated for the previous operation "
+        return found
 
     @property
     def schema(self):
@@ -269,29 +322,104 @@ class Client:
         inputs is a tuple of iterable soapy.client.inputs.Factory objects. In most cases, there is only one possible
         input message for a given operation, in which case the tuple will have only 1 element.
         """
-        if self.__inputs is None:
-            try:
-                inputs = list()
-                logger.info("Building list of inputs for operation {0}".format(self.operation.name))
-                for each in self.operation.input.parts:
-                    inputs.append(InputFactory(each.type))
-                self.__inputs = tuple(inputs)
-            except AttributeError:
-                raise RuntimeError("Must set operation before inputs can be determined")
-        return self.__inputs
+        with self.__lock:
+            if self.__inputs is None:
+                try:
+                    inputs = list()
+                    logger.info("Building list of inputs for operation %s", self.operation.name)
+                    for each in self.operation.input.parts:
+                        inputs.append(InputFactory(each.type))
+                    self.__inputs = tuple(inputs)
+                except AttributeError:
+                    raise RuntimeError("Must set operation before inputs can be determined")
+            return self.__inputs
 
     @property
     def request_envelope(self):
-        if self.__request_envelope is None:
-            self._build_envelope()
-            logger.debug("Rendered request envelope: {0}".format(self.__request_envelope))
-        return self.__request_envelope
+        """
+        The envelope rendered from the inputs of the client. It is rendered when first used after each call, so it
+        shows the current values of the inputs. The envelope actually sent by a call (after any doctors) belongs to
+        the RequestContext of that call
+        """
+        envelope = self.__request_envelope
+        if envelope is None:
+            envelope = self.__request_envelope = self._build_envelope()
+            logger.debug("Rendered request envelope: %s", envelope)
+        return envelope
+
+    @property
+    def metrics(self) -> list:
+        """
+        The soapy.metrics.MetricsHook objects notified of the timings, sizes and status of each call, e.g.
+        client.metrics.append(soapy.metrics.MetricsAggregator()). May also be set with the metrics keyword argument
+        """
+        return self.__metrics
+
+    @metrics.setter
+    def metrics(self, hooks):
+        self.__metrics = list(hooks)
+
+    @property
+    def template(self) -> soapy.marshal.Template:
+        """
+        The compiled soapy.marshal.Template of the request envelope for the selected operation and SOAP version. It is
+        compiled once, and rendering it only fills in values, e.g. client.template.render({"blz": "12345678"})
+        """
+        if self.operation is None:
+            raise ValueError("Must set operation before the template can be compiled")
+        return self._template(self.operation)
+
+    def _template(self, operation: Operation) -> soapy.marshal.Template:
+        key = (operation, self.wsdl.version)
+        with self.__lock:
+            if key not in self.__templates:
+                self.__templates[key] = soapy.marshal.Template(operation, self.wsdl.version,
+                                                               namespaces=self._namespace_table(operation))
+            return self.__templates[key]
+
+    @property
+    def namespaces(self) -> soapy.marshal.NamespaceTable:
+        """
+        The soapy.marshal.NamespaceTable of the selected operation: the prefix of each namespace used in its request
+        envelope. It is computed once per operation, and shared by every envelope rendered for it
+        """
+        if self.operation is None:
+            raise ValueError("Must set operation before the namespaces can be computed")
+        return self._namespace_table(self.operation)
+
+    def _namespace_table(self, operation: Operation) -> soapy.marshal.NamespaceTable:
+        key = (operation, self.wsdl.version)
+        with self.__lock:
+            if key not in self.__namespace_tables:
+                self.__namespace_tables[key] = soapy.marshal.NamespaceTable(operation, self.wsdl.version)
+            return self.__namespace_tables[key]
 
-    def _build_envelope(self):
+    def preload(self) -> "Client":
+
+        """ Resolve the whole model of the WSDL (see Wsdl.preload), and compile the Template of every operation of the
+        selected service (or of every service), so nothing is built on demand by the first calls. Returns the Client.
+
+        For pre-fork servers: create and preload clients in the master process, then fork the workers. The model and
+        templates are then shared copy-on-write by all workers. Don't call the service before forking, as the
+        connections opened would be shared too (the shared HttpTransports are discarded in each forked process) """
+
+        self.wsdl.preload()
+        services = self.wsdl.services if self.service is None else (self.service,)
+        for service in services:
+            for port in service.ports:
+                if port.binding.ns in self.supported_namespaces:
+                    for operation in port.binding.type.operations:
+                        # Notification operations have no input to render
+                        if operation.bs_element("input"):
+                            self._template(operation)
+        return self
+
+    def _build_envelope(self) -> soapy.marshal.Envelope:
         logger.debug("Initializing marshaller for envelope")
-        self.__request_envelope = soapy.marshal.Envelope(self)
+        envelope = soapy.marshal.Envelope(self)
         logger.debug("Rendering request envelope")
-        self.__request_envelope.render()
+        envelope.render()
+        return envelope
 
     def _build_proxy_dict(self) -> dict:
         if self.proxy_url:
@@ -309,7 +437,7 @@ class Client:
                                    r"\1{0}:{1}@\2"
                                     .format(self.proxy_user, self.proxy_pass),
                                     self.proxy_url)
-            logger.info("Set proxy to '{0}'".format(self.proxy_url))
+            logger.info("Set proxy to '%s'", self.proxy_url)
 
     def __call__(self, **kwargs):
 
@@ -320,60 +448,332 @@ class Client:
          :keyword proxy_url: The URL for a HTTP/HTTPS proxy to be used, if any
          :keyword proxy_user: The Username for basic http auth with the web proxy
          :keyword proxy_pass: The password for basic http auth with the web proxy
-         :keyword doctors: A list of the plugins to modify (doctor) the client or soap envelope before
-         calling the webservice
-         :keyword secure: If False, will not attempt to validate SSL certificates. Defaults to True """
+         :keyword doctors: A list of the plugins to modify (doctor) the soap envelope, headers or location before
+         calling the webservice. Doctors receive the RequestContext of the call, so their changes apply to it only
+         :keyword transport: The soapy.transport.Transport to send the request with
+         :keyword secure: If False, will not attempt to validate SSL certificates for this call. Defaults to
+         Client.secure
+         :keyword stream: If True, the response body is not downloaded until it is used, so that
+         Response.iter_records can read it from the connection incrementally. Defaults to False
+         :keyword chunked: If True, the envelope is rendered from the values (see below) as it is sent, with chunked
+         transfer encoding, so it is never held in memory whole. Repeated values may then be given as generators. The
+         envelope can't be changed by doctors, and can't be sent through a transport that retries calls, as a retry
+         would send it again after it was consumed. Defaults to False
+
+         Any other keyword arguments are values of the child elements of the (first) input part, in the format of
+         Client.template, e.g. client(blz="12345678"). The envelope is then rendered from the compiled template
+         with those values alone, without building or reading the inputs. Elements named like the keywords above
+         must be set through the inputs instead, e.g. with Factory.load
+
+         The state of each call (its envelope, headers, doctors' changes and response) is kept in a RequestContext,
+         so one Client may be called from many threads at once. The keywords that configure the client (location,
+         username, password, proxy_url, proxy_user, proxy_pass, transport and metrics) still change it for later
+         calls, and shouldn't be passed to calls made concurrently. Client.response is the response of the last
+         call to complete, from any thread """
 
         if self.operation is None:
             raise ValueError("Operation must be set before web service can be called")
 
         doctor_plugins = None
-        self.secure = True
+        stream = False
+        chunked = False
+        values = dict()
+        secure = self.secure
 
         for key in kwargs:
-            if key in self.constructor_kwargs:
+            if key == "secure":
+                secure = kwargs[key]
+            elif key in self.constructor_kwargs:
                 setattr(self, key, kwargs[key])
             elif key == "doctors":
                 doctor_plugins = kwargs[key]
+            elif key == "stream":
+                stream = kwargs[key]
+            elif key == "chunked":
+                chunked = kwargs[key]
             else:
-                raise ValueError("Unexpected keyword argument '{}' for __call__".format(key))
+                values[key] = kwargs[key]
+
+        if chunked and (not values or doctor_plugins):
+            raise ValueError("Chunked requests are rendered from the values passed to __call__, and without doctors")
+        if chunked and self.transport.retries:
+            # The envelope is consumed as it is sent, so a retry would send an empty or truncated body
+            raise ValueError("Chunked requests can't be sent by a transport that retries calls")
+
+        if values:
+            names = set(slot.name for slot in self.template.slots[0].children)
+            for key in values:
+                if key not in names:
+                    raise ValueError("Unexpected keyword argument '{}' for __call__".format(key))
 
         logger.info("Getting ready to call the web service")
+        context = RequestContext(self, self.service, self.port, self.operation, () if values else self.inputs,
+                                 (values,) if values else None)
+        context.secure = secure
+        metrics = soapy.metrics.CallMetrics(context.operation.name, context.location)
+        # The envelope of the inputs is rendered again when next used, so it shows values changed since
+        self.__request_envelope = None
+
+        if chunked:
+            logger.debug("Streaming request envelope from the template of the operation")
+        else:
+            with metrics.timed("render"):
+                logger.debug("Rendering request envelope for this call")
+                envelope = context.request_envelope
 
         logger.debug("Creating necessary HTTP headers")
-        self.headers["SOAPAction"] = '"' + self.port.binding.get_soap_action(self.operation.name) + '"'
-        logger.debug("Set custom headers to {0}".format(self.headers))
+        context.headers["SOAPAction"] = context.port.binding.soap_action_header(context.operation.name)
+        logger.debug("Set custom headers to %s", context.headers)
         proxies = self._build_proxy_dict()
 
         if doctor_plugins is not None:
             logger.debug("Loading doctors for request")
-            for doctor in doctor_plugins:
-                logger.info("Applying doctor plugin {}".format(doctor.__class__.__name__))
-                self.request_envelope.xml = doctor(self, self.request_envelope.xml)
+            with metrics.timed("doctors"):
+                for doctor in doctor_plugins:
+                    logger.info("Applying doctor plugin %s", doctor.__class__.__name__)
+                    envelope.xml = doctor(context, envelope.xml)
 
         try:
-            if self.auth is None:
-                logger.info("Calling web service at {0}".format(self.location))
-                self.response = requests.post(self.location,
-                                              proxies=proxies,
-                                              data=self.request_envelope.xml,
-                                              headers=self.headers,
-                                              verify=self.secure)
+            if context.auth is None:
+                logger.info("Calling web service at %s", context.location)
+            else:
+                logger.info("Calling web service at %s using Authentication", context.location)
+            if chunked:
+                data = self.template.iter_render(values)
             else:
-                logger.info("Calling web service at {0} using Authentication".format(self.location))
-                self.response = requests.post(self.location,
-                                              auth=self.auth,
-                                              proxies=proxies,
-                                              data=self.request_envelope.xml,
-                                              headers=self.headers,
-                                              verify=self.secure)
+                data = envelope.xml.encode("utf-8")
+                metrics.request_bytes = len(data)
+            # The body is always requested as a stream, so it can be downloaded (and timed) apart from the headers
+            with metrics.timed("send"):
+                context.response = self.transport.post(context.location,
+                                                       data=data,
+                                                       headers=context.headers,
+                                                       auth=context.auth,
+                                                       proxies=proxies,
+                                                       verify=context.secure,
+                                                       stream=True)
+            metrics.status = context.response.status_code
+            metrics.timings["first_byte"] = context.response.elapsed.total_seconds()
+            if not stream:
+                with metrics.timed("download"):
+                    metrics.response_bytes = len(context.response.content)
         except ConnectionError as e:
             logger.critical("Web service connection failed. Check location and try again")
+            metrics.error = e
+            soapy.metrics.notify(self.metrics, "call", metrics)
             raise ConnectionError(str(e))
-
-        logger.info("Web service call complete, status code is {0}".format(self.response.status_code))
+        except Exception as e:
+            metrics.error = e
+            soapy.metrics.notify(self.metrics, "call", metrics)
+            raise
+
+        logger.info("Web service call complete, status code is %s", context.response.status_code)
+        self.response = context.response
+        soapy.metrics.notify(self.metrics, "call", metrics)
         logger.debug("Creating new Response object")
-        return Response(self.response, self)
+        return Response(context.response, context, metrics)
+
+    def batch(self, operation_name, rows, concurrency=1, ordered=True, doctors=()):
+
+        """ Call the named operation once for each mapping of values in rows, and yield a Response for each call.
+        Each envelope is rendered independently from the compiled Template of the operation (see Client.template for
+        the format of the values), so neither the inputs nor the request_envelope of the client are used or changed.
+
+        Rows are read lazily, and at most concurrency calls are rendered or in flight at once, so memory stays bounded
+        however long rows is. Doctor plugins receive the RequestContext of each call in place of the Client.
+
+        :param rows: An iterable of mappings of values, one per call. For operations with more than one input part, a
+        row may be a tuple of mappings, one per part
+        :param concurrency: The number of calls to send at once, from a pool of threads
+        :param ordered: If True, responses are yielded in the order of rows. Otherwise, as each call completes
+        """
+
+        service, port, operation = self._find_operation(operation_name)
+        # Compile the template before the threads of the pool render envelopes from it
+        self._template(operation)
+        soap_action = port.binding.soap_action_header(operation.name)
+        transport = self.__transport or HttpTransport.shared(port.location, pool_maxsize=max(concurrency, 10))
+        proxies = self._build_proxy_dict()
+
+        def call(values):
+            context = RequestContext(self, service, port, operation, (), values if isinstance(values, tuple)
+                                     else (values,))
+            context.headers["SOAPAction"] = soap_action
+            for doctor in doctors:
+                context.request_envelope.xml = doctor(context, context.request_envelope.xml)
+            try:
+                context.response = transport.post(context.location,
+                                                  data=context.request_envelope.xml.encode("utf-8"),
+                                                  headers=context.headers,
+                                                  auth=context.auth,
+                                                  proxies=proxies,
+                                                  verify=context.secure)
+            except ConnectionError as e:
+                logger.critical("Web service connection failed. Check location and try again")
+                raise ConnectionError(str(e))
+            return Response(context.response, context)
+
+        def collect():
+            if ordered:
+                yield pending.popleft().result()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()
+
+        rows = iter(rows)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="soapy-batch") as executor:
+            try:
+                for values in rows:
+                    pending.append(executor.submit(call, values))
+                    if len(pending) >= concurrency:
+                        yield from collect()
+                while pending:
+                    yield from collect()
+            finally:
+                # If the caller stops early, don't start the calls that are still queued
+                for future in pending:
+                    future.cancel()
+
+
+class RequestContext:
+    """ The state of a single call of an operation: its inputs, headers, request envelope and response. Envelope and
+    Response read the operation and inputs from the context, and doctor plugins receive it in place of the Client, so
+    the changes they make apply to that call only """
+
+    def __init__(self, client: Client, service: Service, port: Port, operation: Operation, inputs: tuple,
+                 values=None):
+
+        """ The envelope of the call is rendered from inputs, a tuple of soapy.inputs.Factory objects, or if values is
+        provided, from the compiled Template of the operation with values, a tuple of mappings (one per part) """
+
+        self.__client = client
+        self.__values = values
+        self.__request_envelope = None
+        self.service = service
+        self.port = port
+        self.operation = operation
+        self.inputs = tuple(inputs)
+        self.location = port.location
+        self.headers = dict(client.headers)
+        self.auth = client.auth
+        self.secure = getattr(client, "secure", True)
+        self.response = None
+
+    @property
+    def client(self) -> Client:
+        return self.__client
+
+    @property
+    def wsdl(self) -> Wsdl:
+        return self.client.wsdl
+
+    @property
+    def namespaces(self) -> soapy.marshal.NamespaceTable:
+        return self.client._namespace_table(self.operation)
+
+    @property
+    def metrics(self) -> list:
+        return self.client.metrics
+
+    @property
+    def request_envelope(self):
+        if self.__request_envelope is None:
+            if self.__values is None:
+                self.__request_envelope = soapy.marshal.Envelope(self)
+            else:
+                self.__request_envelope = soapy.marshal.RenderedEnvelope(self.client._template(self.operation),
+                                                                         self.__values)
+            self.__request_envelope.render()
+        return self.__request_envelope
+
+
+class AsyncClient:
+    """ asyncio interface for calling the operations of a WSDL concurrently. AsyncClient shares the parsed Wsdl model
+    of a Client, but keeps no per-call state on itself: each call renders its own envelope from its own inputs, so any
+    number of calls may be awaited at once. At most concurrency calls are sent at the same time.
+
+    Envelopes are rendered on the event loop, but requests are sent by the blocking requests-based transport on a
+    thread pool (see soapy.transport.AsyncTransport), as soapy has no async HTTP dependency. Each call in flight holds
+    a worker thread, so concurrency should stay in the tens to hundreds, not thousands. """
+
+    def __init__(self, client, concurrency=10, transport=None, **kwargs):
+
+        """ Provide a Client, or the wsdl location and keyword arguments to initialize one with.
+
+        :param concurrency: The maximum number of calls in flight at once
+        :param transport: A soapy.transport.AsyncTransport to send requests with. Defaults to one using the pooled
+        HttpTransport of each host, sized to concurrency
+        """
+
+        if not isinstance(client, Client):
+            client = Client(client, **kwargs)
+        self.__client = client
+        self.__concurrency = concurrency
+        self.__transport = transport if transport is not None else AsyncTransport(max_workers=concurrency)
+        self.__semaphores = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self) -> Client:
+        return self.__client
+
+    @property
+    def wsdl(self) -> Wsdl:
+        return self.client.wsdl
+
+    @property
+    def transport(self) -> AsyncTransport:
+        return self.__transport
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """ The semaphore bounding concurrent calls within the running event loop """
+        loop = asyncio.get_running_loop()
+        try:
+            return self.__semaphores[loop]
+        except KeyError:
+            semaphore = self.__semaphores[loop] = asyncio.Semaphore(self.__concurrency)
+            return semaphore
+
+    def inputs(self, operation_name) -> tuple:
+        """ Return a new tuple of soapy.inputs.Factory objects for the operation, to provide values for one call """
+        service, port, operation = self.client._find_operation(operation_name)
+        return tuple(InputFactory(part.type) for part in operation.input.parts)
+
+    async def call(self, operation_name, *inputs, doctors=()):
+
+        """ Call the named operation with the provided inputs (as returned by AsyncClient.inputs), and return its
+        Response. Doctor plugins are applied to the RequestContext of this call only. """
+
+        service, port, operation = self.client._find_operation(operation_name)
+        if not inputs:
+            inputs = self.inputs(operation_name)
+        context = RequestContext(self.client, service, port, operation, inputs)
+        context.headers["SOAPAction"] = port.binding.soap_action_header(operation.name)
+
+        async with self.semaphore:
+            for doctor in doctors:
+                logger.info("Applying doctor plugin %s", doctor.__class__.__name__)
+                context.request_envelope.xml = doctor(context, context.request_envelope.xml)
+            try:
+                logger.info("Calling web service at %s", context.location)
+                context.response = await self.transport.post(context.location,
+                                                             data=context.request_envelope.xml.encode("utf-8"),
+                                                             headers=context.headers,
+                                                             auth=context.auth,
+                                                             proxies=self.client._build_proxy_dict(),
+                                                             verify=context.secure)
+            except ConnectionError as e:
+                logger.critical("Web service connection failed. Check location and try again")
+                raise ConnectionError(str(e))
+
+        logger.info("Web service call complete, status code is %s", context.response.status_code)
+        return Response(context.response, context)
+
+    def close(self):
+        self.transport.close()
 
 
 class Response:
@@ -381,47 +781,80 @@ class Response:
         and provides someone intelligent methods for interacting with the response.
         Response encapsulates both "output" messages and "fault" messages. """
 
-    def __init__(self, response, client: Client):
+    # Bytes read from the connection at a time by iter_records
+    chunk_size = 64 * 1024
+
+    def __init__(self, response, client: Client, metrics=None):
         """
         Intended to be initialized via Client upon receiving response
         :param response: requests Response object
         :param client: the client object which called Response
+        :param metrics: The soapy.metrics.CallMetrics of the call, if any. Parsing is then timed, and reported to the
+        metrics hooks of the client
         """
 
         self.__response = response
         self.__client = client
-        if self.isXml:
-            self.__bsResponse = BeautifulSoup(self.text, "xml")
-        else:
-            self.__bsResponse = BeautifulSoup(self.text, "lxml")
+        self.__metrics = metrics
 
         # Attributes that are evaluated lazy
+        self.__bsResponse = None
+        self.__outputs = None
+        self.__faults = None
         self.__simple_faults = None
         self.__simple_outputs = None
+        logger.info("Initialized Response object with status code %s", self.status)
 
-        self.outputs = tuple()
-        self.faults = tuple()
-        faults = list()
-        outputs = list()
+    @staticmethod
+    def _part_name(part) -> str:
+        schema = part.type.schema
+        return soapy.unmarshal.qualified_name(schema.name if schema is not None else None, part.type.name)
+
+    def _parse(self) -> None:
+
+        """ Find the output and fault parts of the operation in the response, in one pass over the envelope """
+
+        start = time.perf_counter()
+        fault_names = list()
         logger.debug("Initializing list of faults for this operation")
         for fault in self.__client.operation.faults:
             if fault is not None:
                 for part in fault.parts:
-                    try:
-                        faults.append(self.bsResponse(part.type.name)[0])
-                    except IndexError:
-                        " Do nothing, as the fault message is not present in the response"
-        for part in self.__client.operation.output.parts:
-            try:
-                outputs.append(self.bsResponse(part.type.name)[0])
-            except IndexError:
-                " Do nothing because there was no valid XML response (probably 500 error, etc) "
-        self.outputs = tuple(outputs)
-        self.faults = tuple(faults)
-        if self:
-            logger.info("Initialized Successful Response object")
-        else:
-            logger.info("Initialized Unsuccessful Response object with status code {0}".format(self.status))
+                    fault_names.append(self._part_name(part))
+        output_names = [self._part_name(part) for part in self.__client.operation.output.parts]
+
+        outputs = list()
+        faults = list()
+        if self.isXml:
+            found = soapy.unmarshal.parse(BytesIO(self.__response.content), output_names + fault_names)
+            # Parts that are not present in the response (e.g. no output on a fault, or on a 500 error) are skipped
+            faults = [soapy.unmarshal.ResponseElement(found[name]) for name in fault_names if found[name] is not None]
+            outputs = [soapy.unmarshal.ResponseElement(found[name]) for name in output_names
+                       if found[name] is not None]
+        self.__outputs = tuple(outputs)
+        self.__faults = tuple(faults)
+        if self.__metrics is not None:
+            self.__metrics.timings["parse"] = time.perf_counter() - start
+            soapy.metrics.notify(self.__client.metrics, "parse", self.__metrics)
+
+    @property
+    def outputs(self) -> tuple:
+        """
+        The output parts found in the response, as soapy.unmarshal.ResponseElement objects, which can be navigated
+        like BeautifulSoup tags
+        """
+        if self.__outputs is None:
+            self._parse()
+        return self.__outputs
+
+    @property
+    def faults(self) -> tuple:
+        """
+        The fault parts found in the response, as soapy.unmarshal.ResponseElement objects
+        """
+        if self.__faults is None:
+            self._parse()
+        return self.__faults
 
     def __bool__(self):
         if not self.__response.ok:
@@ -471,8 +904,31 @@ class Response:
         except KeyError:
             return None
 
+    def iter_records(self, path: str):
+
+        """ Yield each element at path in the output, one at a time, decoded as by soapy.unmarshal.decode. The path
+        is relative to the output part, with the names of the elements separated by "/", e.g. "record" for the
+        record elements directly in the output part, or "records/record" for those within its records element.
+
+        The response is read incrementally, and each element is freed once it has been decoded, so memory stays flat
+        however many records there are. Call the Client with stream=True so the body is read from the connection,
+        rather than downloaded as a whole first. Once the records have been read, the body is no longer available
+        (unless it was used before, e.g. through outputs), so iterate the records of a streamed response only once """
+
+        output_names = [self._part_name(part) for part in self.__client.operation.output.parts]
+        try:
+            yield from soapy.unmarshal.iter_records(self.__response.iter_content(self.chunk_size),
+                                                    output_names,
+                                                    [name for name in path.split("/") if name])
+        finally:
+            self.__response.close()
+
     @property
     def bsResponse(self):
+        """ The whole response parsed by BeautifulSoup. This is only built if used, as it is far more expensive than
+        outputs and faults """
+        if self.__bsResponse is None:
+            self.__bsResponse = BeautifulSoup(self.text, "xml" if self.isXml else "lxml")
         return self.__bsResponse
 
     @property
@@ -490,7 +946,7 @@ class Response:
                 for child in output.children:
                     self._recursive_extract_significant_children(child, simple_outputs)
             self.__simple_outputs = simple_outputs
-            logger.debug("Significant outputs identified: {0}".format(simple_outputs))
+            logger.debug("Significant outputs identified: %s", simple_outputs)
         return self.__simple_outputs
 
     @property
@@ -507,20 +963,20 @@ class Response:
                 for child in fault.children:
                     self._recursive_extract_significant_children(child, simple_faults)
             self.__simple_faults = simple_faults
-            logger.debug("Significant faults identified: {}".format(simple_faults))
+            logger.debug("Significant faults identified: %s", simple_faults)
         return self.__simple_faults
 
     @staticmethod
-    def _recursive_extract_significant_children(bsElement: Tag, d: dict, parent=None) -> None:
+    def _recursive_extract_significant_children(bsElement, d: dict, parent=None) -> None:
 
         """
-        :param bsElement: BeautifulSoup Tag from the response output
+        :param bsElement: ResponseElement (or BeautifulSoup Tag) from the response output
         :param d: Dictionary to be updated with values
-        :param parent: Parent BeautifulSoup tag, if applicable
+        :param parent: Parent element, if applicable
         :return:
         """
 
-        if not isinstance(bsElement, Tag):
+        if isinstance(bsElement, str):
             return
         if bsElement.string is not None:
             name = bsElement.name
@@ -1,6 +1,11 @@
-""" A class representation of all possible input types """
+""" A class representation of all possible input types
+
+ A request may have thousands of inputs, so the input classes define __slots__ instead of carrying a __dict__ each.
+ Collection inherits from both Repeatable and Container, and only one base of a class may add slots, so the private
+ state of Container and Repeatable (and of the attribute mixin) is declared in the slots of Base. """
 
 import logging
+from dataclasses import fields, is_dataclass
 from os import linesep
 from xml.sax.saxutils import quoteattr
 
@@ -8,25 +13,37 @@ from xml.sax.saxutils import quoteattr
 logger = logging.getLogger(__name__)
 
 
+def as_mapping(value):
+
+    """ Return the fields of a dataclass instance as a dict (of the field values as they are, not converted
+    recursively), and any other value unchanged. Lets dataclasses be used wherever a mapping of values is accepted """
+
+    if is_dataclass(value) and not isinstance(value, type):
+        return dict((field.name, getattr(value, field.name)) for field in fields(value))
+    return value
+
+
 class Base:
 
+    __slots__ = ("__parent", "__name", "__depth", "__min_occurs", "__ref", "__empty", "__inner_xml", "__source",
+                 "_AttributableMixin__attrs", "_Container__children", "_Container__named", "_Repeatable__elements")
+
     def __init__(self, name, parent, wsdl_type, update_parent=True):
         self.__parent = parent
         self.__name = name
-        self.__depth = None
-        logger.info("Initializing new {} element with name '{}'".format(self.__class__.__name__, self.name))
+        # The depth is carried down from the parent, which is always built first
+        self.__depth = parent.depth + 1 if parent is not None else 0
+        self.__min_occurs = None
+        self.__inner_xml = None
+        self.__source = None
+        logger.info("Initializing new %s element with name '%s'", self.__class__.__name__, self.name)
         self.__ref = wsdl_type
-        # Run the update method here, so we see any type hints that were provided, or any other needed updates
-        # See wsdl.types.Base.update() for more information
-        self.ref.update()
-        self.__setable = True
-        self.__repeatable = False
         self.__empty = True
         if isinstance(self.parent, Container) and update_parent:
             self.parent.append_child(self)
 
     def __str__(self):
-        doc = self.ref.bs_element.get("docstring", "")
+        doc = self.ref.docstring
         if doc:
             return "{}<!--- {} -->{}".format(self._str_indent, doc, linesep)
         return ""
@@ -59,10 +76,7 @@ class Base:
         input will be ignored, as well as any child objects defined in the WSDL. Instead, the value of
         inner_xml will be used verbatim, in place. """
 
-        try:
-            return self.__inner_xml
-        except AttributeError:
-            return None
+        return self.__inner_xml
 
     @inner_xml.setter
     def inner_xml(self, xml: str):
@@ -74,17 +88,7 @@ class Base:
 
     @property
     def depth(self) -> int:
-        if self.__depth is not None:
-            return self.__depth
-        else:
-            # Determine the depth
-            self.__depth = 0
-
-            def inc(_):
-                self.__depth += 1
-                return self.__depth
-            self._map_parents(inc)
-            return self.__depth
+        return self.__depth
 
     @property
     def setable(self) -> bool:
@@ -93,19 +97,70 @@ class Base:
             InputElement.value = "foo"
         """
 
-        return self.__setable
+        return True
 
     @property
     def repeatable(self):
         """ Indicates whether the element should only appear (at most) once in the rendered document (single value)
         or whether it can accept an iterable value, and will thus be (possibly) repeated in the rendered document """
 
-        return self.__repeatable
+        return False
 
     @property
     def ref(self):
         return self.__ref
 
+    @property
+    def min_occurs(self) -> str:
+        """ The minimum number of times the element must appear in the rendered envelope. This is the min_occurs of
+        the type definition, unless overridden for this input (see RenderOptionsMixin.render_empty). The override
+        does not change the definition, which is shared by every input of that type """
+        if self.__min_occurs is None:
+            return self.ref.min_occurs
+        return self.__min_occurs
+
+    @min_occurs.setter
+    def min_occurs(self, value):
+        self.__min_occurs = str(value)
+
+    def _clone(self, parent, memo: dict):
+
+        """ Return a copy of this input under parent, without initialising it again: the copy shares the definition,
+        and the values are copied. Children (and elements) are only copied the first time they are used, see
+        Factory.clone. memo maps the id of each input copied so far to its copy, so inputs shared by several
+        parents in this tree are shared in the copy too """
+
+        clone = object.__new__(self.__class__)
+        memo[id(self)] = clone
+        clone.__parent = parent
+        clone.__name = self.__name
+        clone.__depth = self.__depth
+        clone.__min_occurs = self.__min_occurs
+        clone.__ref = self.__ref
+        clone.__empty = self.__empty
+        clone.__inner_xml = self.__inner_xml
+        clone.__source = (self, memo)
+        return clone
+
+    def _source(self):
+        """ The input this one was cloned from, or None """
+        return self.__source[0] if self.__source is not None else None
+
+    def _copies(self, inputs) -> list:
+
+        """ Return the copies in this clone of inputs, children (or elements) of the input it was cloned from, copying
+        those that haven't been yet """
+
+        source, memo = self.__source
+        copies = list()
+        for input in inputs:
+            copy = memo.get(id(input))
+            if copy is None:
+                parent = memo.get(id(input.parent), self) if input.parent is not None else None
+                copy = input._clone(parent, memo)
+            copies.append(copy)
+        return copies
+
     def _map_parents(self, func):
         """ Map a function to take action on every parent, recursively, until None is found
         Provided function will be passed the current parent """
@@ -121,10 +176,12 @@ class Base:
 class RenderOptionsMixin:
     """ Mixing for applying methods that alter render behavior beyond simple values, etc """
 
+    __slots__ = ()
+
     def render_empty(self):
         """ Configures the element to be included in the rendered envelope even when empty and min_occurs = 0"""
-        logger.info("Setting Element {} to be rendered even when empty".format(self.name))
-        self.ref.min_occurs = "1"
+        logger.info("Setting Element %s to be rendered even when empty", self.name)
+        self.min_occurs = "1"
         if isinstance(self.parent, RenderOptionsMixin):
             self.parent.render_empty()
 
@@ -132,12 +189,14 @@ class RenderOptionsMixin:
 class AttributableMixin:
     """ Mixin supplying attribute retrieval and setting to input elements that support attributes """
 
+    # The attributes are held in a slot of Base
+    __slots__ = ()
+
     def __init__(self):
-        attrs = list()
-        attributes = self.ref.attributes
-        for attr in attributes:
-            attrs.append(Attribute(attr.name, attr.default))
-        self.__attrs = tuple(attrs)
+        self.__attrs = tuple(Attribute(attr.name, attr.default) for attr in self.ref.attributes)
+
+    def _clone_attributes(self, clone) -> None:
+        clone.__attrs = tuple(attr.copy() for attr in self.__attrs)
 
     @property
     def attributes(self) -> tuple:
@@ -153,6 +212,13 @@ class AttributableMixin:
     def keys(self):
         return tuple([attr.name for attr in self.attributes])
 
+    def _load_attributes(self, mapping: dict) -> None:
+        """ Set the attributes named by the '@name' keys of mapping """
+        for attr in self.attributes:
+            value = mapping.get("@" + attr.name)
+            if value is not None:
+                attr.value = value
+
     def __getitem__(self, item):
         """ retrieves the attribute on the element in bs4-style """
         for attr in self.attributes:
@@ -164,6 +230,8 @@ class AttributableMixin:
 class Element(Base, AttributableMixin, RenderOptionsMixin):
     """ A base input Element is capable of being assigned a value ('setable') and is not repeatable """
 
+    __slots__ = ("__value",)
+
     def __init__(self, name, parent, wsdl_type, update_parent=True):
         super().__init__(name, parent, wsdl_type, update_parent)
         self.__value = None
@@ -180,9 +248,15 @@ class Element(Base, AttributableMixin, RenderOptionsMixin):
 
     @classmethod
     def from_sibling(cls, sib):
-        logger.info("Creating new {} Element from sibling, {}".format(sib.__class__.__name__, sib.name))
+        logger.info("Creating new %s Element from sibling, %s", sib.__class__.__name__, sib.name)
         return cls(sib.name, sib.parent, sib.ref, False)
 
+    def _clone(self, parent, memo: dict):
+        clone = super()._clone(parent, memo)
+        clone.__value = self.__value
+        self._clone_attributes(clone)
+        return clone
+
     @property
     def value(self) -> str:
         """ The current value (defaults to None-type) of the input Element, and the value that will be used in the
@@ -200,28 +274,90 @@ class Element(Base, AttributableMixin, RenderOptionsMixin):
             else:
                 self.__value = value
 
+    def load(self, value) -> None:
+        """ Set the value, or if value is a mapping, the attributes from its '@name' keys and the value from its
+        '#text' key. Unlike assigning to value, loading None clears the value. See Factory.load """
+        value = as_mapping(value)
+        if isinstance(value, dict):
+            self._load_attributes(value)
+            if "#text" not in value:
+                return
+            value = value["#text"]
+        if value is None:
+            self.__value = None
+        else:
+            self.value = value
+
 
 class Container(Base, AttributableMixin, RenderOptionsMixin):
     """ Container elements only contain other elements, and possibly attributes. The can not be set themselves, or
     repeated more than once. They contain attributes that map to other input Elements. """
 
+    # The children are held in slots of Base
+    __slots__ = ()
+
     def __init__(self, name, parent, wsdl_type, update_parent=True):
+        self.__children = list()
+        # The children by attribute name
+        self.__named = dict()
         super().__init__(name, parent, wsdl_type, update_parent)
         AttributableMixin.__init__(self)
-        self.__setable = False
-        self.__children = list()
+
+    def __getattr__(self, item):
+        """ Child inputs are attributes of their Container. Only called for names that aren't found otherwise """
+        named = self._named(item)
+        if item in named:
+            return named[item]
+        raise AttributeError("{} object has no attribute {}".format(self.__class__.__name__, item))
 
     def __setattr__(self, key, value):
         """ implementation allows settings child Element values without having to reference the .value attribute
         on the Element, but can set the Element inside the parent Container and the .value attribute will be set
         """
-        if key in self.__dict__:
-            if isinstance(self.__dict__[key], Element):
-                self.__dict__[key].value = value
-            else:
-                self.__dict__[key] = value
+        # Children are never named like the attributes of the class (see append_child)
+        if hasattr(self.__class__, key):
+            object.__setattr__(self, key, value)
+            return
+        child = self._named(key).get(key)
+        if isinstance(child, Element):
+            child.value = value
+        elif child is not None:
+            self._named()[key] = value
         else:
-            self.__dict__[key] = value
+            object.__setattr__(self, key, value)
+
+    def _named(self, name=None) -> dict:
+
+        """ The children by attribute name. Empty while the Container is being initialised. If this is a clone whose
+        children haven't been used yet, they are copied first, unless a name is given: then only the child of that
+        name is copied, and a dict of just that child is returned """
+
+        try:
+            named = object.__getattribute__(self, "_Container__named")
+        except AttributeError:
+            return {}
+        if named is None:
+            if name is not None:
+                child = self._source()._named(name).get(name)
+                if not isinstance(child, Base):
+                    return {}
+                return {name: self._copies((child,))[0]}
+            self._copy_children()
+            named = self.__named
+        return named
+
+    def _copy_children(self) -> None:
+        source = self._source()
+        self.__children = self._copies(source.children)
+        self.__named = dict((name, self._copies((child,))[0] if isinstance(child, Base) else child)
+                            for name, child in source._named().items())
+
+    def _clone(self, parent, memo: dict):
+        clone = super()._clone(parent, memo)
+        self._clone_attributes(clone)
+        clone.__children = None
+        clone.__named = None
+        return clone
 
     def __str__(self):
         return "{5}{4}<{0} {1}>{3}{2}{3}{4}</{0}>".format(self.name, " ".join(str(attr) for attr in self.attributes),
@@ -233,47 +369,71 @@ class Container(Base, AttributableMixin, RenderOptionsMixin):
 
     @classmethod
     def from_sibling(cls, sib):
-        logger.info("Creating new {} Element from sibling, {}".format(sib.__class__.__name__, sib.name))
+        logger.info("Creating new %s Element from sibling, %s", sib.__class__.__name__, sib.name)
         new = cls(sib.name, sib.parent, sib.ref, False)
         # Duplicate this process for each child element
         for child in sib.children:
-            logger.debug("Appending child {} to new {}".format(child.name, sib.__class__.__name__))
+            logger.debug("Appending child %s to new %s", child.name, sib.__class__.__name__)
             new.append_child(child.from_sibling(child))
         return new
 
     @property
     def setable(self):
-        return self.__setable
+        return False
 
     @property
     def children(self):
+        if self.__children is None:
+            self._copy_children()
         return self.__children
 
     def append_child(self, child: Element):
-        logger.debug("Appending child with name {} to {}".format(child.name, self.name))
+        logger.debug("Appending child with name %s to %s", child.name, self.name)
+        named = self._named()
         name = child.name
-        if child.name in dir(self):
+        if name in named or hasattr(self.__class__, name):
             name = "_"+child.name
-        setattr(self, name, child)
+        named[name] = child
         self.children.append(child)
 
+    def load(self, mapping) -> None:
+        """ Load the values of the children named by the keys of mapping, and the attributes from its '@name' keys.
+        See Factory.load """
+        mapping = as_mapping(mapping)
+        if mapping is None:
+            return
+        if not isinstance(mapping, dict):
+            raise ValueError("Values for {} {} must be a mapping, not {}".format(
+                self.__class__.__name__, self.name, mapping.__class__.__name__))
+        self._load_attributes(mapping)
+        unexpected = set(key for key in mapping if not key.startswith(("@", "#")))
+        for child in self.children:
+            if child.name in mapping:
+                child.load(mapping[child.name])
+                unexpected.discard(child.name)
+        if unexpected:
+            raise ValueError("{} {} has no child elements named {}".format(
+                self.__class__.__name__, self.name, ", ".join(sorted(unexpected))))
+
 
 class Repeatable(Base):
     """ Repeatable Elements are like normal elements, except their values are left as iterables, not scalars """
 
+    # The elements are held in a slot of Base
+    __slots__ = ()
+
     def __init__(self, name, parent, wsdl_type, update_parent=True):
         super().__init__(name, parent, wsdl_type, update_parent)
-        self.__repeatable = True
         # We need to initialize the zeroth element in our array to be an Element with the same name
         self.__elements = list()
         self.append()
 
     def __getitem__(self, item: int) -> Element:
-        return self.__elements[item]
+        return self.elements[item]
 
     def __setitem__(self, key, value):
         if isinstance(key, int):
-            self.__elements[key].value = value
+            self.elements[key].value = value
         else:
             raise ValueError("Subscript values for {} object must be integers. Invalid: {}"
                              .format(self.__class__.__name__, value))
@@ -291,57 +451,84 @@ class Repeatable(Base):
 
     @property
     def elements(self) -> list:
+        if self.__elements is None:
+            self.__elements = self._copies(self._source().elements)
         return self.__elements
 
     @property
     def repeatable(self):
-        return self.__repeatable
+        return True
+
+    @Base.min_occurs.setter
+    def min_occurs(self, value):
+        # The elements are rendered in place of the Repeatable, so they share its min_occurs
+        Base.min_occurs.fset(self, value)
+        for element in self.elements:
+            element.min_occurs = value
 
     @classmethod
     def from_sibling(cls, sib):
-        logger.info("Creating new {} Element from sibling, {}".format(sib.__class__.__name__, sib.name), 4)
+        logger.info("Creating new %s Element from sibling, %s", sib.__class__.__name__, sib.name)
         new = cls(sib.name, sib.parent, sib.ref, False)
         return new
 
+    def _clone(self, parent, memo: dict):
+        clone = super()._clone(parent, memo)
+        clone.__elements = None
+        return clone
+
     def append(self, value=None) -> None:
         """ Append a new child to the list, providing an optional value. If value is not provided, then an empty new
         element will be created (which could be set using .value later) """
         element = Element.from_sibling(self)
-        logger.debug("Appending new Element to Repeatable {}".format(self.name))
+        element.min_occurs = self.min_occurs
+        logger.debug("Appending new Element to Repeatable %s", self.name)
         element.value = value
-        logger.debug("Set new Element {} value to '{}'".format(self.name, value))
-        self.__elements.append(element)
+        logger.debug("Set new Element %s value to '%s'", self.name, value)
+        self.elements.append(element)
 
     def extend(self, *args) -> None:
         """ Extend the list of elements with new elements based on an iterable of values """
-        logger.info("Extending new set of values to {}".format(self.name))
+        logger.info("Extending new set of values to %s", self.name)
         for value in args:
-            logger.debug("Creating new Element with value '{}' in '{}'".format(value, self.name))
+            logger.debug("Creating new Element with value '%s' in '%s'", value, self.name)
             element = Element.from_sibling(self)
+            element.min_occurs = self.min_occurs
             element.value = value
-            self.__elements.append(element)
+            self.elements.append(element)
+
+    def load(self, values) -> None:
+        """ Load a list of values, one per element, adding elements as needed and removing those beyond the last
+        value (a single element is always kept). A value that is not a list or tuple is loaded as a list of one value.
+        See Factory.load """
+        if not isinstance(values, (list, tuple)):
+            values = [values]
+        for index, value in enumerate(values):
+            if index == len(self.elements):
+                self.append()
+            self.elements[index].load(value)
+        del self.elements[max(len(values), 1):]
 
 
 class Collection(Repeatable, Container):
     """ Collections hold a list of repeatable Containers
     The Collection interface is defined by being repeatable but not setable."""
 
-    def __init__(self, name, parent, wsdl_type, update_parent=True):
-        super().__init__(name, parent, wsdl_type, update_parent)
-        self.__repeatable = True
-        self.__collection = {}
+    __slots__ = ()
 
-    def append(self, value=dict()):
+    def append(self, value=None):
         """ Append a new child Container to the list of elements for this Collection. Values may be provided as a
         dictionary, with keys matching the child element names. If not provided, then an empty container will be
         created. """
-        logger.info("Appending new child Container to '{}'".format(self.name))
+        logger.info("Appending new child Container to '%s'", self.name)
         container = Container.from_sibling(self)
+        container.min_occurs = self.min_occurs
+        container.load(value)
         self.elements.append(container)
 
     def append_child(self, child: Element):
         super().append_child(child)
-        logger.debug("Appending new child {1} to elements in Collection {0}".format(self.name, child.name))
+        logger.debug("Appending new child %s to elements in Collection %s", child.name, self.name)
         for element in self.elements:
             if isinstance(element, Container):
                 element.append_child(child)
@@ -359,6 +546,8 @@ class Attribute:
     """ An individual attribute of an input Element. A further abstraction of the
     Attribute object in soapy.wsdl.types """
 
+    __slots__ = ("__name", "__value")
+
     def __init__(self, name, value):
         self.__name = name
         if value is not None:
@@ -374,6 +563,13 @@ class Attribute:
     def value(self, value):
         self.__value = quoteattr(str(value))
 
+    def copy(self):
+        """ Return a copy of the attribute, with the same (already quoted) value """
+        copy = Attribute.__new__(Attribute)
+        copy.__name = self.__name
+        copy.__value = self.__value
+        return copy
+
     @property
     def name(self):
         return self.__name
@@ -390,24 +586,11 @@ class Factory:
     """
 
     def __init__(self, root_element):
-        logger.info("Initializing new Factory instance for root element '{}'".format(root_element))
-        elements = list()
-        inputs = list()
-        logger.info("Building list of all elements for this Part")
-        Factory._recursive_extract_elements(elements, root_element)
-        for element in elements:
-            name = element[0].name
-            logger.debug("Processing WSDL element {}".format(name))
-            # Find the parent InputElement to pass to the child if there is a parent
-            if element[1] is not None:
-                for input in inputs:
-                    if element[1] is input.ref:
-                        logger.debug("Setting parent element for {} to '{}'".format(name, input.name))
-                        inputs.append(self._select_class(element)(name, input, element[0]))
-            else:
-                self.root_element = self._select_class(element)(name, None, element[0])
-                inputs.append(self.root_element)
-        self.items = inputs
+        logger.info("Initializing new Factory instance for root element '%s'", root_element)
+        logger.info("Building inputs for all elements of this Part")
+        self.__items = None
+        self.__items = self._build_inputs(root_element)
+        self.root_element = self.__items[0] if self.__items else None
 
     def __getattr__(self, item):
         """ Enable attribute references on Factory object itself to return attributes on root_element instead """
@@ -416,6 +599,107 @@ class Factory:
     def __str__(self):
         return str(self.root_element)
 
+    @property
+    def items(self) -> list:
+        """ Every input object, in document order """
+        if self.__items is None:
+            items = list()
+            stack = [self.root_element] if self.root_element is not None else []
+            while stack:
+                input = stack.pop()
+                items.append(input)
+                if isinstance(input, Container):
+                    stack.extend(reversed(input.children))
+            self.__items = items
+        return self.__items
+
+    def clone(self):
+
+        """ Return a copy of the Factory, to change and render independently of it. Cloning is cheap whatever the
+        size of the request: inputs are copied the first time they are used (read or changed) through the clone, so
+        the cost is in proportion to the inputs used, and the rest are read from this Factory when the clone is
+        rendered. This Factory must therefore not be changed while its clones are in use. To keep a template that
+        may change, clone a snapshot() of it instead, e.g.
+
+            template = client.inputs[0].snapshot()
+            for row in rows:
+                inputs = template.clone()
+                inputs.address.street.value = row.street
+                await async_client.call("updateCustomer", inputs)
+        """
+
+        clone = Factory.__new__(Factory)
+        clone.root_element = self.root_element._clone(None, dict()) if self.root_element is not None else None
+        clone.__items = None
+        return clone
+
+    def snapshot(self):
+
+        """ Return a full copy of the Factory, which (unlike a clone) does not change when this Factory changes. Its
+        clones only read from the snapshot """
+
+        snapshot = self.clone()
+        stack = [snapshot.root_element] if snapshot.root_element is not None else []
+        while stack:
+            input = stack.pop()
+            if isinstance(input, Container):
+                stack.extend(input.children)
+            if isinstance(input, Repeatable):
+                stack.extend(input.elements)
+        return snapshot
+
+    def load(self, values):
+
+        """ Set the values of the inputs from nested mappings in one pass, instead of one attribute at a time, and
+        return the Factory. values follow the format of soapy.marshal.Template: a mapping from child element names to
+        values, where a value is a scalar for simple elements, a mapping for complex elements, and a list of either for
+        repeatable elements (elements are added or removed to match). Attributes are set with '@name' keys, and the
+        value of a simple element with attributes with the '#text' key. Dataclass instances may be used in place of
+        mappings. Raises ValueError for names that are not child elements, e.g.
+
+            client.inputs[0].load({"address": {"street": "Main", "@kind": "work"}, "tag": ["a", "b"]})
+
+        Loading is a partial update: inputs that values doesn't name keep their current values, and None clears the
+        value of a simple element. To load each of many rows from empty inputs, load each into a clone of a snapshot
+        of the empty inputs (see Factory.clone), or pass the values to Client.__call__ or Client.batch instead
+        """
+
+        if self.root_element is None:
+            raise ValueError("There are no inputs to load values into")
+        self.root_element.load(values)
+        return self
+
+    def _build_inputs(self, root_element) -> list:
+
+        """ Create the input object for root_element and each of its descendant elements, in document order, and
+        return them. The definitions are walked depth first with an explicit stack, in a single pass: each input is
+        passed its parent input object directly (type definitions are shared, so the same definition may appear under
+        many parents), and takes its depth from it. The definitions of the ancestors of the element being built are
+        kept in a set, keyed by identity: a recursive type is expanded once, and an element that is its own ancestor
+        is not expanded again """
+
+        inputs = list()
+        if root_element is None:
+            return inputs
+        ancestors = set()
+        # Entries are (definition, parent input) to build, or (None, definition) once its descendants are built
+        stack = [(root_element, None)]
+        while stack:
+            element, parent = stack.pop()
+            if element is None:
+                ancestors.discard(id(parent))
+                continue
+            logger.debug("Processing WSDL element %s", element.name)
+            input = self._select_class((element, parent))(element.name, parent, element)
+            inputs.append(input)
+            ancestors.add(id(element))
+            stack.append((None, element))
+            for child in reversed(element.element_children):
+                if child.bs_element is element.bs_element or id(child) in ancestors:
+                    continue
+                stack.append((child, input))
+        return inputs
+
     def _select_class(self, element):
         """ Return the appropriate input class based on criteria
             Repeatable = setable and repeatable
@@ -435,22 +719,7 @@ class Factory:
             (False, False): Container,
             (False, True): Collection
         }
-        logger.info("Creating {} type for input message element {}".format(
-                  switch[setable, repeatable].__name__,
-                  element[0].name))
+        logger.info("Creating %s type for input message element %s", switch[setable, repeatable].__name__,
+                    element[0].name)
         return switch[setable, repeatable]
 
-    @staticmethod
-    def _recursive_extract_elements(l: list, element, parent=None):
-
-        """ Recursively iterates over soapy.wsdl.types Objects and extracts the
-        TypeElement objects, as they are what actually represent input options """
-
-        if element is None:
-            return
-
-        l.append((element, parent))
-        for child in element.element_children:
-            if child.bs_element is element.bs_element:
-                continue
-            Factory._recursive_extract_elements(l, child, element)
@@ -1,13 +1,35 @@
 """ The early beginnings of a test suite that doesn't use external resources """
 
+import asyncio
+import logging
+import os
+import pickle
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from bs4 import BeautifulSoup
+from requests import Response as HttpResponse
 from requests.auth import HTTPBasicAuth
-from requests.exceptions import ConnectionError
+from requests.exceptions import ConnectionError, ReadTimeout
 
-from soapy.client import Client
+from soapy.client import AsyncClient, Client, RequestContext, Response
+from soapy.inputs import Factory as InputFactory
+from soapy.metrics import MetricsAggregator, MetricsHook
 from soapy.plugins import Doctor, SOAPAttachmentDoctor
+from soapy.pool import OperationSpec, batch as process_batch
+from soapy.transport import HttpTransport
+from soapy.wsdl import Wsdl
+from soapy.wsdl.cache import WsdlCache
+from soapy.wsdl.catalog import Catalog
+from soapy.wsdl.model import Binding, Message
 
 
 class AuthTests(unittest.TestCase):
@@ -21,6 +43,37 @@ class AuthTests(unittest.TestCase):
         self.assertEqual(type(self.client.auth), HTTPBasicAuth)
 
 
+class LoggingTests(unittest.TestCase):
+
+    """ Tests that the trace level is scoped to soapy, and that disabled messages aren't formatted """
+
+    def setUp(self):
+        self.soapy_logger = logging.getLogger("soapy")
+        self.level = self.soapy_logger.level
+        self.addCleanup(self.soapy_logger.setLevel, self.level)
+
+    def test_scoped_trace_level(self):
+        root = logging.getLogger()
+        level, handlers = root.level, list(root.handlers)
+        Client("file://sample.wsdl", 5, "getBank")
+        self.assertEqual(self.soapy_logger.level, logging.DEBUG)
+        self.assertEqual((root.level, root.handlers), (level, handlers), "The root logger should be left alone")
+        Client("file://sample.wsdl", -1, "getBank")
+        self.assertFalse(self.soapy_logger.isEnabledFor(logging.CRITICAL))
+
+    def test_lazy_formatting(self):
+        class Counted:
+            formatted = 0
+
+            def __str__(self):
+                Counted.formatted += 1
+                return "counted"
+
+        client = Client("file://types.wsdl", 2, "updateCustomer")
+        client.inputs[0].tag.append(Counted())  # Logged at debug level
+        self.assertEqual(Counted.formatted, 0, "Messages below the trace level should not be formatted")
+
+
 class InputTests(unittest.TestCase):
 
     """ Tests to validate the rendering and manipulation of inputs """
@@ -33,6 +86,68 @@ class InputTests(unittest.TestCase):
         self.assertEqual(str(self.client.inputs[0]), '<getBank >\r\n |   <blz >Foo</blz>\r\n</getBank>',
                          "InputFactory to-string should return correct 'Foo' value representation")
 
+    def test_slotted_inputs(self):
+        inputs = Client("file://types.wsdl", 2, "updateCustomer").inputs[0]
+        for each in inputs.items:
+            self.assertFalse(hasattr(each, "__dict__"), "Inputs should not carry an instance dict")
+        inputs.address.street = "Main"
+        self.assertEqual(inputs.address.street.value, "Main", "Assigning to a child Element should set its value")
+        self.assertIs(inputs.phone[0].number, inputs.phone.number)
+        with self.assertRaises(AttributeError):
+            inputs.missing
+
+    def test_clone(self):
+        client = Client("file://types.wsdl", 2, "updateCustomer")
+        service, port, operation = client._find_operation("updateCustomer")
+
+        def xml(inputs):
+            return RequestContext(client, service, port, operation, (inputs,)).request_envelope.xml
+
+        template = client.inputs[0]
+        template.id.value = "7"
+        template.address["kind"].value = "work"
+        snapshot = template.snapshot()
+        template.id.value = "8"
+        first = snapshot.clone()
+        first.address.street = "Main"
+        first.tag.extend("a", "b")
+        second = snapshot.clone()
+        second.phone[0].number.value = "1"
+        self.assertIs(second.phone.number, second.phone[0].number)
+        self.assertEqual(xml(first), client.template.render({"id": "7", "address": {"street": "Main", "@kind": "work"},
+                                                             "tag": [None, "a", "b"]}))
+        self.assertEqual(xml(second), client.template.render({"id": "7", "address": {"@kind": "work"},
+                                                              "phone": [{"number": "1"}]}))
+        self.assertEqual(xml(snapshot.clone()), client.template.render({"id": "7", "address": {"@kind": "work"}}),
+                         "Changes to clones should not change the snapshot they were cloned from")
+        self.assertEqual([each.name for each in first.items], [each.name for each in template.items])
+
+    def test_build_order_and_depth(self):
+        inputs = Client("file://types.wsdl", 2, "updateCustomer").inputs[0]
+        self.assertEqual([(each.name, each.depth) for each in inputs.items],
+                         [("updateCustomer", 0), ("id", 1), ("nickname", 1), ("note", 1), ("tag", 1), ("address", 1),
+                          ("street", 2), ("city", 2), ("phone", 1), ("number", 2), ("status", 2)],
+                         "Inputs should be built in document order, each one level below its parent")
+
+    def test_deep_type(self):
+        # Nested deeper than the recursion limit, which a recursive build could not reach
+        depth = sys.getrecursionlimit() + 100
+        types = "".join('<xsd:complexType name="Level{0}"><xsd:sequence>'
+                        '<xsd:element name="field" type="xsd:string"/>{1}</xsd:sequence></xsd:complexType>'
+                        .format(level, '<xsd:element minOccurs="0" name="child" type="tns:Level{0}"/>'
+                                .format(level + 1) if level < depth - 1 else "")
+                        for level in range(depth))
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "deep.wsdl")
+        with open(path, "w") as f:
+            f.write(ImportTests.wsdl.replace('<xsd:import namespace="urn:a" schemaLocation="a.xsd"/>', types)
+                    .replace('<xsd:import namespace="urn:b" schemaLocation="b.xsd"/>', "")
+                    .replace('type="c:CType"', 'type="tns:Level0"'))
+        inputs = Client("file://" + path, 2, "echo", parser="lxml").inputs[0]
+        self.assertEqual(len(inputs.items), 2 * depth + 1, "Every level should be built")
+        self.assertEqual(inputs.items[-1].depth, depth + 1)
+
 
 class RenderTests(unittest.TestCase):
 
@@ -94,10 +209,22 @@ class PluginTests(unittest.TestCase):
     location = "http://examplehost/service.asp"
 
     def failsafe(self, doc):
+        """ Call the client with the doctor, and return a Capture of the context and envelope it left """
+        capture = self.Capture()
         try:
-            self.client(doctors=(doc,))
+            self.client(doctors=(doc, capture))
         except ConnectionError:
             """ Do nothing, we only want to check the plugin behavior """
+        return capture
+
+    class Capture(Doctor):
+
+        """ A doctor that records the context and envelope of the call """
+
+        def __call__(self, client, xml):
+            self.context = client
+            self.xml = xml
+            return xml
 
     class Echo(Doctor):
 
@@ -115,17 +242,19 @@ class PluginTests(unittest.TestCase):
             return xml
 
     def test_echo_plugin(self):
-        init_xml = self.client.request_envelope
+        init_xml = self.client.request_envelope.xml
         doc = self.Echo()
         self.failsafe(doc)
-        self.assertEqual(init_xml, self.client.request_envelope,
+        self.assertEqual(init_xml, self.client.request_envelope.xml,
                          "XML should match before and after NO-OP Doctor plugin")
 
     def test_location_plugin(self):
         doc = self.Loc()
-        self.failsafe(doc)
-        self.assertEqual(self.client.location, self.location,
+        capture = self.failsafe(doc)
+        self.assertEqual(capture.context.location, self.location,
                          "Location should change correctly when Doctor plugin changes it")
+        self.assertEqual(self.client.location, "http://examplehost/fakeserver",
+                         "Doctors should change the location of their call only")
 
     def test_attachment_plugin(self):
         doc = SOAPAttachmentDoctor([
@@ -133,10 +262,894 @@ class PluginTests(unittest.TestCase):
                 "file": "sample.wsdl",
             }
         ])
-        self.failsafe(doc)
-        header, boundary = self.client.headers['Content-Type'].split(" boundary=")
+        capture = self.failsafe(doc)
+        header, boundary = capture.context.headers['Content-Type'].split(" boundary=")
         boundary = boundary.replace('"', '')
         self.assertTrue(header.startswith("multipart/related;"),
                         "Attachment Doctor should set Content-Type header correctly")
-        self.assertTrue(boundary in self.client.request_envelope.xml,
+        self.assertTrue(boundary in capture.xml,
                         "Boundary should be correctly rendered in the request payload.")
+        self.assertEqual(self.client.headers, {"Content-Type": "text/xml;charset=UTF-8"},
+                         "Doctors should change the headers of their call only")
+
+
+class ModelTests(unittest.TestCase):
+    """ Tests for the lookups of the WSDL model """
+
+    def test_shared_definitions(self):
+        client = Client("file://sample.wsdl", 2, "getBank")
+        wsdl = client.wsdl
+        self.assertIs(Message.from_name("getBank", wsdl), client.operation.input,
+                      "Looking up a definition should always return the same model object")
+        self.assertIs(Binding.from_name(client.port.binding.name, wsdl), client.port.binding)
+        self.assertIsNone(Message.from_name("noSuchMessage", wsdl))
+        self.assertEqual(client.port.binding.get_soap_action("getBank"), "")
+        self.assertIsNone(client.port.binding.get_soap_action("noSuchOperation"))
+
+    def test_facets(self):
+        client = Client("file://types.wsdl", 2, "updateCustomer")
+        status = client.inputs[0].phone.status.ref
+        attrs = dict(status.bs_element.attrs)
+        for _ in range(3):
+            Client("file://types.wsdl", 2, "updateCustomer").inputs[0].phone.status.value = "active"
+            client.request_envelope.render()
+        self.assertEqual(status.enums, ("active", "inactive"), "Enumerations should be consolidated once")
+        self.assertEqual(status.docstring, "Whether the number is in use")
+        self.assertEqual(status.bs_element.attrs, attrs, "Consolidating facets should not change the document")
+        self.assertIn("Enum hints: ('active', 'inactive')", str(client.inputs[0]))
+
+    def test_shared_types(self):
+        client = Client("file://types.wsdl", 2, "findCustomers")
+        inputs = client.inputs[0]
+        self.assertIs(inputs.near.ref.children[-1], inputs.within.ref.children[-1],
+                      "Elements of the same type should share the resolved type")
+        self.assertIs(inputs.near.street.ref, inputs.within.street.ref)
+
+    def test_recursive_type(self):
+        client = Client("file://types.wsdl", 2, "findCustomers")
+        search = client.inputs[0].filter
+        self.assertEqual([each.name for each in search.children], ["field", "value", "and"])
+        self.assertEqual([each.name for each in getattr(search, "and").children], ["field", "value"],
+                         "A recursive type should be expanded once")
+        # Inputs built again from the same Wsdl have the same shape
+        again = InputFactory(client.operation.input.parts[0].type)
+        self.assertEqual([each.name for each in again.items], [each.name for each in client.inputs[0].items])
+
+    def test_shared_type_children(self):
+        for path in ("recursive", "direct"):
+            wsdl = Wsdl("file://types.wsdl")
+            filter_type = wsdl.find_type_by_name("FilterType", "http://example.com/customers/", ("complexType",))
+            search = wsdl.find_type_by_name("findCustomers", "http://example.com/customers/", ("element",))
+            nested = filter_type.element_children[-1]
+            if path == "recursive":
+                # Resolve the type through the element that recurses into it first
+                nested.element_children
+            self.assertEqual([each.name for each in filter_type.element_children], ["field", "value", "and"],
+                             "The children of a shared type should not depend on the path that resolved it")
+            self.assertEqual(nested.element_children, search.element_children[0].element_children)
+
+    def test_render_empty_is_per_input(self):
+        client = Client("file://types.wsdl", 2, "findCustomers")
+        first = client.inputs[0]
+        second = InputFactory(client.operation.input.parts[0].type)
+        first.near.city.render_empty()
+        self.assertEqual(first.near.city.min_occurs, "1")
+        self.assertEqual(second.near.city.min_occurs, "0",
+                         "render_empty should not change other inputs of the same type")
+        self.assertEqual(first.within.city.min_occurs, "0")
+
+
+class NotificationTests(unittest.TestCase):
+    """ Tests for a WSDL with a notification operation: output only, and no soap:operation in its binding """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.wsdl = os.path.join(self.directory, "types.wsdl")
+        with open("types.wsdl") as f:
+            text = f.read()
+        text = text.replace("    </wsdl:portType>", """        <wsdl:operation name="notify">
+            <wsdl:output message="tns:updateCustomerResponse"/>
+        </wsdl:operation>
+    </wsdl:portType>""")
+        text = text.replace("    </wsdl:binding>", """        <wsdl:operation name="notify">
+            <wsdl:output>
+                <soap:body use="literal"/>
+            </wsdl:output>
+        </wsdl:operation>
+    </wsdl:binding>""")
+        with open(self.wsdl, "w") as f:
+            f.write(text)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_soap_actions(self):
+        for parser in ("bs4", "lxml"):
+            client = Client("file://" + self.wsdl, 2, "updateCustomer", parser=parser)
+            binding = client.port.binding
+            self.assertEqual(binding.get_soap_action("updateCustomer"), "http://example.com/customers/update")
+            self.assertIsNone(binding.get_soap_action("notify"),
+                              "An operation without soap:operation should not have a soapAction")
+            client.inputs[0].id.value = "1"
+            self.assertIn("<tns:id>1</tns:id>", client.request_envelope.xml)
+
+    def test_preload(self):
+        client = Client("file://" + self.wsdl, 2).preload()
+        client.operation = "findCustomers"
+        client.template.render({})
+
+
+class ParserTests(unittest.TestCase):
+    """ Tests that WSDLs parsed with lxml give the same model as those parsed with BeautifulSoup """
+
+    def test_same_envelope(self):
+        envelopes = list()
+        for parser in Wsdl.supported_parsers:
+            client = Client("file://types.wsdl", 2, "updateCustomer", parser=parser)
+            client.inputs[0].id.value = "1"
+            client.inputs[0].phone[0].status.value = "active"
+            envelopes.append((str(client.inputs[0]), client.request_envelope.xml))
+        self.assertEqual(envelopes[0], envelopes[1])
+
+    def test_no_temporary_file(self):
+        before = set(os.listdir("."))
+        for parser in Wsdl.supported_parsers:
+            Client("file://sample.wsdl", 2, "getBank", parser=parser)
+        self.assertEqual(set(os.listdir(".")), before, "WSDLs should be parsed in memory")
+
+    def test_invalid_parser(self):
+        with self.assertRaises(ValueError):
+            Wsdl("file://sample.wsdl", parser="html")
+
+
+class ImportTests(unittest.TestCase):
+    """ Tests that imported schemas are fetched once each, including diamond and cyclic imports """
+
+    wsdl = """<?xml version="1.0"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/" xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+ xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/" xmlns:tns="urn:root" xmlns:c="urn:c" targetNamespace="urn:root">
+<wsdl:types><xsd:schema elementFormDefault="qualified" targetNamespace="urn:root">
+<xsd:import namespace="urn:a" schemaLocation="a.xsd"/>
+<xsd:import namespace="urn:b" schemaLocation="b.xsd"/>
+<xsd:element name="echo"><xsd:complexType><xsd:sequence>
+<xsd:element name="value" type="c:CType"/></xsd:sequence></xsd:complexType></xsd:element>
+</xsd:schema></wsdl:types>
+<wsdl:message name="echo"><wsdl:part name="parameters" element="tns:echo"/></wsdl:message>
+<wsdl:portType name="EchoPortType"><wsdl:operation name="echo"><wsdl:input message="tns:echo"/>
+<wsdl:output message="tns:echo"/></wsdl:operation></wsdl:portType>
+<wsdl:binding name="EchoBinding" type="tns:EchoPortType">
+<soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+<wsdl:operation name="echo"><soap:operation soapAction="echo"/><wsdl:input><soap:body use="literal"/></wsdl:input>
+<wsdl:output><soap:body use="literal"/></wsdl:output></wsdl:operation></wsdl:binding>
+<wsdl:service name="EchoService"><wsdl:port name="EchoPort" binding="tns:EchoBinding">
+<soap:address location="http://localhost/echo"/></wsdl:port></wsdl:service>
+</wsdl:definitions>"""
+
+    schema = """<?xml version="1.0"?>
+<xsd:schema xmlns:xsd="http://www.w3.org/2001/XMLSchema" targetNamespace="urn:{0}">{1}</xsd:schema>"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, "sub"))
+        files = {
+            "service.wsdl": self.wsdl,
+            "a.xsd": self.schema.format("a", '<xsd:import namespace="urn:c" schemaLocation="c.xsd"/>'),
+            # Imports c.xsd by another spelling of its location, and c.xsd imports a.xsd back
+            "b.xsd": self.schema.format("b", '<xsd:import namespace="urn:c" schemaLocation="sub/../c.xsd"/>'),
+            "c.xsd": self.schema.format("c", '<xsd:import namespace="urn:a" schemaLocation="./a.xsd"/>'
+                                             '<xsd:complexType name="CType"><xsd:sequence>'
+                                             '<xsd:element name="text" type="xsd:string"/>'
+                                             '</xsd:sequence></xsd:complexType>'),
+        }
+        for name, text in files.items():
+            with open(os.path.join(self.directory, name), "w") as f:
+                f.write(text)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_each_document_once(self):
+        client = Client("file://" + os.path.join(self.directory, "service.wsdl"), 2, "echo")
+        wsdl = client.wsdl
+        self.assertEqual([schema.name for schema in wsdl.schemas], ["urn:root", "urn:a", "urn:c", "urn:b"],
+                         "Schemas should be in depth first order, each imported document once")
+        urls = [document.url for document in wsdl.documents]
+        self.assertEqual(len(urls), 4, "The WSDL and each of the 3 schemas should be read once")
+        self.assertEqual(set(urls), set(wsdl.timings))
+        client.inputs[0].value.text.value = "hello"
+        self.assertIn("hello</", client.request_envelope.xml)
+
+
+class CacheTests(unittest.TestCase):
+    """ Tests for loading the WSDL documents from the on-disk cache """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.wsdl = os.path.join(self.directory, "sample.wsdl")
+        shutil.copy("sample.wsdl", self.wsdl)
+        self.cache = WsdlCache(os.path.join(self.directory, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def client(self):
+        client = Client("file://" + self.wsdl, 2, "getBank", cache=self.cache)
+        client.inputs[0].blz.value = "test"
+        return client
+
+    def test_warm_start(self):
+        cold = self.client()
+        warm = self.client()
+        self.assertFalse(cold.wsdl.from_cache, "First client should download and parse the WSDL")
+        self.assertTrue(warm.wsdl.from_cache, "Second client should load the WSDL from the cache")
+        self.assertEqual(cold.request_envelope.xml, warm.request_envelope.xml,
+                         "Envelopes rendered from a cached WSDL should match those from a parsed WSDL")
+
+    def test_invalidation(self):
+        self.client()
+        with open(self.wsdl) as f:
+            text = f.read()
+        with open(self.wsdl, "w") as f:
+            f.write(text.replace('name="blz"', 'name="bankleitzahl"'))
+        os.utime(self.wsdl, (0, 0))
+        client = Client("file://" + self.wsdl, 2, "getBank", cache=self.cache)
+        self.assertFalse(client.wsdl.from_cache, "Changed WSDL should not be loaded from the cache")
+        self.assertEqual(client.inputs[0].items[1].name, "bankleitzahl")
+
+    def test_cdata(self):
+        with open(self.wsdl) as f:
+            text = f.read()
+        with open(self.wsdl, "w") as f:
+            f.write(text.replace(">BLZService</wsdl:documentation>", "><![CDATA[BLZ <Service>]]></wsdl:documentation>"))
+        cold = self.client()
+        warm = self.client()
+        self.assertTrue(warm.wsdl.from_cache, "Second client should load the WSDL from the cache")
+        self.assertEqual(warm.wsdl.wsdl("documentation")[0].text, cold.wsdl.wsdl("documentation")[0].text,
+                         "CDATA text should survive the cache")
+
+    def test_eviction(self):
+        self.client()
+        self.cache.max_size = 0
+        self.cache.evict()
+        self.assertEqual(self.cache.size, 0, "Entries over the size limit of the cache should be evicted")
+
+
+class PreloadTests(unittest.TestCase):
+    """ Tests for resolving the model up front, before forking workers """
+
+    def test_preload(self):
+        client = Client("file://types.wsdl", 2).preload()
+
+        def resolve(*args):
+            raise AssertionError("Preloaded types should not be resolved again")
+
+        client.wsdl.type_factory = resolve
+        for operation in client.wsdl.services[0].ports[0].binding.type.operations:
+            client.operation = operation.name
+            client.inputs
+            client.template.render({})
+            client.request_envelope
+
+    @unittest.skipUnless(hasattr(os, "fork"), "Requires os.fork")
+    def test_fork_discards_transports(self):
+        shared = HttpTransport.shared("http://127.0.0.1/service")
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if HttpTransport.shared("http://127.0.0.1/service") is not shared else 1)
+        self.assertEqual(os.waitpid(pid, 0)[1], 0, "A forked process should not reuse the transports of its parent")
+        self.assertIs(HttpTransport.shared("http://127.0.0.1/service"), shared)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """ Answers every POST with a canned getBank response naming the requested blz, keeping the connection alive """
+
+    protocol_version = "HTTP/1.1"
+    # Seconds to wait before answering, to simulate the latency of a real service
+    delay = 0
+    body = """<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/">
+<soapenv:Body>
+<ns1:getBankResponse xmlns:ns1="http://thomas-bayer.com/blz/">
+<ns1:details><ns1:bezeichnung>Stub Bank {0}</ns1:bezeichnung><ns1:plz>12345</ns1:plz></ns1:details>
+</ns1:getBankResponse>
+</soapenv:Body>
+</soapenv:Envelope>"""
+
+    def read_body(self) -> bytes:
+        """ Read the request body, sent with a Content-Length or with chunked transfer encoding """
+        if self.headers.get("Transfer-Encoding") != "chunked":
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        chunks = list()
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+            if not size:
+                return b"".join(chunks)
+
+    def do_POST(self):
+        request = self.read_body().decode("utf-8")
+        blz = re.search(r"<tns:blz>(.*)</tns:blz>", request)
+        body = self.body.format(blz.group(1) if blz else "").encode("utf-8")
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """ Keep test output quiet """
+
+
+class StubServerMixin:
+    """ Runs a local StubHandler server for the duration of the test case """
+
+    handler = StubHandler
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), cls.handler)
+        cls.location = "http://127.0.0.1:{0}/service".format(cls.server.server_port)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+
+class RecordStubHandler(StubHandler):
+    """ Answers with an updateCustomer response of many records, written in pieces """
+
+    records = 5000
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        record = "<tns:record><tns:key>{0}</tns:key><tns:value>value {0}</tns:value></tns:record>"
+        pieces = ['<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"><soapenv:Body>'
+                  '<tns:updateCustomerResponse xmlns:tns="http://example.com/customers/"><tns:result>ok</tns:result>']
+        pieces.extend(record.format(i) for i in range(self.records))
+        pieces.append("</tns:updateCustomerResponse></soapenv:Body></soapenv:Envelope>")
+        pieces = [piece.encode("utf-8") for piece in pieces]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml;charset=UTF-8")
+        self.send_header("Content-Length", str(sum(len(piece) for piece in pieces)))
+        self.end_headers()
+        for piece in pieces:
+            self.wfile.write(piece)
+
+
+class RecordStreamTests(StubServerMixin, unittest.TestCase):
+    """ Tests for reading the records of a response as they are streamed """
+
+    handler = RecordStubHandler
+
+    def test_streamed_records(self):
+        client = Client("file://types.wsdl", 2, "updateCustomer")
+        client.location = self.location
+        client.inputs[0].id.value = "1"
+        response = client(stream=True)
+        count = 0
+        for count, record in enumerate(response.iter_records("record"), 1):
+            self.assertEqual(record, {"key": str(count - 1), "value": "value {0}".format(count - 1)})
+        self.assertEqual(count, RecordStubHandler.records, "Every record should be yielded once")
+
+
+class DocumentStubHandler(StubHandler):
+    """ Serves the documents of ImportTests over GET, counting the requests """
+
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        files = {"/service.wsdl": ImportTests.wsdl,
+                 "/a.xsd": ImportTests.schema.format("a", '<xsd:import namespace="urn:c" schemaLocation="c.xsd"/>'),
+                 "/b.xsd": ImportTests.schema.format("b", ""),
+                 "/c.xsd": ImportTests.schema.format("c", '<xsd:complexType name="CType"><xsd:sequence>'
+                                                          '<xsd:element name="text" type="xsd:string"/>'
+                                                          '</xsd:sequence></xsd:complexType>')}
+        body = files.get(self.path, "").encode("utf-8")
+        self.send_response(200 if self.path in files else 404)
+        self.send_header("Content-Type", "text/xml;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class CatalogTests(StubServerMixin, unittest.TestCase):
+    """ Tests for reading documents from a local catalog instead of the network """
+
+    handler = DocumentStubHandler
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.url = self.location.replace("/service", "/service.wsdl")
+        DocumentStubHandler.requests = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_write_through(self):
+        wsdl = Wsdl(self.url, catalog=self.directory)
+        self.assertEqual([schema.name for schema in wsdl.schemas], ["urn:root", "urn:a", "urn:c", "urn:b"])
+        self.assertEqual(DocumentStubHandler.requests, 4)
+        offline = Wsdl(self.url, catalog=Catalog(directory=self.directory, offline=True))
+        self.assertEqual([schema.name for schema in offline.schemas], ["urn:root", "urn:a", "urn:c", "urn:b"])
+        self.assertEqual(DocumentStubHandler.requests, 4, "Every document should be read from the catalog")
+        self.assertTrue(all(document.url.startswith("file://") for document in offline.documents))
+
+    def test_offline_miss(self):
+        with self.assertRaises(ValueError):
+            Wsdl(self.url, catalog=Catalog(directory=self.directory, offline=True)).wsdl
+        self.assertEqual(DocumentStubHandler.requests, 0)
+
+    def test_catalog_file(self):
+        """ Namespaces are mapped to local files wherever they are imported from, and URL prefixes to directories """
+        local = ImportTests.schema.format("c", '<xsd:complexType name="CType"><xsd:sequence>'
+                                               '<xsd:element name="local" type="xsd:string"/>'
+                                               '</xsd:sequence></xsd:complexType>')
+        os.mkdir(os.path.join(self.directory, "remote"))
+        with open(os.path.join(self.directory, "local-c.xsd"), "w") as f:
+            f.write(local)
+        with open(os.path.join(self.directory, "remote", "b.xsd"), "w") as f:
+            f.write(ImportTests.schema.format("b", ""))
+        with open(os.path.join(self.directory, "catalog.xml"), "w") as f:
+            f.write('<catalog xmlns="{0}"><uri name="urn:c" uri="local-c.xsd"/>'
+                    '<rewriteURI uriStartString="{1}/" rewritePrefix="remote/"/></catalog>'
+                    .format(Catalog.xmlns, self.location.rsplit("/", 1)[0]))
+        client = Client(self.url, 2, "echo", catalog=os.path.join(self.directory, "catalog.xml"))
+        client.inputs[0].value.local.value = "hello"
+        self.assertIn("hello</", client.request_envelope.xml)
+        self.assertEqual(DocumentStubHandler.requests, 2, "Only the WSDL and a.xsd should be downloaded")
+
+
+class TransportTests(StubServerMixin, unittest.TestCase):
+    """ Tests for the pooled HTTP transport """
+
+    def client(self, **kwargs):
+        client = Client("file://sample.wsdl", 2, "getBank", **kwargs)
+        client.inputs[0].blz.value = "test"
+        client.location = self.location
+        return client
+
+    def test_shared_transport(self):
+        self.assertIs(self.client().transport, self.client().transport,
+                      "Clients calling the same host should share a transport")
+
+    def test_connection_reuse(self):
+        transport = HttpTransport()
+        client = self.client(transport=transport)
+        for _ in range(3):
+            self.assertTrue(client(), "Stub server should return a successful response")
+        self.assertEqual(transport.stats["connections"], 1, "Only one connection should be opened")
+        self.assertEqual(transport.stats["reused"], 2, "Later calls should reuse the pooled connection")
+
+    def test_call_with_values(self):
+        client = self.client()
+        response = client(blz="12345678")
+        self.assertEqual(response.simple_outputs["bezeichnung"]["value"], "Stub Bank 12345678")
+        self.assertEqual(client.inputs[0].blz.value, "test", "Values passed to the call should not change the inputs")
+        with self.assertRaises(ValueError):
+            client(bic="12345678")
+
+    def test_chunked_request(self):
+        client = self.client()
+        response = client(blz="Bank \u00fc", chunked=True)
+        self.assertEqual(response.simple_outputs["bezeichnung"]["value"], "Stub Bank Bank \u00fc",
+                         "The envelope should be streamed as UTF-8")
+        with self.assertRaises(ValueError):
+            client(chunked=True)
+        with self.assertRaises(ValueError):
+            client(blz="Bank", chunked=True, transport=HttpTransport(retries=2))
+
+
+class SlowStubHandler(StubHandler):
+    delay = 0.5
+
+
+class TransportTimeoutTests(StubServerMixin, unittest.TestCase):
+    """ Tests for errors raised by the pooled HTTP transport """
+
+    handler = SlowStubHandler
+
+    def test_read_timeout(self):
+        client = Client("file://sample.wsdl", 2, "getBank", transport=HttpTransport(timeout=0.1))
+        client.location = self.location
+        with self.assertRaises(ReadTimeout):
+            client()
+
+
+class EchoStubHandler(StubHandler):
+    """ Answers like StubHandler, with the blz, X-Call header and SOAPAction header of the request in the bank name """
+
+    def do_POST(self):
+        request = self.read_body().decode("utf-8")
+        blz = re.search(r"<tns:blz>(.*)</tns:blz>", request).group(1)
+        body = self.body.format("{0} {1} {2}".format(blz, self.headers.get("X-Call"), self.headers.get("SOAPAction")))
+        body = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ConcurrencyTests(StubServerMixin, unittest.TestCase):
+    """ Tests that one Client can be called from many threads at once """
+
+    handler = EchoStubHandler
+
+    class Tag(Doctor):
+
+        """ Sets the X-Call header of the call to the blz in its envelope """
+
+        def __call__(self, client, xml):
+            client.headers["X-Call"] = re.search(r"<tns:blz>(.*)</tns:blz>", xml).group(1)
+            return xml
+
+    def test_shared_client(self):
+        client = Client("file://sample.wsdl", 2, "getBank", transport=HttpTransport(pool_maxsize=16))
+        client.location = self.location
+        client.inputs[0].blz.value = "inputs"
+
+        def call(i):
+            # Every fourth call renders the (shared) inputs, the others their own values
+            if i % 4:
+                return client(doctors=(self.Tag(),), blz=str(i))
+            return client(doctors=(self.Tag(),))
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            for i, response in enumerate(executor.map(call, range(200))):
+                expected = str(i) if i % 4 else "inputs"
+                self.assertEqual(response.simple_outputs["bezeichnung"]["value"],
+                                 'Stub Bank {0} {0} ""'.format(expected),
+                                 "Envelopes and headers should not bleed between concurrent calls")
+        self.assertEqual(client.headers, {"Content-Type": "text/xml;charset=UTF-8"},
+                         "Calls should not change the headers of the client")
+
+
+class NoSoapActionTests(StubServerMixin, unittest.TestCase):
+    """ Tests for calling an operation whose binding has no soap:operation, and so no soapAction """
+
+    handler = EchoStubHandler
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.wsdl = os.path.join(self.directory, "sample.wsdl")
+        with open("sample.wsdl") as f:
+            text = f.read()
+        with open(self.wsdl, "w") as f:
+            f.write(re.sub(r"<soap(12)?:operation [^>]*></soap(12)?:operation>", "", text))
+        self.client = Client("file://" + self.wsdl, 2, "getBank")
+        self.client.location = self.location
+        self.expected = 'Stub Bank {0} None ""'
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_call(self):
+        response = self.client(blz="1")
+        self.assertEqual(response.simple_outputs["bezeichnung"]["value"], self.expected.format(1),
+                         "An empty SOAPAction header should be sent")
+
+    def test_batch(self):
+        names = [response.simple_outputs["bezeichnung"]["value"]
+                 for response in self.client.batch("getBank", [{"blz": "1"}, {"blz": "2"}])]
+        self.assertEqual(names, [self.expected.format(1), self.expected.format(2)])
+
+    def test_async_call(self):
+        client = AsyncClient(self.client)
+        inputs = client.inputs("getBank")
+        inputs[0].blz.value = "1"
+        try:
+            response = asyncio.run(client.call("getBank", *inputs))
+        finally:
+            client.close()
+        self.assertEqual(response.simple_outputs["bezeichnung"]["value"], self.expected.format(1))
+
+    def test_operation_spec(self):
+        spec = OperationSpec.from_client(self.client)
+        self.assertEqual(spec.headers["SOAPAction"], '""')
+        result = spec.call({"blz": "1"}, HttpTransport())
+        self.assertEqual(result.outputs[0]["details"]["bezeichnung"], self.expected.format(1))
+
+
+class MetricsTests(StubServerMixin, unittest.TestCase):
+    """ Tests for the per-phase metrics of calls """
+
+    class Failing(MetricsHook):
+        def call(self, metrics):
+            raise RuntimeError("Metrics hooks should not fail calls")
+
+    def test_aggregator(self):
+        aggregator = MetricsAggregator()
+        client = Client("file://sample.wsdl", 2, "getBank", metrics=[self.Failing(), aggregator])
+        client.location = self.location
+        for _ in range(3):
+            client(blz="1").outputs
+        client.location = "http://127.0.0.1:1/service"
+        with self.assertRaises(ConnectionError):
+            client(blz="1")
+
+        metrics = aggregator.snapshot()["getBank"]
+        self.assertEqual((metrics["calls"], metrics["errors"], metrics["statuses"]), (4, 1, {200: 3}))
+        self.assertGreater(metrics["request_bytes"], 0)
+        self.assertGreater(metrics["response_bytes"], 0)
+        self.assertEqual(set(metrics["latency"]),
+                         {"render", "send", "first_byte", "download", "parse", "total"})
+        self.assertEqual(metrics["latency"]["parse"]["count"], 3)
+        self.assertEqual(metrics["latency"]["send"]["buckets"]["+Inf"], 4)
+        self.assertIn('soapy_responses_total{operation="getBank",status="200"} 3', aggregator.prometheus())
+
+
+class AsyncClientTests(StubServerMixin, unittest.TestCase):
+    """ Tests for concurrent calls through the AsyncClient """
+
+    def test_concurrent_calls(self):
+        client = AsyncClient(Client("file://sample.wsdl", 2, "getBank"), concurrency=4)
+        client.client.location = self.location
+
+        async def call(value):
+            inputs = client.inputs("getBank")
+            inputs[0].blz.value = value
+            return value, await client.call("getBank", *inputs)
+
+        async def gather():
+            return await asyncio.gather(*(call(str(i)) for i in range(8)))
+
+        try:
+            results = asyncio.run(gather())
+        finally:
+            client.close()
+        for value, response in results:
+            self.assertTrue(response, "Each concurrent call should succeed")
+            self.assertEqual(response.simple_outputs["bezeichnung"]["value"], "Stub Bank " + value,
+                             "Each call should send the envelope rendered from its own inputs")
+
+
+class SlowRowStubHandler(StubHandler):
+    """ Answers like StubHandler, after a delay for the blz "slow" only """
+
+    def read_body(self) -> bytes:
+        body = super().read_body()
+        if b"<tns:blz>slow</tns:blz>" in body:
+            time.sleep(0.5)
+        return body
+
+
+class BatchTests(StubServerMixin, unittest.TestCase):
+    """ Tests for sending many input sets through Client.batch """
+
+    handler = SlowRowStubHandler
+
+    def setUp(self):
+        self.client = Client("file://sample.wsdl", 2, "getBank")
+        self.client.location = self.location
+
+    def test_ordered(self):
+        rows = ({"blz": str(i)} for i in range(20))
+        names = [response.simple_outputs["bezeichnung"]["value"]
+                 for response in self.client.batch("getBank", rows, concurrency=4)]
+        self.assertEqual(names, ["Stub Bank {0}".format(i) for i in range(20)],
+                         "Responses should be yielded in the order of the rows, each from its own envelope")
+
+    def test_unordered(self):
+        rows = [{"blz": str(i)} for i in range(20)]
+        names = {response.simple_outputs["bezeichnung"]["value"]
+                 for response in self.client.batch("getBank", rows, concurrency=4, ordered=False)}
+        self.assertEqual(names, {"Stub Bank {0}".format(i) for i in range(20)},
+                         "Every row should be answered when responses are yielded as completed")
+
+    def test_unordered_tail(self):
+        # Fewer rows than the concurrency, so every call is still pending when rows run out
+        rows = [{"blz": "slow"}, {"blz": "1"}, {"blz": "2"}]
+        names = [response.simple_outputs["bezeichnung"]["value"]
+                 for response in self.client.batch("getBank", rows, concurrency=4, ordered=False)]
+        self.assertEqual(names[-1], "Stub Bank slow", "The calls left when rows run out should complete in any order")
+
+    def test_envelope_not_stale(self):
+        self.client.inputs[0].blz.value = "first"
+        self.client()
+        self.client.inputs[0].blz.value = "second"
+        response = self.client()
+        self.assertEqual(response.simple_outputs["bezeichnung"]["value"], "Stub Bank second",
+                         "Each call should send the current values of the inputs")
+
+
+class DropStubHandler(StubHandler):
+    """ Answers like StubHandler, but closes the connection without answering for the blz "drop" """
+
+    def do_POST(self):
+        request = self.read_body().decode("utf-8")
+        blz = re.search(r"<tns:blz>(.*)</tns:blz>", request).group(1)
+        if blz == "drop":
+            self.close_connection = True
+            return
+        body = self.body.format(blz).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ProcessPoolTests(StubServerMixin, unittest.TestCase):
+    """ Tests for calling an operation from worker processes, through soapy.pool """
+
+    handler = DropStubHandler
+
+    def setUp(self):
+        self.client = Client("file://sample.wsdl", 2, "getBank")
+        self.client.location = self.location
+
+    def test_spec_pickles(self):
+        spec = pickle.loads(pickle.dumps(OperationSpec.from_client(self.client)))
+        self.assertEqual(spec.render({"blz": "7"}), self.client.template.render({"blz": "7"}),
+                         "A pickled spec should render the envelopes the client does")
+        self.assertEqual(spec.headers["SOAPAction"], '""')
+        result = spec.call({"blz": "7"}, HttpTransport())
+        self.assertTrue(result)
+        self.assertEqual(result.outputs, ({"details": {"bezeichnung": "Stub Bank 7", "plz": "12345"}},))
+
+    def test_batch(self):
+        rows = ({"blz": str(i)} for i in range(20))
+        names = [result.outputs[0]["details"]["bezeichnung"]
+                 for result in process_batch(self.client, "getBank", rows, processes=2, chunksize=3)]
+        self.assertEqual(names, ["Stub Bank {0}".format(i) for i in range(20)],
+                         "Results should be yielded in the order of the rows, each from its own envelope")
+
+    def test_failed_call(self):
+        rows = [{"blz": "0"}, {"blz": "drop"}, {"blz": "2"}]
+        results = list(process_batch(self.client, "getBank", rows, processes=1, chunksize=3))
+        self.assertEqual(len(results), 3, "A failed call should not discard the other results of its chunk")
+        self.assertIsInstance(results[1].error, ConnectionError)
+        self.assertIsNone(results[1].status)
+        self.assertFalse(results[1])
+        self.assertEqual([result.outputs[0]["details"]["bezeichnung"] for result in (results[0], results[2])],
+                         ["Stub Bank 0", "Stub Bank 2"])
+
+
+class ResponseTests(unittest.TestCase):
+    """ Tests that responses are parsed into the same outputs the BeautifulSoup based parser found """
+
+    envelope = """<?xml version="1.0" encoding="UTF-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/">
+<soapenv:Header><tns:updateCustomerResponse xmlns:tns="http://example.com/other/"/></soapenv:Header>
+<soapenv:Body>
+<tns:updateCustomerResponse xmlns:tns="http://example.com/customers/">
+    <tns:result>ok</tns:result>
+    <!-- records follow -->
+    <tns:record><tns:key>a</tns:key><tns:value>1</tns:value></tns:record>
+    <tns:record><tns:key>b</tns:key><tns:value><![CDATA[<2>]]></tns:value></tns:record>
+</tns:updateCustomerResponse>
+</soapenv:Body>
+</soapenv:Envelope>"""
+
+    def setUp(self):
+        self.client = Client("file://types.wsdl", 2, "updateCustomer")
+        http_response = HttpResponse()
+        http_response.status_code = 200
+        http_response.headers["Content-Type"] = "text/xml; charset=utf-8"
+        http_response._content = self.envelope.encode("utf-8")
+        http_response._content_consumed = True
+        self.response = Response(http_response, self.client)
+
+    def test_outputs(self):
+        self.assertTrue(self.response, "Response with an output and no faults should be successful")
+        output, = self.response.outputs
+        self.assertEqual(output.namespace, "http://example.com/customers/",
+                         "Output should be found by its qualified name, not by its local name")
+        self.assertEqual([each.name for each in output("record")], ["record", "record"])
+
+    def test_simple_outputs(self):
+        expected = dict()
+        output = self.response.bsResponse.find("Body").find("updateCustomerResponse")
+        for child in output.children:
+            Response._recursive_extract_significant_children(child, expected)
+        self.assertEqual(self.response.simple_outputs, expected,
+                         "simple_outputs should be the same as folding the BeautifulSoup tree")
+        self.assertEqual(self.response.simple_outputs["value"]["value"], ["1", "<2>"])
+
+    def test_iter_records(self):
+        self.assertEqual(list(self.response.iter_records("record")),
+                         [{"key": "a", "value": "1"}, {"key": "b", "value": "<2>"}])
+        self.assertEqual(list(self.response.iter_records("result")), ["ok"])
+
+
+class TemplateTests(unittest.TestCase):
+    """ Tests that compiled templates render the same envelopes as the marshaller """
+
+    @staticmethod
+    def body(xml):
+        return xml.split("<soapenv:Body>")[1]
+
+    def test_simple(self):
+        client = Client("file://sample.wsdl", 2, "getBank")
+        client.inputs[0].blz.value = "a<b"
+        self.assertEqual(client.template.render({"blz": "a<b"}), client.request_envelope.xml,
+                         "Template should render the same envelope as the marshaller")
+
+    def test_complex(self):
+        client = Client("file://types.wsdl", 2, "updateCustomer")
+        inputs = client.inputs[0]
+        inputs.id.value = "7"
+        inputs.note.value = True
+        inputs.tag.extend("a", "b")
+        inputs.address.street.value = "Main"
+        inputs.address["kind"].value = "work"
+        inputs.phone.append()
+        inputs.phone[0].number.value = "1"
+        inputs.phone[1].number.value = "2"
+        inputs.phone[1].status.value = "active"
+        values = {
+            "id": "7",
+            "note": True,
+            "tag": ["a", "b"],
+            "address": {"street": "Main", "@kind": "work"},
+            "phone": [{"number": "1"}, {"number": "2", "status": "active"}]
+        }
+        self.assertEqual(self.body(client.template.render(values)), self.body(client.request_envelope.xml),
+                         "Template should render repeated, optional and foreign namespace elements like the marshaller")
+
+    def test_empty(self):
+        client = Client("file://types.wsdl", 2, "updateCustomer")
+        self.assertEqual(self.body(client.template.render()), self.body(client.request_envelope.xml),
+                         "Template should omit or nil empty elements like the marshaller")
+
+    def test_iter_render(self):
+        client = Client("file://types.wsdl", 2, "updateCustomer")
+        template = client.template
+        values = {"id": "7", "tag": ["a", "b"], "address": {"@kind": "work"},
+                  "phone": [{"number": "1"}, {}, {"status": "active"}]}
+        for each in (values, {}, {"address": {"street": "Main"}}):
+            self.assertEqual(b"".join(template.iter_render(each)).decode("utf-8"), template.render(each))
+        tags = dict(values, tag=("tag {0}".format(i) for i in range(5000)))
+        chunks = list(template.iter_render(tags))
+        self.assertGreater(len(chunks), 1, "Large envelopes should be yielded in several chunks")
+        self.assertEqual(b"".join(chunks).decode("utf-8"),
+                         template.render(dict(values, tag=["tag {0}".format(i) for i in range(5000)])))
+
+    def test_namespaces(self):
+        client = Client("file://types.wsdl", 2, "updateCustomer")
+        table = client.namespaces
+        self.assertEqual(table.namespaces, {"tns": "http://example.com/customers/",
+                                            "soapenv": "http://schemas.xmlsoap.org/soap/envelope/",
+                                            "tns1": "http://example.com/common/",
+                                            "xsi": "http://www.w3.org/2001/XMLSchema-instance"})
+        envelope = client.request_envelope
+        self.assertIs(envelope.namespaces, table, "Envelopes should share the table of the operation")
+        envelope.soap_ns, envelope.xml_ns
+        self.assertEqual(envelope.used_ns, table.namespaces, "Reading prefixes should not declare namespaces")
+        self.assertEqual(client.template.render(), envelope.xml,
+                         "Template and marshaller should declare the same namespaces")
+
+    def test_load(self):
+        @dataclass
+        class Address:
+            street: str
+            city: str = None
+
+        values = {
+            "id": "7",
+            "note": True,
+            "tag": ["a", "b"],
+            "address": Address("Main"),
+            "phone": [{"number": "1"}, {"number": "2", "status": "active"}]
+        }
+        client = Client("file://types.wsdl", 2, "updateCustomer")
+        client.inputs[0].tag.extend("x", "y", "z")
+        self.assertIs(client.inputs[0].load(values), client.inputs[0])
+        self.assertEqual(len(client.inputs[0].tag), 2, "Repeatable elements should match the values loaded")
+        self.assertEqual(self.body(client.template.render(values)), self.body(client.request_envelope.xml),
+                         "Loaded inputs should render like the template")
+        with self.assertRaises(ValueError):
+            client.inputs[0].load({"address": {"town": "Springfield"}})
+
+    def test_load_partial(self):
+        inputs = Client("file://types.wsdl", 2, "updateCustomer").inputs[0]
+        inputs.load({"id": "1", "nickname": "first", "address": {"street": "Main", "city": "Springfield"}})
+        inputs.load({"id": "2", "address": {"city": None}})
+        self.assertEqual(inputs.id.value, "2")
+        self.assertEqual(inputs.nickname.value, "first", "Inputs not named should keep their values")
+        self.assertEqual(inputs.address.street.value, "Main")
+        self.assertIsNone(inputs.address.city.value, "Loading None should clear a value")
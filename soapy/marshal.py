@@ -1,8 +1,9 @@
 import logging
 from abc import ABCMeta, abstractmethod, abstractproperty
-from xml.sax.saxutils import escape
+from collections.abc import Iterable, Mapping
+from xml.sax.saxutils import escape, quoteattr
 
-from soapy.inputs import Repeatable, Element as InputElement, Base as InputBase
+from soapy.inputs import Repeatable, Element as InputElement, Base as InputBase, as_mapping
 
 # Initialize logger for this module
 logger = logging.getLogger(__name__)
@@ -23,53 +24,93 @@ class Marshaller(metaclass=ABCMeta):
         """ Resolve dependencies, namespaces, and populate xml string """
 
 
+SOAP_NAMESPACES = {
+    1.1: "http://schemas.xmlsoap.org/soap/envelope/",
+    1.2: "http://www.w3.org/2003/05/soap-envelope"
+}
+
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+
+
+class NamespaceTable:
+
+    """ The namespace prefixes of the request envelope of an Operation, worked out once from its type tree: tns for
+    the schema of the first input part, soapenv for the SOAP version, tns1, tns2, ... for every other schema an input
+    element is in, in document order, and xsi if any input element is nillable. Envelope and Template look prefixes
+    up here, so rendering does no namespace work """
+
+    def __init__(self, operation, version):
+        self.__schema = operation.input.parts[0].type.schema
+        self.__namespaces = {"tns": self.__schema.name, "soapenv": SOAP_NAMESPACES[version]}
+        self.__prefixes = {self.__schema.name: "tns"}
+        nillable = False
+        # Walk every definition once, depth first, so prefixes are numbered in the order elements are rendered
+        visited = set()
+        stack = [part.type for part in reversed(operation.input.parts)]
+        while stack:
+            definition = stack.pop()
+            if id(definition) in visited:
+                continue
+            visited.add(id(definition))
+            name = definition.schema.name
+            if name not in self.__prefixes:
+                prefix = "tns" + str(len(self.__prefixes))
+                self.__prefixes[name] = prefix
+                self.__namespaces[prefix] = name
+            nillable = nillable or definition.nillable == "true"
+            stack.extend(child for child in reversed(definition.element_children)
+                         if child.bs_element is not definition.bs_element)
+        if nillable:
+            self.__namespaces["xsi"] = XSI_NAMESPACE
+        self.__declarations = "".join('xmlns:{0}="{1}" '.format(prefix, name)
+                                      for prefix, name in self.__namespaces.items())
+        logger.debug("Namespace table for operation %s: %s", operation.name, self.__namespaces)
+
+    @property
+    def schema(self):
+        """ The schema of the first input part, whose namespace is tns """
+        return self.__schema
+
+    @property
+    def namespaces(self) -> dict:
+        """ A dict of prefix to namespace, for every namespace declared on the envelope """
+        return dict(self.__namespaces)
+
+    @property
+    def declarations(self) -> str:
+        """ The xmlns attributes declaring the namespaces, as rendered on the Envelope tag """
+        return self.__declarations
+
+    def prefix(self, namespace: str) -> str:
+        """ The prefix of the namespace (the name of a schema), e.g. table.prefix(element.schema.name) """
+        return self.__prefixes[namespace]
+
+
 class Envelope(Marshaller):
 
-    """ Class to build the envelope from InputOptions class instance from soapy.client """
+    """ Class to build the envelope from InputOptions class instance from soapy.client. The namespace prefixes are
+    looked up in the NamespaceTable of the operation (client.namespaces), which is computed once per operation """
+
+    soap_namespaces = SOAP_NAMESPACES
 
     def __init__(self, client):
         self.__parts = client.operation.input.parts
-        self.__schema = self.parts[0].type.schema
+        self.__namespaces = client.namespaces
+        self.__schema = self.namespaces.schema
         self.__version = client.wsdl.version
         logger.info("Initializing new Envelope")
-        self.used_ns = dict()
-        self.used_ns["tns"] = self.schema.name
         self.__targetNs = "tns"
-        self.__tns_map = {}
-        self.__ns_counter = 1
         self.__xml = """<{0}:Envelope """.format(self.soap_ns)
         self.__inputs = client.inputs
         self.__body = Body(self)
         self.__header = Header(self)
 
-    def register_namespace(self, definition, object):
-
-        """  When an element is not in the same schema (and thus NS) as the Body/Envelope,
-        we need to define and declare it, as well as be able to tell the element what its
-        namespace is. This function adds a new namespace when provided a location definition
-        after ensuring the same namespace hasn't already been added
-        :param definition: The url of the schema, e.g. http://test/commonTypes/schema
-        :param object: The object reference to be used in tnsMap so the object can tell which ns to use
-        :return: None
-        """
-
-        for name, value in self.used_ns.items():
-            if value == definition:
-                self.__tns_map[object] = name
-                return
-        name = self.target_ns + str(self.__ns_counter)
-        self.used_ns[name] = definition
-        self.__tns_map[object] = name
-        logger.debug("Registered new namespace of {0}".format(name))
-        self.__ns_counter += 1
-
     def render(self):
         self.header.render()
         logger.debug("Header rendered successfully")
         self.body.render()
         logger.debug("Body rendered successfully")
-        for key, item in self.used_ns.items():
-            self.__xml += """xmlns:{0}="{1}" """.format(key, item)
+        self.__xml += self.namespaces.declarations
         self.__xml += ">\n"
         self.__xml += self.header.xml
         self.__xml += self.body.xml
@@ -86,8 +127,13 @@ class Envelope(Marshaller):
         return self.__inputs
 
     @property
-    def tns_map(self):
-        return self.__tns_map
+    def namespaces(self) -> NamespaceTable:
+        return self.__namespaces
+
+    @property
+    def used_ns(self) -> dict:
+        """ A dict of prefix to namespace, for every namespace declared on the envelope """
+        return self.namespaces.namespaces
 
     @property
     def xml(self) -> str:
@@ -116,15 +162,10 @@ class Envelope(Marshaller):
 
     @property
     def soap_ns(self):
-        if self.version == 1.1:
-            self.used_ns["soapenv"] = "http://schemas.xmlsoap.org/soap/envelope/"
-        elif self.version == 1.2:
-            self.used_ns["soapenv"] = "http://www.w3.org/2003/05/soap-envelope"
         return "soapenv"
 
     @property
     def xml_ns(self):
-        self.used_ns["xsi"] = "http://www.w3.org/2001/XMLSchema-instance"
         return "xsi"
 
     @property
@@ -214,7 +255,7 @@ class Element(Marshaller):
 
         self.__top_level = top_level
         self.__parent = envelope
-        logger.debug("Initializing new Element based on {0}".format(element.name))
+        logger.debug("Initializing new Element based on %s", element.name)
         self.__part = part
         self.__definition = element
         self.children_have_values = False
@@ -228,23 +269,14 @@ class Element(Marshaller):
 
         self.__input_obj = None
         if input_obj is None:
-            for obj in self.parent.inputs[self.part].items:
-                if obj.ref is self.definition:
-                    self.__input_obj = obj
-                    break
+            root = self.parent.inputs[self.part].root_element
+            if root is not None and root.ref is self.definition:
+                self.__input_obj = root
         else:
             self.__input_obj = input_obj
 
-        # Check to see if the schema of the element is the same as the body/envelope default tns.
-        # If not, then we need to update the Envelope with a new xmlns definition and use a different
-        # ns in our tags
-
-        if self.definition.schema.name is not self.parent.schema.name:
-            self.parent.register_namespace(self.definition.schema.name,
-                                           self)
-            self.tns = self.parent.tns_map[self]
-        else:
-            self.tns = self.parent.target_ns
+        # Elements not in the schema of the body/envelope use the prefix of their own schema
+        self.tns = self.parent.namespaces.prefix(self.definition.schema.name)
 
         children = list()
         # Repeatable types shouldn't be rendered under any circumstances, so immediately set to false
@@ -269,10 +301,15 @@ class Element(Marshaller):
             # overlaps with a built-in attribute until the right InputElement type is found.
             for child in self.definition.element_children:
                 attr_name = child.name
-                while not isinstance(getattr(self.input_obj, attr_name), InputBase):
+                child_input = getattr(self.input_obj, attr_name, None)
+                while child_input is not None and not isinstance(child_input, InputBase):
                     attr_name = "_" + attr_name
+                    child_input = getattr(self.input_obj, attr_name, None)
+                if child_input is None:
+                    # The Factory did not expand this element, as it's a recursive reference to an ancestor
+                    continue
                 children.append(
-                    Element(self.parent, child, self.part, False, getattr(self.input_obj, attr_name))
+                    Element(self.parent, child, self.part, False, child_input)
                 )
 
             self.__children = tuple(children)
@@ -340,14 +377,14 @@ class Element(Marshaller):
         :return: bool """
 
         if self.input_obj.setable and self.input_obj.value is None:
-            if self.definition.min_occurs == "0" and self.input_obj.all_attributes_empty:
+            if self.input_obj.min_occurs == "0" and self.input_obj.all_attributes_empty:
                 self.__open_tag = ""
             elif self.definition.nillable == "true" and self.input_obj.all_attributes_empty:
                 self.__open_tag = self.open_tag.replace('>', ' {0}:nil="true" />\n'.format(self.parent.xml_ns))
             else:
                 self.__open_tag = self.open_tag.replace('>', '/>\n')
             self.__xml = self.open_tag
-            logger.debug("Processed null value for element {0}".format(self.definition.name))
+            logger.debug("Processed null value for element %s", self.definition.name)
             return True
         return False
 
@@ -355,7 +392,7 @@ class Element(Marshaller):
 
         """ Render inner xml appropriately for containing a single (non-Array) value """
 
-        logger.debug("Setting value of element {0} to '{1}'".format(self.definition.name, value))
+        logger.debug("Setting value of element %s to '%s'", self.definition.name, value)
         self.__inner_xml = escape(str(value))
         self.__xml = self.open_tag + self.inner_xml + self.close_tag
 
@@ -366,8 +403,6 @@ class Element(Marshaller):
             self.__open_tag = "<{0}:{1}".format(self.tns, self.definition.name.strip())
         else:
             self.__open_tag = "<{0}".format(self.definition.name.strip())
-        # Call update to perform parent update consolidation from non-Element children
-        self.definition.update(self)
         # Render attributes, and then the close brace '>'
         for attr in self.definition.attributes:
             if self.input_obj[attr.name].value is not None:
@@ -388,14 +423,14 @@ class Element(Marshaller):
         # Top level short circuit for input elements that aren't rendered -- like Repeatables and Collections
 
         if not self.should_be_rendered:
-            logger.debug("Processing children values for non-rendered input object {}".format(self.definition.name))
+            logger.debug("Processing children values for non-rendered input object %s", self.definition.name)
             for each in self.children:
                 each.render()
                 self.__xml += each.xml
                 pass
             return
 
-        logger.info("Starting render of contents of object '{}'".format(self.definition.name))
+        logger.info("Starting render of contents of object '%s'", self.definition.name)
 
         # Render each child element to make sure parent/child updates are propagated before we actually render
         # the static XML. Then, check to see if all children are empty.
@@ -425,9 +460,260 @@ class Element(Marshaller):
         elif isinstance(self.input_obj, InputElement):
             # Only a single value should have been provided (will get type-casted to string)
             self._process_single_value(self.input_obj.value)
-        elif self.children_have_values or self.definition.min_occurs != "0":
+        elif self.children_have_values or self.input_obj.min_occurs != "0":
             # if this is only a container for child elements, and they have values or attributes
             self.__inner_xml += "\n"
             for each in self.children:
                 self.__inner_xml += each.xml
             self.__xml += self.open_tag + self.inner_xml + self.close_tag
+
+
+def _repeated(value) -> bool:
+    """ Whether value holds the values of a repeated element: any iterable other than a string or a mapping """
+    return isinstance(value, Iterable) and not isinstance(value, (str, bytes, Mapping))
+
+
+class Slot:
+
+    """ The static parts of one element of a compiled Template: its tags, attributes and rendering rules, and the
+    Slots of its child elements. Values are looked up by name from the mapping provided to Template.render """
+
+    def __init__(self, definition, tns: str, qualified: bool, children: tuple):
+        name = definition.name.strip()
+        self.name = name
+        tag = "{0}:{1}".format(tns, name) if qualified else name
+        self.open_tag = "<" + tag
+        self.close_tag = "</{0}>\n".format(tag)
+        self.attributes = tuple((attr.name, None if attr.default is None else quoteattr(attr.default))
+                                for attr in definition.attributes)
+        self.optional = definition.min_occurs == "0"
+        self.nillable = definition.nillable == "true"
+        self.repeatable = definition.max_occurs == "unbounded" or int(definition.max_occurs) > 1
+        self.children = children
+
+    @property
+    def setable(self) -> bool:
+        return not self.children
+
+    def _open(self, attributes: dict) -> tuple:
+
+        """ Return the open tag (without the closing brace) and whether any attribute was rendered """
+
+        tag = self.open_tag
+        rendered = False
+        for name, default in self.attributes:
+            value = attributes.get("@" + name)
+            value = default if value is None else quoteattr(str(value))
+            if value is not None:
+                tag += " {0}={1}".format(name, value)
+                rendered = True
+        return tag, rendered
+
+    def render(self, value, out: list, xsi: str) -> bool:
+
+        """ Append the xml for the value (or each value, if repeatable) to out. Returns whether anything significant
+        (a value or an attribute) was rendered, which decides if optional parent containers are rendered """
+
+        if self.repeatable and _repeated(value):
+            significant = False
+            for item in value:
+                significant = self._render_one(item, out, xsi) or significant
+            return significant
+        return self._render_one(value, out, xsi)
+
+    def significant(self, value) -> bool:
+
+        """ Whether rendering the value would render anything significant, as returned by render, without rendering
+        it. Repeated values given as an iterator rather than a list or tuple can only be read once, so they are taken
+        to be significant """
+
+        if self.repeatable and _repeated(value):
+            if not isinstance(value, (list, tuple)):
+                return True
+            return any(self._significant_one(item) for item in value)
+        return self._significant_one(value)
+
+    def _significant_one(self, value) -> bool:
+        value = as_mapping(value)
+        attributes = value if isinstance(value, dict) else {}
+        if self.setable:
+            if isinstance(value, dict):
+                value = value.get("#text")
+            return value is not None or any(default is not None or attributes.get("@" + name) is not None
+                                            for name, default in self.attributes)
+        return any(child.significant(attributes.get(child.name)) for child in self.children)
+
+    def iter_render(self, value, xsi: str):
+
+        """ Like render, but yield the xml in pieces as it is rendered instead of appending it to a list. As the
+        pieces can't be taken back, optional containers are checked with significant() before they are rendered """
+
+        if self.setable:
+            # Simple elements are rendered with _render_one, many repeated values to a piece
+            out = list()
+            for item in (value if self.repeatable and _repeated(value) else (value,)):
+                self._render_one(item, out, xsi)
+                if len(out) >= 1024:
+                    yield "".join(out)
+                    out.clear()
+            yield "".join(out)
+        elif self.repeatable and _repeated(value):
+            for item in value:
+                yield from self._iter_render_one(item, xsi)
+        else:
+            yield from self._iter_render_one(value, xsi)
+
+    def _iter_render_one(self, value, xsi: str):
+        value = as_mapping(value)
+        attributes = value if isinstance(value, dict) else {}
+        if self.optional and not self._significant_one(value):
+            return
+        tag, _ = self._open(attributes)
+        yield tag + ">\n"
+        for child in self.children:
+            yield from child.iter_render(attributes.get(child.name), xsi)
+        yield self.close_tag
+
+    def _render_one(self, value, out: list, xsi: str) -> bool:
+        value = as_mapping(value)
+        attributes = value if isinstance(value, dict) else {}
+        tag, has_attributes = self._open(attributes)
+
+        if self.setable:
+            if isinstance(value, dict):
+                value = value.get("#text")
+            if value is None:
+                if self.optional and not has_attributes:
+                    return False
+                if self.nillable and not has_attributes:
+                    out.append(tag + ' {0}:nil="true" />\n'.format(xsi))
+                else:
+                    out.append(tag + "/>\n")
+                return has_attributes
+            if value is True:
+                value = "true"
+            elif value is False:
+                value = "false"
+            out.append(tag + ">" + escape(str(value)) + self.close_tag)
+            return True
+
+        # Render the children first, so empty optional containers can be dropped
+        inner = list()
+        significant = False
+        for child in self.children:
+            significant = child.render(attributes.get(child.name), inner, xsi) or significant
+        if significant or not self.optional:
+            out.append(tag + ">\n")
+            out.extend(inner)
+            out.append(self.close_tag)
+        return significant
+
+
+class Template:
+
+    """ A compiled request envelope for an Operation. Compiling walks the type tree of the input message once, and
+    resolves the tags, namespaces and rendering rules of every element into Slots. Rendering a request then only fills
+    the Slots from mappings of values, without touching the type tree.
+
+    Each input part takes one mapping, from child element names to values. A value is a scalar for simple elements,
+    a mapping (or dataclass instance) for complex elements, and a list (or any other iterable, e.g. a generator) of
+    either for repeatable elements. Attributes are set with '@name' keys, and the value of a simple element with
+    attributes is set with the '#text' key.
+
+    A compiled Template holds no reference to the WSDL model (or its BeautifulSoup tags), only strings and Slots,
+    so it can be pickled, e.g. to render envelopes in other processes (see soapy.pool). """
+
+    # The size, in characters, of the chunks yielded by iter_render
+    chunk_size = 64 * 1024
+
+    def __init__(self, operation, version, namespaces=None):
+
+        """ :keyword namespaces: The NamespaceTable of the operation, if already computed """
+
+        self.__version = version
+        table = namespaces if namespaces is not None else NamespaceTable(operation, version)
+        # Only the prefixes are kept, as the table refers to the schema
+        self.__namespaces = table.namespaces
+        logger.info("Compiling envelope template for operation %s", operation.name)
+        self.__slots = tuple(self._compile(table, part.type, True) for part in operation.input.parts)
+        self.__prefix = "<soapenv:Envelope {0}>\n<soapenv:Header/>\n<soapenv:Body>\n".format(table.declarations)
+        self.__suffix = "</soapenv:Body>\n</soapenv:Envelope>"
+
+    @property
+    def version(self) -> float:
+        return self.__version
+
+    @property
+    def slots(self) -> tuple:
+        return self.__slots
+
+    @property
+    def namespaces(self) -> dict:
+        return dict(self.__namespaces)
+
+    def _compile(self, table: NamespaceTable, definition, top_level=False, path=()) -> Slot:
+        tns = table.prefix(definition.schema.name)
+        qualified = top_level or (table.schema.element_form == "qualified" and definition.form == "qualified")
+        children = list()
+        path = path + (definition,)
+        for child in definition.element_children:
+            # Mirrors soapy.inputs.Factory, which does not expand an element into itself or into an ancestor
+            if child.bs_element is not definition.bs_element and child not in path:
+                children.append(self._compile(table, child, False, path))
+        return Slot(definition, tns, qualified, tuple(children))
+
+    def render(self, *values) -> str:
+        """ Render the envelope with one mapping of values per input part """
+        out = [self.__prefix]
+        for slot, value in zip(self.slots, values + ({},) * (len(self.slots) - len(values))):
+            slot.render(value, out, "xsi")
+        out.append(self.__suffix)
+        return "".join(out)
+
+    def iter_render(self, *values):
+
+        """ Render the envelope like render, but as an iterator of UTF-8 encoded chunks of about chunk_size, without
+        ever holding the whole envelope. Repeated values may be given as generators, so a request of any size can be
+        rendered and sent (with chunked transfer encoding, see Client.__call__) in constant memory """
+
+        pending = list()
+        size = 0
+        for piece in self._pieces(values):
+            pending.append(piece)
+            size += len(piece)
+            if size >= self.chunk_size:
+                yield "".join(pending).encode("utf-8")
+                pending = list()
+                size = 0
+        if pending:
+            yield "".join(pending).encode("utf-8")
+
+    def _pieces(self, values):
+        yield self.__prefix
+        for slot, value in zip(self.slots, values + ({},) * (len(self.slots) - len(values))):
+            yield from slot.iter_render(value, "xsi")
+        yield self.__suffix
+
+
+class RenderedEnvelope(Marshaller):
+
+    """ An envelope rendered from a compiled Template and mappings of values, rather than from input objects """
+
+    def __init__(self, template: Template, values: tuple):
+        self.__template = template
+        self.__values = tuple(values)
+        self.__xml = ""
+
+    @property
+    def xml(self) -> str:
+        return self.__xml
+
+    @xml.setter
+    def xml(self, xml):
+        self.__xml = xml
+
+    def render(self):
+        self.__xml = self.__template.render(*self.__values)
+
+    def __str__(self):
+        return self.xml
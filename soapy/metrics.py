@@ -0,0 +1,219 @@
+""" Instrumentation of Client calls. Each call is timed phase by phase, and the CallMetrics of the call are passed to
+ the MetricsHook objects registered with the Client (Client.metrics), when the call completes and again when its
+ Response is parsed. The phases are
+
+ - render: rendering the request envelope (not measured for chunked requests, which are rendered as they are sent)
+ - doctors: applying the doctor plugins
+ - send: calling the transport, until the status and headers of the response are received. This includes any
+ DNS lookup, TCP and TLS handshakes, sending the envelope and the time the service took to answer
+ - first_byte: the part of send measured by requests (Response.elapsed), from sending the request to the headers
+ - download: reading the body of the response (not measured for streamed responses, which are read as they are used)
+ - parse: finding the output and fault parts in the response
+
+ MetricsAggregator is a MetricsHook keeping counters and latency histograms per operation, in process, which can be
+ read as a dict or dumped in the Prometheus text format. """
+
+import bisect
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+
+class CallMetrics:
+    """ The measurements of one call of an operation
+
+    :param operation: The name of the operation called
+    :param location: The URL the request is sent to
+    """
+
+    phases = ("render", "doctors", "send", "first_byte", "download", "parse")
+
+    def __init__(self, operation: str, location: str):
+        self.operation = operation
+        self.location = location
+        # Seconds taken by each phase that was measured
+        self.timings = dict()
+        self.request_bytes = None
+        self.response_bytes = None
+        self.status = None
+        # The exception the call failed with, if any
+        self.error = None
+
+    @contextmanager
+    def timed(self, phase: str):
+        """ Time the body of the with statement as the phase """
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.timings[phase] = time.perf_counter() - start
+
+    @property
+    def total(self) -> float:
+        """ The seconds taken by the call, from rendering to downloading the response (parse is not included) """
+        return sum(seconds for phase, seconds in self.timings.items() if phase not in ("first_byte", "parse"))
+
+    def __repr__(self):
+        return "<CallMetrics {0} status={1} timings={2}>".format(self.operation, self.status, self.timings)
+
+
+class MetricsHook(ABC):
+
+    @abstractmethod
+    def call(self, metrics: CallMetrics) -> None:
+
+        """ Called when a call completes, or fails (with metrics.error set), with all phases up to download timed.
+        Hooks are called on the thread making the call, so they should be quick and thread safe """
+
+    def parse(self, metrics: CallMetrics) -> None:
+
+        """ Called when the Response of a call is parsed, with the parse phase timed. Does nothing by default """
+
+
+def notify(hooks, event: str, metrics: CallMetrics) -> None:
+
+    """ Call the event (call or parse) of each hook. A failing hook is logged, rather than failing the call """
+
+    for hook in hooks:
+        try:
+            getattr(hook, event)(metrics)
+        except Exception:
+            logger.exception("Metrics hook %s failed", hook.__class__.__name__)
+
+
+class Histogram:
+    """ A latency histogram with fixed bucket bounds, in seconds, counting the observations at or below each bound """
+
+    bounds = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self):
+        # One count per bound, and one for the observations above the last bound
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+
+        """ Estimate the q quantile (0 to 1) by interpolating within its bucket. Observations above the last bound
+        are reported as the last bound """
+
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def as_dict(self) -> dict:
+        cumulative = list()
+        total = 0
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return {"count": self.count,
+                "sum": self.sum,
+                "buckets": dict(zip([str(bound) for bound in self.bounds] + ["+Inf"], cumulative)),
+                "p50": self.quantile(0.5),
+                "p99": self.quantile(0.99)}
+
+
+class MetricsAggregator(MetricsHook):
+    """ Keeps, per operation, counters of calls, errors, status codes and payload bytes, and a latency Histogram of
+    each phase and of the total. Register it with Client.metrics, and read it with snapshot() or prometheus(). It
+    may be shared by any number of clients and threads """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__operations = dict()
+
+    def _operation(self, name) -> dict:
+        try:
+            return self.__operations[name]
+        except KeyError:
+            operation = self.__operations[name] = {"calls": 0,
+                                                   "errors": 0,
+                                                   "statuses": dict(),
+                                                   "request_bytes": 0,
+                                                   "response_bytes": 0,
+                                                   "latency": dict()}
+            return operation
+
+    def _observe(self, operation: dict, phase: str, seconds: float) -> None:
+        try:
+            histogram = operation["latency"][phase]
+        except KeyError:
+            histogram = operation["latency"][phase] = Histogram()
+        histogram.observe(seconds)
+
+    def call(self, metrics: CallMetrics) -> None:
+        with self.__lock:
+            operation = self._operation(metrics.operation)
+            operation["calls"] += 1
+            if metrics.error is not None:
+                operation["errors"] += 1
+            if metrics.status is not None:
+                operation["statuses"][metrics.status] = operation["statuses"].get(metrics.status, 0) + 1
+            operation["request_bytes"] += metrics.request_bytes or 0
+            operation["response_bytes"] += metrics.response_bytes or 0
+            for phase, seconds in metrics.timings.items():
+                self._observe(operation, phase, seconds)
+            self._observe(operation, "total", metrics.total)
+
+    def parse(self, metrics: CallMetrics) -> None:
+        with self.__lock:
+            self._observe(self._operation(metrics.operation), "parse", metrics.timings["parse"])
+
+    def snapshot(self) -> dict:
+        """ A copy of the metrics, as a dict of operation name to its counters and histograms (as dicts) """
+        with self.__lock:
+            return {name: dict(operation,
+                               statuses=dict(operation["statuses"]),
+                               latency={phase: histogram.as_dict()
+                                        for phase, histogram in operation["latency"].items()})
+                    for name, operation in self.__operations.items()}
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__operations.clear()
+
+    def prometheus(self) -> str:
+
+        """ The metrics in the Prometheus text exposition format, to be served for scraping or written to a file """
+
+        lines = ["# TYPE soapy_calls_total counter",
+                 "# TYPE soapy_errors_total counter",
+                 "# TYPE soapy_responses_total counter",
+                 "# TYPE soapy_request_bytes_total counter",
+                 "# TYPE soapy_response_bytes_total counter",
+                 "# TYPE soapy_phase_seconds histogram"]
+        for name, operation in sorted(self.snapshot().items()):
+            label = 'operation="{0}"'.format(name.replace("\\", "\\\\").replace('"', '\\"'))
+            lines.append("soapy_calls_total{{{0}}} {1}".format(label, operation["calls"]))
+            lines.append("soapy_errors_total{{{0}}} {1}".format(label, operation["errors"]))
+            for status, count in sorted(operation["statuses"].items()):
+                lines.append('soapy_responses_total{{{0},status="{1}"}} {2}'.format(label, status, count))
+            lines.append("soapy_request_bytes_total{{{0}}} {1}".format(label, operation["request_bytes"]))
+            lines.append("soapy_response_bytes_total{{{0}}} {1}".format(label, operation["response_bytes"]))
+            for phase, histogram in sorted(operation["latency"].items()):
+                labels = '{0},phase="{1}"'.format(label, phase)
+                for bound, count in histogram["buckets"].items():
+                    lines.append('soapy_phase_seconds_bucket{{{0},le="{1}"}} {2}'.format(labels, bound, count))
+                lines.append("soapy_phase_seconds_sum{{{0}}} {1}".format(labels, histogram["sum"]))
+                lines.append("soapy_phase_seconds_count{{{0}}} {1}".format(labels, histogram["count"]))
+        return "\n".join(lines) + "\n"
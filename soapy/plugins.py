@@ -13,7 +13,9 @@ class Doctor(ABC):
 
         """ The doctor is called when provided to the Client.__call__, just before the
         actual web service call is performed. __call__ should return the modified
-        xml envelope which will then be sent to the remote service """
+        xml envelope which will then be sent to the remote service. The RequestContext of
+        the call is passed in place of the Client, so changes to its headers or location
+        apply to that call only """
 
 
 class SOAPAttachmentDoctor(Doctor):
@@ -0,0 +1,226 @@
+""" Calling an operation from a pool of worker processes, so rendering envelopes and parsing responses, which are
+ CPU-bound, use every core rather than contending for the GIL of one process.
+
+ The Wsdl model can't be sent to other processes, as it is built on BeautifulSoup tags. An OperationSpec is a
+ soup-free, picklable description of one operation of a Client instead: its compiled soapy.marshal.Template, the
+ location, headers and credentials to call it with, and the qualified names of its output and fault parts. It is
+ sent to each worker once, when the worker starts, and each call then only sends its values to a worker, and its
+ CallResult back. """
+
+import logging
+import os
+import pickle
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import BytesIO
+from itertools import islice
+
+import soapy.unmarshal
+from soapy.transport import HttpTransport
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+
+class OperationSpec:
+    """ A picklable description of how a Client calls one operation. Build it with OperationSpec.from_client """
+
+    def __init__(self, name, location, headers, template, output_names, fault_names, auth=None, proxies=None,
+                 secure=True, transport_options=None):
+        self.name = name
+        self.location = location
+        self.headers = dict(headers)
+        self.template = template
+        self.output_names = tuple(output_names)
+        self.fault_names = tuple(fault_names)
+        self.auth = auth
+        self.proxies = dict(proxies or {})
+        self.secure = secure
+        # Keyword arguments of the soapy.transport.HttpTransport of each worker
+        self.transport_options = dict(transport_options or {})
+
+    @classmethod
+    def from_client(cls, client, operation_name=None, **transport_options):
+
+        """ Describe the named operation (by default, the selected operation) of the client, as it would be called
+        with client(**values) """
+
+        from soapy.client import Response
+
+        if operation_name is None:
+            if client.operation is None:
+                raise ValueError("Operation must be set, or named, to describe it")
+            operation_name = client.operation.name
+        service, port, operation = client._find_operation(operation_name)
+        headers = dict(client.headers)
+        headers["SOAPAction"] = port.binding.soap_action_header(operation.name)
+        fault_names = [Response._part_name(part) for fault in operation.faults if fault is not None
+                       for part in fault.parts]
+        return cls(operation.name,
+                   port.location,
+                   headers,
+                   client._template(operation),
+                   [Response._part_name(part) for part in operation.output.parts],
+                   fault_names,
+                   auth=client.auth,
+                   proxies=client._build_proxy_dict(),
+                   secure=client.secure,
+                   transport_options=transport_options)
+
+    def render(self, values) -> str:
+        """ Render the envelope for values: a mapping for the first input part, or a tuple of mappings, one per part """
+        return self.template.render(*(values if isinstance(values, tuple) else (values,)))
+
+    def parse(self, status, content_type, content) -> "CallResult":
+        """ Find and decode the output and fault parts of a response """
+        outputs = ()
+        faults = ()
+        if content_type is not None and "xml" in content_type:
+            found = soapy.unmarshal.parse(BytesIO(content), self.output_names + self.fault_names)
+            outputs = tuple(soapy.unmarshal.decode(found[name]) for name in self.output_names
+                            if found[name] is not None)
+            faults = tuple(soapy.unmarshal.decode(found[name]) for name in self.fault_names
+                           if found[name] is not None)
+        return CallResult(self.name, status, content_type, outputs, faults)
+
+    def call(self, values, transport) -> "CallResult":
+        """ Render the envelope for values, send it with transport, and parse the response """
+        response = transport.post(self.location,
+                                  data=self.render(values).encode("utf-8"),
+                                  headers=self.headers,
+                                  auth=self.auth,
+                                  proxies=self.proxies,
+                                  verify=self.secure)
+        return self.parse(response.status_code, response.headers.get("Content-Type"), response.content)
+
+
+class CallResult:
+    """ The picklable outcome of a call made by a worker process. outputs and faults hold the output and fault parts
+    found in the response, decoded into Python values as by soapy.unmarshal.decode. If the call failed without a
+    response (e.g. with a ConnectionError), error holds the exception raised, and status is None """
+
+    def __init__(self, operation, status, content_type, outputs, faults, error=None):
+        self.operation = operation
+        self.status = status
+        self.content_type = content_type
+        self.outputs = outputs
+        self.faults = faults
+        self.error = error
+
+    def __bool__(self):
+        """ True if the call succeeded with an output and no (non-empty) fault, like soapy.client.Response """
+        return self.error is None and 200 <= self.status < 400 and bool(self.outputs) and not any(self.faults)
+
+    def __repr__(self):
+        if self.error is not None:
+            return "<CallResult {0} error={1!r}>".format(self.operation, self.error)
+        return "<CallResult {0} status={1}>".format(self.operation, self.status)
+
+
+# The OperationSpec and transport of this worker process, set when the worker starts
+_spec = None
+_transport = None
+
+
+def _initialize(spec: OperationSpec) -> None:
+    global _spec, _transport
+    _spec = spec
+    _transport = HttpTransport(**spec.transport_options)
+
+
+def _call(rows: list) -> list:
+    # A chunk may hold calls that already reached the service, so a failed call doesn't discard the results of the
+    # others: its exception is returned in its CallResult instead
+    results = list()
+    for values in rows:
+        try:
+            results.append(_spec.call(values, _transport))
+        except Exception as e:
+            logger.error("Call of %s failed: %s", _spec.name, e)
+            results.append(CallResult(_spec.name, None, None, (), (), error=_picklable(e)))
+    return results
+
+
+def _picklable(error: Exception) -> Exception:
+    """ Return error, or if it can't be sent back to the parent process, a RuntimeError describing it """
+    try:
+        pickle.loads(pickle.dumps(error))
+    except Exception:
+        return RuntimeError("{0}: {1}".format(type(error).__name__, error))
+    return error
+
+
+class OperationPool:
+    """ A pool of worker processes calling one operation. The OperationSpec is sent to each worker once, when it
+    starts. Use as a context manager, or close() it when done
+
+    :param spec: An OperationSpec, or a Client to describe with OperationSpec.from_client
+    :param operation_name: The operation of the Client to call, if a Client is provided. Defaults to its selected
+    operation
+    :param processes: The number of worker processes. Defaults to the number of CPUs
+    :param mp_context: The multiprocessing context to start the workers with, e.g. multiprocessing.get_context("fork")
+    """
+
+    def __init__(self, spec, operation_name=None, processes=None, mp_context=None):
+        if not isinstance(spec, OperationSpec):
+            spec = OperationSpec.from_client(spec, operation_name)
+        self.__spec = spec
+        self.__processes = processes or os.cpu_count() or 1
+        self.__executor = ProcessPoolExecutor(max_workers=self.__processes, mp_context=mp_context,
+                                              initializer=_initialize, initargs=(spec,))
+
+    @property
+    def spec(self) -> OperationSpec:
+        return self.__spec
+
+    def map(self, rows, ordered=True, chunksize=16):
+
+        """ Call the operation once for each row of values (in the format of OperationSpec.render), and yield a
+        CallResult for each call. Rows are sent to the workers chunksize at a time, and are read lazily: at most two
+        chunks per worker are pending at once, so memory stays bounded however long rows is. A call that fails without
+        a response yields a CallResult with its error set, and the other rows are still called.
+
+        :param ordered: If True, results are yielded in the order of rows. Otherwise, a chunk at a time as each
+        chunk completes """
+
+        rows = iter(rows)
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < 2 * self.__processes:
+                    chunk = list(islice(rows, chunksize))
+                    if not chunk:
+                        break
+                    pending.append(self.__executor.submit(_call, chunk))
+                if not pending:
+                    return
+                if ordered:
+                    yield from pending.popleft().result()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        yield from future.result()
+        finally:
+            # If the caller stops early, don't start the chunks that are still queued
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        self.__executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def batch(client, operation_name, rows, processes=None, ordered=True, chunksize=16, mp_context=None):
+
+    """ Call the named operation of the client once for each row of values, from a pool of worker processes, and yield
+    a CallResult for each call. Like Client.batch, but rendering and parsing are spread across processes (and so
+    cores) instead of threads. Doctors aren't supported, as they run in the calling process """
+
+    with OperationPool(client, operation_name, processes=processes, mp_context=mp_context) as pool:
+        yield from pool.map(rows, ordered=ordered, chunksize=chunksize)
@@ -0,0 +1,181 @@
+""" Transports are responsible for delivering a rendered SOAP envelope to the web service and returning the response.
+ The default HttpTransport keeps connections alive in a pool, and is shared by every Client targeting the same host
+ with the same options, so repeated calls don't pay for a new TCP/TLS connection each time. AsyncTransport adapts a
+ Transport for use with asyncio. """
+
+import asyncio
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+
+class Transport(ABC):
+
+    # The number of times a call may be re-sent. Chunked requests are only sent through transports that don't retry
+    retries = 0
+
+    @abstractmethod
+    def post(self, location: str, data, headers: dict, auth=None, proxies=None, verify=True, stream=False):
+
+        """ Send data to location, and return the requests.Response received """
+
+
+class HttpTransport(Transport):
+    """ Transport backed by a requests.Session, reusing pooled keep-alive connections across calls
+
+    :param pool_connections: The number of hosts to keep a connection pool for
+    :param pool_maxsize: The maximum number of connections to keep alive in the pool for each host
+    :param pool_block: If True, no more than pool_maxsize connections will be opened to a host at once. Calls wait for
+    a connection to be returned to the pool instead
+    :param timeout: Seconds to wait to connect or receive data (a float, or a (connect, read) tuple). Default no limit
+    :param retries: The number of times to retry a failed call. As this re-sends the envelope, only use it for
+    operations that are safe to repeat. Default 0
+    :param backoff_factor: Retries sleep backoff_factor * 2 ** (retry number - 1) seconds first
+    :param status_forcelist: HTTP status codes, besides connection errors, that should be retried
+    """
+
+    __shared = {}
+    __shared_lock = threading.Lock()
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, timeout=None, retries=0,
+                 backoff_factor=0, status_forcelist=()):
+        self.timeout = timeout
+        self.retries = retries
+        # Without retries, read errors are raised as is (as requests does by default), so a read timeout surfaces
+        # as requests.ReadTimeout rather than a ConnectionError
+        retry = Retry(total=retries,
+                      read=False if retries == 0 else None,
+                      backoff_factor=backoff_factor,
+                      status_forcelist=tuple(status_forcelist),
+                      allowed_methods=None,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              pool_block=pool_block,
+                              max_retries=retry)
+        self.__session = requests.Session()
+        self.__session.mount("http://", adapter)
+        self.__session.mount("https://", adapter)
+        self.__adapter = adapter
+
+    @classmethod
+    def shared(cls, location: str, **options):
+
+        """ Return the HttpTransport for the host of location, creating it if needed. Clients that call the same host
+        with the same options share one transport, and so one connection pool """
+
+        parts = urlsplit(location)
+        key = (parts.scheme, parts.netloc, tuple(sorted(options.items())))
+        with cls.__shared_lock:
+            try:
+                return cls.__shared[key]
+            except KeyError:
+                logger.debug("Creating new shared transport for %s", parts.netloc)
+                transport = cls(**options)
+                cls.__shared[key] = transport
+                return transport
+
+    @classmethod
+    def _forget_shared(cls) -> None:
+
+        """ Called in a forked child process: the shared transports (and their connections) belong to the parent, so
+        the child starts with none, and opens its own connections. The lock is replaced, as another thread may have
+        held it when the process forked """
+
+        cls.__shared = {}
+        cls.__shared_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        return self.__session
+
+    def post(self, location: str, data, headers: dict, auth=None, proxies=None, verify=True, stream=False):
+        return self.session.post(location,
+                                 data=data,
+                                 headers=headers,
+                                 auth=auth,
+                                 proxies=proxies,
+                                 verify=verify,
+                                 timeout=self.timeout,
+                                 stream=stream)
+
+    def _pools(self):
+        managers = [self.__adapter.poolmanager] + list(self.__adapter.proxy_manager.values())
+        for manager in managers:
+            for key in list(manager.pools.keys()):
+                try:
+                    yield manager.pools[key]
+                except KeyError:
+                    " The pool was discarded in the meantime "
+
+    @property
+    def stats(self) -> dict:
+
+        """ Connection statistics for the pools of this transport, in total and per host. 'connections' is the number
+        of new connections opened, 'requests' the number of requests sent, and 'reused' the number of requests that
+        were sent over an existing connection """
+
+        hosts = dict()
+        for pool in self._pools():
+            host = hosts.setdefault("{0}:{1}".format(pool.host, pool.port), {"connections": 0, "requests": 0})
+            host["connections"] += pool.num_connections
+            host["requests"] += pool.num_requests
+        for host in hosts.values():
+            host["reused"] = max(host["requests"] - host["connections"], 0)
+        return {
+            "connections": sum(host["connections"] for host in hosts.values()),
+            "requests": sum(host["requests"] for host in hosts.values()),
+            "reused": sum(host["reused"] for host in hosts.values()),
+            "hosts": hosts
+        }
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncTransport:
+    """ Awaitable wrapper around a (blocking) Transport. This is not a native async HTTP client: each call is offloaded
+    to a pool of max_workers threads, so the event loop is never blocked, but every request in flight holds a thread
+    (and its stack) until the response is read. max_workers bounds the number of requests in flight at once. If no
+    transport is provided, the pooled HttpTransport shared for the host of each location is used, sized to
+    max_workers """
+
+    def __init__(self, transport: Transport = None, max_workers=10):
+        self.__transport = transport
+        self.__max_workers = max_workers
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="soapy-transport")
+
+    def transport(self, location: str) -> Transport:
+        if self.__transport is None:
+            return HttpTransport.shared(location, pool_maxsize=self.__max_workers)
+        return self.__transport
+
+    async def post(self, location: str, data, headers: dict, auth=None, proxies=None, verify=True, stream=False):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, partial(self.transport(location).post,
+                                                                   location,
+                                                                   data,
+                                                                   headers,
+                                                                   auth=auth,
+                                                                   proxies=proxies,
+                                                                   verify=verify,
+                                                                   stream=stream))
+
+    def close(self):
+        self.__executor.shutdown(wait=False)
+
+
+# A forked process (e.g. a worker of a pre-fork server) must not send requests over the connections of its parent
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=HttpTransport._forget_shared)
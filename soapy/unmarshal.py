@@ -0,0 +1,247 @@
+""" Parsing of SOAP response envelopes. The envelope is read in a single pass with lxml.etree.iterparse, keeping only
+ the subtrees of the output and fault parts that were asked for, and freeing everything else as soon as it has been
+ read. The subtrees kept are wrapped in ResponseElements, which provide the subset of the BeautifulSoup Tag interface
+ that Response (and its users) rely on, and are built lazily as they are navigated. """
+
+import logging
+
+from lxml import etree
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+XSI_NIL = "{http://www.w3.org/2001/XMLSchema-instance}nil"
+
+
+def qualified_name(namespace, name) -> str:
+
+    """ Return the name in Clark notation, {namespace}name, as lxml uses for tags """
+
+    if namespace:
+        return "{{{0}}}{1}".format(namespace, name)
+    return name
+
+
+def parse(source, names) -> dict:
+
+    """ Read the XML document from source (a file-like object returning bytes) in one pass, and return a dict
+    mapping each of the qualified names (see qualified_name) to the first element with that name, or None if the
+    document has no such element. Elements outside of those found are discarded while parsing """
+
+    found = dict((name, None) for name in names)
+    remaining = len(found)
+    # The element, if any, whose subtree is being kept
+    keeping = None
+    for event, element in etree.iterparse(source, events=("start", "end"), recover=True, huge_tree=True,
+                                          remove_comments=True, remove_pis=True):
+        if event == "start":
+            if keeping is None and found.get(element.tag, False) is None:
+                keeping = element
+            continue
+        if found.get(element.tag, False) is None:
+            found[element.tag] = element
+            remaining -= 1
+        if element is keeping:
+            keeping = None
+        elif keeping is None:
+            _discard(element)
+        if not remaining:
+            logger.debug("Found every part requested, stopped reading the response")
+            break
+    return found
+
+
+def iter_records(chunks, parents, path):
+
+    """ Parse the XML document from an iterable of bytes chunks incrementally, and yield the decoded elements found at
+    path (a list of local names) below any element with one of the qualified names in parents. Each element is
+    freed once it has been decoded, as is everything else that has been read """
+
+    parser = etree.XMLPullParser(events=("start", "end"), recover=True, huge_tree=True, remove_comments=True,
+                                 remove_pis=True)
+    parents = set(parents)
+    depth = len(path)
+    # The tags of the open elements, from the root element down
+    stack = list()
+    # The record being read, if any
+    record = None
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if event == "start":
+                stack.append(element.tag)
+                if record is None and len(stack) > depth and stack[-depth - 1] in parents \
+                        and [etree.QName(tag).localname for tag in stack[len(stack) - depth:]] == path:
+                    record = element
+                continue
+            stack.pop()
+            if element is record:
+                record = None
+                yield decode(element)
+            if record is None:
+                _discard(element)
+    parser.close()
+
+
+def decode(element):
+
+    """ Decode an element into Python values: the text of an element without child elements, or a dict mapping the
+    local names of its child elements to their decoded values, with a list of values for names that are repeated.
+    Elements that are nil are decoded as None """
+
+    if element.get(XSI_NIL) in ("true", "1"):
+        return None
+    if not len(element):
+        return element.text or ""
+    values = dict()
+    repeated = set()
+    for child in element:
+        name = etree.QName(child).localname
+        value = decode(child)
+        if name in repeated:
+            values[name].append(value)
+        elif name in values:
+            values[name] = [values[name], value]
+            repeated.add(name)
+        else:
+            values[name] = value
+    return values
+
+
+def _discard(element) -> None:
+
+    """ Free an element that has been read, and its preceding siblings, so the tree never grows beyond the path from
+    the root to the element being parsed. Elements that were kept are referenced from outside, so they survive
+    being removed from the tree """
+
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+class ResponseElement:
+    """ Read-only, BeautifulSoup Tag-like view of an element of the response. Attributes, contents and children are
+    built from the underlying lxml element on first use """
+
+    def __init__(self, element):
+        self.__element = element
+        self.__qname = etree.QName(element)
+        # Values that are evaluated lazy
+        self.__attrs = None
+        self.__contents = None
+
+    @property
+    def element(self):
+        return self.__element
+
+    @property
+    def name(self) -> str:
+        return self.__qname.localname
+
+    @property
+    def namespace(self) -> str:
+        return self.__qname.namespace
+
+    @property
+    def prefix(self) -> str:
+        return self.__element.prefix
+
+    @property
+    def attrs(self) -> dict:
+        if self.__attrs is None:
+            attrs = dict()
+            parent = self.__element.getparent()
+            inherited = parent.nsmap if parent is not None else {}
+            for prefix, namespace in self.__element.nsmap.items():
+                if inherited.get(prefix) != namespace:
+                    attrs["xmlns:" + prefix if prefix else "xmlns"] = namespace
+            prefixes = dict((namespace, prefix) for prefix, namespace in self.__element.nsmap.items())
+            for key, value in self.__element.attrib.items():
+                qname = etree.QName(key)
+                prefix = prefixes.get(qname.namespace) if qname.namespace else None
+                attrs[prefix + ":" + qname.localname if prefix else qname.localname] = value
+            self.__attrs = attrs
+        return self.__attrs
+
+    @property
+    def contents(self) -> list:
+
+        """ The text and child elements of this element in document order, like Tag.contents. Text is given as str,
+        child elements as ResponseElements """
+
+        if self.__contents is None:
+            contents = list()
+            if self.__element.text:
+                contents.append(self.__element.text)
+            for child in self.__element:
+                contents.append(ResponseElement(child))
+                if child.tail:
+                    contents.append(child.tail)
+            self.__contents = contents
+        return self.__contents
+
+    @property
+    def children(self):
+        return iter(self.contents)
+
+    @property
+    def string(self):
+
+        """ Like Tag.string: the text of this element if that is its only content, or the string of its only child
+        element. None otherwise """
+
+        if len(self.contents) != 1:
+            return None
+        child = self.contents[0]
+        if isinstance(child, str):
+            return child
+        return child.string
+
+    @property
+    def text(self) -> str:
+        return etree.tostring(self.__element, method="text", encoding=str, with_tail=False)
+
+    @property
+    def is_empty_element(self) -> bool:
+        return not self.contents
+
+    @property
+    def isSelfClosing(self) -> bool:
+        return self.is_empty_element
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    def find_all(self, name=None, attrs=None, recursive=True) -> list:
+
+        """ Return all descendant elements (or only children, if recursive is False) matching the tag name (local or
+        prefixed) and attribute values provided, in document order """
+
+        attrs = attrs or {}
+        results = list()
+        candidates = self.__element.iterdescendants() if recursive else iter(self.__element)
+        for candidate in candidates:
+            each = ResponseElement(candidate)
+            if name and name != each.name and name != "{0}:{1}".format(each.prefix, each.name):
+                continue
+            if any(each.get(key) != value for key, value in attrs.items()):
+                continue
+            results.append(each)
+        return results
+
+    __call__ = find_all
+
+    def find(self, name=None, attrs=None, recursive=True):
+        results = self.find_all(name, attrs, recursive)
+        return results[0] if results else None
+
+    def __str__(self):
+        return etree.tostring(self.__element, encoding=str, with_tail=False)
+
+    def __repr__(self):
+        return "<ResponseElement {0}>".format(self.name)
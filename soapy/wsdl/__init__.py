@@ -1,13 +1,18 @@
+import mmap
 import os
 import time
 from re import sub
-from urllib.parse import urljoin
 
 import requests
 from bs4 import BeautifulSoup
+from lxml import etree
 
+from soapy.wsdl.cache import CachedWsdl, Document, WsdlCache
+from soapy.wsdl.catalog import Catalog
 from soapy.wsdl.element import *
+from soapy.wsdl.imports import ImportResolver
 from soapy.wsdl.model import *
+from soapy.wsdl.node import Node
 from soapy.wsdl.types import *
 
 # Initialize logger for this module
@@ -18,9 +23,14 @@ class Wsdl:
     """ Class reads in WSDL and forms various child objects held together by this parent class
     Which essentially converts wsdl objects inside 'definitions' into Python native objects """
 
-    constructor_kwargs = ("proxy_url", "proxy_user", "proxy_pass", "secure", "version")
+    constructor_kwargs = ("proxy_url", "proxy_user", "proxy_pass", "secure", "version", "cache", "parser", "catalog")
     supported_versions = (1.1, 1.2)
+    supported_parsers = ("bs4", "lxml")
     w3_schemas = ("http://www.w3.org/2001/XMLSchema",)
+    # The tags of the top-level schema definitions that a type="" or base="" attribute may refer to
+    type_kinds = ("complexType", "simpleType")
+    # The number of imported documents fetched at once
+    import_workers = 8
 
     def __init__(self, wsdl_location, **kwargs):
 
@@ -33,15 +43,28 @@ class Wsdl:
         :keyword proxyPass: The password paired with the username for proxy authentication
         :keyword secure: A boolean flag, defaults to True, if SSL verification should be performed
         :keyword version: An integer representing the SOAP version (1.1 or 1.2) of the request. Default 1.1
+        :keyword cache: A soapy.wsdl.cache.WsdlCache, or the path of a directory to use as one, to load the parsed
+        WSDL and schema documents from (and store them to), instead of downloading and parsing them each time
+        :keyword parser: "bs4" (the default) to parse documents with BeautifulSoup, or "lxml" to parse them with
+        lxml directly into soapy.wsdl.node.Node trees, which is faster and uses less memory
+        :keyword catalog: A soapy.wsdl.catalog.Catalog, or the path of an XML catalog file or of a directory to use as
+        one, to read the WSDL and the schemas it imports from local files instead of the network where possible
         """
 
         self.secure = True
         self.__version = 1.1
+        self.__parser = "bs4"
         self.__proxy_url = ""
         self.__proxy_user = ""
         self.__proxy_pass = ""
         self.__schemas = None
         self.__ns_name_cache = {}
+        self.__types = {}
+        self.__cache = None
+        self.__catalog = None
+        self.__documents = list()
+        self.__timings = dict()
+        self.__from_cache = False
         self.wsdl_url = wsdl_location
         for each in kwargs:
             if each in self.constructor_kwargs:
@@ -52,13 +75,17 @@ class Wsdl:
         # Attributes that are evaluated lazy. Initializing to None to indicate they need evaluated on demand
         self.__wsdl = None
         self.__soup = None
-        self.__wsdlFile = None
         self.__services = None
         self.__schemas = None
         self.__namespace = None
+        self.__definitions = None
+        self.__models = {}
 
-        # Download the wsdl last as it relies on attributes set above
-        self._download_wsdl(wsdl_location)
+        # Load from cache or download the wsdl last as it relies on attributes set above
+        if self.cache is None or not self._load_cache():
+            self._download_wsdl(wsdl_location)
+            if self.cache is not None:
+                self._store_cache()
 
     @property
     def version(self) -> float:
@@ -71,6 +98,56 @@ class Wsdl:
                              .format(self.supported_versions, ver))
         self.__version = float(ver)
 
+    @property
+    def parser(self) -> str:
+        return self.__parser
+
+    @parser.setter
+    def parser(self, parser):
+        if parser not in self.supported_parsers:
+            raise ValueError("Supported parsers include only {}. Invalid parser specified: {}"
+                             .format(self.supported_parsers, parser))
+        self.__parser = parser
+
+    @property
+    def cache(self) -> WsdlCache:
+        return self.__cache
+
+    @cache.setter
+    def cache(self, cache):
+        if cache is not None and not isinstance(cache, WsdlCache):
+            cache = WsdlCache(cache)
+        self.__cache = cache
+
+    @property
+    def catalog(self) -> Catalog:
+        return self.__catalog
+
+    @catalog.setter
+    def catalog(self, catalog):
+        if catalog is not None and not isinstance(catalog, Catalog):
+            if os.path.isdir(catalog):
+                catalog = Catalog(directory=catalog)
+            else:
+                catalog = Catalog.from_file(catalog)
+        self.__catalog = catalog
+
+    @property
+    def from_cache(self) -> bool:
+        """ True if the model of this Wsdl was loaded from the cache, rather than downloaded and parsed """
+        return self.__from_cache
+
+    @property
+    def documents(self) -> tuple:
+        """ The soapy.wsdl.cache.Document records of the WSDL and every schema imported so far """
+        return tuple(self.__documents)
+
+    @property
+    def timings(self) -> dict:
+        """ The time taken to read (fetch or memory-map and hash) and to parse the WSDL and each document it imports,
+        as a dict of url to {"bytes": size, "fetch": seconds, "parse": seconds}. Empty if the WSDL was loaded from cache """
+        return dict(self.__timings)
+
     @property
     def proxy_url(self) -> str:
         return self.__proxy_url
@@ -90,7 +167,7 @@ class Wsdl:
 
     @proxy_user.setter
     def proxy_user(self, user: str):
-        logger.debug("Setting the proxy user to '{}'".format(user))
+        logger.debug("Setting the proxy user to '%s'", user)
         self.__proxy_user = user
         if self.__proxy_pass != "" and self.__proxy_url != "":
             self._replace_pxy()
@@ -101,7 +178,7 @@ class Wsdl:
 
     @proxy_pass.setter
     def proxy_pass(self, p: str):
-        logger.debug("Setting the proxy password with provided value".format(p))
+        logger.debug("Setting the proxy password with provided value")
         self.__proxy_pass = p
         if self.__proxy_user != "" and self.__proxy_url != "":
             self._replace_pxy()
@@ -110,7 +187,8 @@ class Wsdl:
     def proxies(self) -> dict:
         proxies = {}
         if self.proxy_url != "":
-            logger.debug("Setting proxy to {}".format(self.proxy_url.replace(self.__proxy_pass, "***")))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Setting proxy to %s", self.proxy_url.replace(self.__proxy_pass, "***"))
             proxies = {
                 "http": self.proxy_url,
                 "https": self.proxy_url,
@@ -126,27 +204,9 @@ class Wsdl:
 
     @property
     def soup(self) -> Tag:
-        if self.__soup is None:
-            logger.debug("Parsing WSDL file and rendering Element Tree")
-            with open(self.wsdlFile) as f:
-                self.__soup = BeautifulSoup(f, "xml")
-            os.remove(self.wsdlFile)
+        """ The parsed WSDL document: a BeautifulSoup, or a Node if parsed with lxml or loaded from the cache """
         return self.__soup
 
-    @property
-    def wsdlFile(self) -> str:
-
-        """ Create a temporary file, handling overlap in the off chance it already exists """
-        if self.__wsdlFile is None:
-            logger.debug("Initializing wsdl file cache")
-            f = str(os.getpid()) + ".temp"
-
-            if os.path.exists(f):
-                f = str(time.time()) + f
-            logger.info("Set wsdlFile for instance to cache: {0}".format(f))
-            self.__wsdlFile = f
-        return self.__wsdlFile
-
     @property
     def services(self) -> tuple:
 
@@ -155,24 +215,62 @@ class Wsdl:
             logger.debug("Initializing list of services with services defined in WSDL")
             services = list()
             for service in self.wsdl('service', recursive=False):
-                services.append(Service(service, self))
+                services.append(Service.from_name(service.get('name'), self))
             self.__services = tuple(services)
         return self.__services
 
+    @property
+    def definitions(self) -> dict:
+
+        """ Index of the top-level definitions of the WSDL (services, bindings, portTypes, messages) by (tag, name).
+        Where a name is defined twice for the same tag, the first definition is used """
+
+        if self.__definitions is None:
+            logger.debug("Indexing top-level definitions of WSDL")
+            definitions = dict()
+            for child in self.wsdl.children:
+                if isinstance(child, (Tag, Node)) and child.get('name') is not None:
+                    definitions.setdefault((child.name, child['name']), child)
+            self.__definitions = definitions
+        return self.__definitions
+
+    def find_definition(self, cls, tag, name) -> Element:
+
+        """ Return the model object of class cls for the top-level definition with matching tag and name, or None if
+        there is no such definition. Model objects are created once, so the same definition always returns the same
+        object """
+
+        key = (cls, name)
+        try:
+            return self.__models[key]
+        except KeyError:
+            pass
+        try:
+            bs_element = self.definitions[(tag, name)]
+        except KeyError:
+            logger.debug("No %s definition with name %s", tag, name)
+            return None
+        return self.__models.setdefault(key, cls(bs_element, self))
+
     @property
     def schemas(self) -> tuple:
         if self.__schemas is None:
-            schemas = list()
             types = self.wsdl('types', recursive=False)
             logger.info("Building list of schemas from root definitions")
+            resolver = ImportResolver(lambda url: self._read_resource(url, self._parse), self.import_workers,
+                                      self.catalog)
             # Some WSDLs defined schemas/types inside the types tag
             # Others have no types tag and import from definitions
             # Handle both cases, here
             if len(types) == 1:
-                self._append_extend_schemas(types[0], schemas, (None, True))
+                resolved = resolver.resolve(self.wsdl_url, schemas=types[0]("schema", recursive=False))
             else:
                 logger.debug("Importing root-level schemas")
-                schemas.extend(self._import_schemas(self.wsdl))
+                resolved = resolver.resolve(self.wsdl_url, importers=(self.wsdl,))
+            schemas = list()
+            for schema, is_local in resolved:
+                schemas.append(Schema(schema, self, None, is_local))
+                logger.debug("Appended schema with name '%s' to list of schemas for this WSDL", schemas[-1].name)
             self.__schemas = tuple(schemas)
         return self.__schemas
 
@@ -182,26 +280,57 @@ class Wsdl:
             self.__namespace = Namespace(self.wsdl)
         return self.__namespace
 
-    def _append_extend_schemas(self, soup, schemas: list, contructor_args: tuple):
-        for addSchema in soup("schema", recursive=False):
-            schemas.append(Schema(addSchema, self, *contructor_args))
-            logger.debug("Appended schema with name '{}' to list of schemas for this WSDL".format(schemas[-1].name))
-            schemas.extend(self._import_schemas(addSchema))
-
-    def _import_schemas(self, schema) -> list:
-        imports = schema("import", recursive=False)
-        schemas = list()
-        for each in imports:
-            if "location" in each.attrs:
-                schema_soup = self._download_schema(each["location"])
-                self._append_extend_schemas(schema_soup, schemas, (None, False))
-            elif "schemaLocation" in each.attrs:
-                schema_soup = self._download_schema(each["schemaLocation"])
-                self._append_extend_schemas(schema_soup, schemas, (None, False))
+    def preload(self) -> "Wsdl":
+
+        """ Resolve the whole model now, rather than on demand: every service, port, binding, portType, operation and
+        message, and every type defined in the schemas, with the children, attributes and facets of each. Returns the
+        Wsdl, e.g. Wsdl(url).preload()
+
+        After this, using the model only reads it. A pre-fork server (e.g. gunicorn with preload_app) can preload the
+        Wsdl of its clients in the master process, so its workers share the model's memory pages copy-on-write rather
+        than each building its own model on its first request. Calling gc.freeze() after preloading keeps the garbage
+        collector from writing to those pages in the workers too """
+
+        start = time.perf_counter()
+        self.namespace.names
+        nodes = list()
+        for schema in self.schemas:
+            schema.namespace.names
+            for child in schema.bs_element.children:
+                if isinstance(child, (Tag, Node)) and child.get("name") is not None:
+                    nodes.append(self.find_type_by_name(child["name"], schema.name, (child.name,)))
+
+        for service in self.services:
+            for port in service.ports:
+                port.location
+                port.binding.soap_actions
+                for operation in port.binding.type.operations:
+                    messages = list(operation.faults)
+                    for direction in ("input", "output"):
+                        # One-way (and notification) operations have no output (or input) message
+                        if operation.bs_element(direction):
+                            messages.append(getattr(operation, direction))
+                    for message in messages:
+                        if message is not None:
+                            nodes.extend(part.type for part in message.parts)
+
+        # The type graph may be cyclic (recursive types), so each node is resolved once
+        resolved = set()
+        while nodes:
+            node = nodes.pop()
+            if not isinstance(node, TypeBase) or id(node) in resolved:
+                continue
+            resolved.add(id(node))
+            if isinstance(node, TypeElement):
+                node.facets
+                node.attributes
             else:
-                """ Assume (for now) that it's a local schema being imported into this one """
-                # TODO update this logic to be more robust
-        return schemas
+                node.parent_attributes
+            node.element_children
+            nodes.extend(node.children)
+        logger.info("Preloaded %s type nodes of %s in %.3fs", len(resolved), self.wsdl_url,
+                    time.perf_counter() - start)
+        return self
 
     def _replace_pxy(self):
         logger.debug("Building proxy URL with credentials")
@@ -209,59 +338,143 @@ class Wsdl:
                                r"\1{}:{}@\2".format(self.__proxy_user, self.__proxy_pass),
                                self.__proxy_url)
 
-    def _get_or_open_resource(self, url):
-        """This method is required because requests can't handle file:// resources by default (requires plugin)
-        This is simpler than implementing or requiring a package. Yield lines if it's a file, otherwise yield the
-        entire text response. Not ideal but no easy way to yeild from web resource """
+    @staticmethod
+    def _map_file(location, func):
+
+        """ Return func(content), where content is a read-only memory map of the file at location (or b"" if the file
+        is empty, as an empty file can't be mapped) """
+
+        with open(location, "rb") as in_file:
+            if os.fstat(in_file.fileno()).st_size == 0:
+                return func(b"")
+            with mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                return func(content)
+
+    def _read_resource(self, url, parse):
+
+        """ Read the document at url, and return parse(content), where content is a bytes-like buffer: a memory map of
+        the file for file:// (requests can't handle file:// resources without a plugin), or the body of the response
+        for http/https. Records the Document read, for the cache """
+
+        start = time.perf_counter()
+        timing = dict()
+
+        def timed_parse(content):
+            timing["bytes"] = len(content)
+            timing["fetch"] = time.perf_counter() - start
+            document = parse(content)
+            timing["parse"] = time.perf_counter() - start - timing["fetch"]
+            return document
+
         if url.startswith("file://"):
-            logger.info("Reading file from {}".format(url))
-            wsdl_location = url.replace("file://", "")
-            with open(wsdl_location) as in_file:
-                for line in in_file:
-                    yield line
-        elif url.startswith("http://"):
-            logger.info("Downloading file from {}".format(url))
-            yield requests.get(url, proxies=self.proxies).text
-        elif url.startswith("https://"):
-            logger.info("Downloading file from {} with secure={}".format(url, self.secure))
-            yield requests.get(url, verify=self.secure, proxies=self.proxies).text
+            logger.info("Reading file from %s", url)
+            location = url.replace("file://", "")
+            mtime = os.path.getmtime(location)
+
+            def hash_and_parse(content):
+                return Document.hash(content), timed_parse(content)
+
+            digest, document = self._map_file(location, hash_and_parse)
+            self.__documents.append(Document(url, digest, mtime=mtime))
+        elif url.startswith("http://") or url.startswith("https://"):
+            if self.catalog is not None:
+                path = self.catalog.find(url)
+                if path is not None:
+                    logger.info("Reading %s from catalog file %s", url, path)
+                    return self._read_resource("file://" + os.path.abspath(path), parse)
+                if self.catalog.offline:
+                    raise ValueError("{0} is not in the catalog, and the catalog is offline".format(url))
+            logger.info("Downloading file from %s with secure=%s", url, self.secure)
+            response = requests.get(url, verify=self.secure, proxies=self.proxies)
+            self.__documents.append(Document(url, Document.hash(response.content),
+                                             etag=response.headers.get("ETag"),
+                                             last_modified=response.headers.get("Last-Modified")))
+            if self.catalog is not None and response.ok:
+                self.catalog.store(url, response.content)
+            document = timed_parse(response.content)
         else:
-            logger.critical("Unsupported protocol for location: {0}".format(url))
+            logger.critical("Unsupported protocol for location: %s", url)
             raise ValueError("Unsupported protocol for WSDL location: {0}".format(url))
+        self.__timings[url] = timing
+        logger.info("Read %s (%s bytes): fetched in %.3fs, parsed in %.3fs", url, timing["bytes"], timing["fetch"],
+                    timing["parse"])
+        return document
+
+    def _parse(self, content):
+
+        """ Parse a WSDL or schema document from a bytes-like buffer. With the lxml parser, the document is built as
+        Nodes directly. Entities are never resolved, so a document can't read local files or make requests """
+
+        if self.parser == "lxml":
+            parser = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+            return Node("[document]", contents=[Node.from_element(etree.fromstring(content, parser))])
+        # BeautifulSoup only accepts bytes or str, not buffers
+        return BeautifulSoup(bytes(content), "xml")
+
+    def _document_is_current(self, document: Document) -> bool:
+
+        """ Check whether a cached document still matches its source, by modification time (or else content hash) for
+        files, and by a conditional request (or else content hash) for http/https """
+
+        if document.url.startswith("file://"):
+            location = document.url.replace("file://", "")
+            try:
+                mtime = os.path.getmtime(location)
+            except OSError:
+                return False
+            if mtime == document.mtime:
+                return True
+            return self._map_file(location, Document.hash) == document.digest
+
+        headers = {}
+        if document.etag is not None:
+            headers["If-None-Match"] = document.etag
+        if document.last_modified is not None:
+            headers["If-Modified-Since"] = document.last_modified
+        try:
+            response = requests.get(document.url, headers=headers, verify=self.secure, proxies=self.proxies)
+        except requests.RequestException as e:
+            logger.warning("Unable to revalidate %s, using cached copy: %s", document.url, e)
+            return True
+        if response.status_code == 304:
+            return True
+        return response.ok and Document.hash(response.content) == document.digest
+
+    def _load_cache(self) -> bool:
+
+        """ Initialize the model from the cache entry of this WSDL, if there is one and all of its documents are
+        current. Returns whether the cache was used """
+
+        entry = self.cache.load(self.wsdl_url)
+        if entry is None:
+            return False
+        for document in entry.documents:
+            if not self._document_is_current(document):
+                logger.info("Cached copy of %s is stale, reloading %s", document.url, self.wsdl_url)
+                return False
+        logger.info("Loaded WSDL documents for %s from cache", self.wsdl_url)
+        self.__soup = Node("[document]", contents=[entry.definitions])
+        self.__wsdl = entry.definitions
+        self.__schemas = tuple(Schema(schema, self, None, is_local) for schema, is_local in entry.schemas)
+        self.__documents = list(entry.documents)
+        self.__from_cache = True
+        return True
+
+    def _store_cache(self) -> None:
+
+        """ Resolve all schemas, including imports, and store the WSDL and schema documents in the cache """
+
+        memo = {}
+        definitions = Node.from_tag(self.wsdl, memo)
+        schemas = [(Node.from_tag(schema.bs_element, memo), schema.is_local) for schema in self.schemas]
+        self.cache.store(CachedWsdl(self.wsdl_url, definitions, schemas, self.__documents))
 
     def _download_wsdl(self, url):
 
-        """ Downloads a WSDL from a remote location, attempting to account for proxy,
-        then saves it to the proper filename for reading """
-
-        wsdl_text = self._get_or_open_resource(url)
-        with open(self.wsdlFile, "w") as f:
-            for line in wsdl_text:
-                f.write(line)
-
-    def _download_schema(self, url) -> Tag:
-
-        """ To import, we need to support relative paths. Unfortunately, because we support file:// without requiring
-        an actual valid URL (backslashes/space are allowed), so if we're dealing with a file://, we need to convert
-        to a valid URL and then process it with urljoin to compensate for relative paths. This adds the requirement
-        that the WSDL file be absolute, and not relative."""
-
-        if self.wsdl_url.startswith("file://") and not "://" in url:
-            # Since file:// isn't a url, we can't use urljoin. Converting to a URL is possible, but converting back
-            # into a file path is annoying difficult to be cross-platform and robust. So, we're just going to handle
-            # the relative path possibility here, manually. We're going to assume that it's either in a more
-            # progressive path or the current path(basically, no '..' references)
-            from re import sub
-            # remove the filename from wsdl_url, leaving only the path
-            pattern = r"(file://.*{0})[^{0}]*".format(os.sep).replace("\\", "\\\\")
-            ref_dir = sub(pattern, r"\1", self.wsdl_url)
-            url = ref_dir + url
-        else:
-            url = urljoin(self.wsdl_url, url)
-        logger.debug("Importing schema from url: {0}".format(url))
-        response = "".join(line for line in self._get_or_open_resource(url))
-        schema = BeautifulSoup(response, "xml")
-        return schema
+        """ Downloads a WSDL from a remote location, attempting to account for proxy, and parses it in memory """
+
+        logger.debug("Parsing WSDL file and rendering Element Tree")
+        self.__soup = self._read_resource(url, self._parse)
 
     def __str__(self):
         return self.wsdl.prettify()
@@ -304,15 +517,15 @@ class Wsdl:
             raise NotImplementedError("XML Element Type <{0}> not yet implemented".format(element.name))
 
     def _find_namespace(self, ns) -> str:
-        logger.debug("Searching for namespace with id '{0}' in all locations".format(ns))
+        logger.debug("Searching for namespace with id '%s' in all locations", ns)
         try:
             target_ns = self.namespace.resolve_namespace(ns)
-            logger.debug("Found namespace defined in Definitions: {0}".format(target_ns))
+            logger.debug("Found namespace defined in Definitions: %s", target_ns)
         except KeyError:
             for schema in self.schemas:
                 try:
                     target_ns = schema.namespace.resolve_namespace(ns)
-                    logger.debug("Found namespace defined in schema: {0}".format(target_ns))
+                    logger.debug("Found namespace defined in schema: %s", target_ns)
                     break
                 except KeyError:
                     pass
@@ -325,10 +538,14 @@ class Wsdl:
             return empty string here and all schemas will be searched, using the first match. """
             return ""
 
-    def find_type_by_name(self, name, target_ns='') -> Element:
+    def find_type_by_name(self, name, target_ns='', kinds=None) -> Element:
 
         """ Given a name, find the type and schema object
-         The name should include the namespace as bs4 provides """
+         The name should include the namespace as bs4 provides. If kinds (a tuple of tag names, e.g. ("element",)) is
+         provided, a definition of one of those kinds is preferred where a name is defined more than once.
+
+         Each definition is resolved once, and the same object is returned for it every time after, so the type graph
+         is shared (and may contain cycles, for recursive types). """
 
         # With XSD imports, things can get confusing. Lxml consolidates namespaces from schemas defined
         # in the physical wsdl file into the definitions, but imported schemas do not get consolidated.
@@ -337,7 +554,7 @@ class Wsdl:
         # If no identifier is provided, then we know it must be in the targetNs provided. If targetNs is not
         # provided, then it's defined within the Wsdl definitions, or in a local schema not in the imported schemas.
 
-        logger.debug("Searching for type with name {0} in namespace {1}".format(name, target_ns))
+        logger.debug("Searching for type with name %s in namespace %s", name, target_ns)
         try:
             ns, name = name.split(":")
         except ValueError:
@@ -355,8 +572,7 @@ class Wsdl:
                 if schema.name == target_ns:
                     if not schema.is_local:
                         if schema.namespace.resolve_namespace(ns) == target_ns:
-                            logger.debug("Remote type with ns of '{0}' confirmed to be defined in parent schema"
-                                         .format(ns))
+                            logger.debug("Remote type with ns of '%s' confirmed to be defined in parent schema", ns)
                         else:
                             target_ns = self._find_namespace(ns)
                     else:
@@ -368,37 +584,41 @@ class Wsdl:
         if target_ns in self.w3_schemas:
             return None
 
-        def scan_schema() -> bool:
-            for child in schema.bs_element.children:
-                try:
-                    self.__ns_name_cache[target_ns][child["name"]] = (child, schema)
-                    if name == child["name"]:
-                        return True
-                except (KeyError, TypeError):
-                    pass
-            return False
+        logger.debug("Type resides in namespace of %s", target_ns)
+        if not target_ns:
+            logger.error("Unable to identify target namespace! This is probably due to a bug in xml modules. "
+                         + "First global match will be used")
+        candidates = self._schema_definitions(target_ns).get(name, ())
+        if not candidates:
+            logger.warning("Unable to find Type based on name %s", name)
+            return None
+        bs_element, schema = candidates[0]
+        for candidate in candidates:
+            if kinds is None or candidate[0].name in kinds:
+                bs_element, schema = candidate
+                break
 
-        logger.debug("Type resides in namespace of {0}".format(target_ns))
-        if target_ns not in self.__ns_name_cache:
-            self.__ns_name_cache[target_ns] = {}
-        if name not in self.__ns_name_cache[target_ns]:
-            for schema in self.schemas:
-                if schema.name == target_ns:
-                    logger.debug("Found schema matching namespace of {0}:{1}".format(ns, schema.name))
-                    result = scan_schema()
-                    if result:
-                        break
-
-                elif not target_ns:
-                    logger.error("Unable to identify target namespace! This is probably due to a bug in xml modules. "
-                                 + "First global match will be used")
-                    tags = schema.bs_element("", {"name": name}, recursive=False)
-                    if len(tags) > 0:
-                        self.__ns_name_cache[target_ns][name] = (tags[0], schema)
-                        break
-
-        if name in self.__ns_name_cache[target_ns]:
-            return self.type_factory(*self.__ns_name_cache[target_ns][name])
-
-        logger.warning("Unable to find Type based on name {0}".format(name))
-        return None
+        key = (schema.name, name, bs_element.name)
+        try:
+            return self.__types[key]
+        except KeyError:
+            return self.__types.setdefault(key, self.type_factory(bs_element, schema))
+
+    def _schema_definitions(self, target_ns) -> dict:
+
+        """ Index, by name, of the top-level definitions in the schemas with the target namespace (or in all schemas,
+        if the target namespace is unknown), as lists of (bs_element, schema) in document order """
+
+        try:
+            return self.__ns_name_cache[target_ns]
+        except KeyError:
+            pass
+        logger.debug("Indexing definitions of schemas with namespace %s", target_ns)
+        definitions = dict()
+        for schema in self.schemas:
+            if target_ns and schema.name != target_ns:
+                continue
+            for child in schema.bs_element.children:
+                if isinstance(child, (Tag, Node)) and child.get("name") is not None:
+                    definitions.setdefault(child["name"], []).append((child, schema))
+        return self.__ns_name_cache.setdefault(target_ns, definitions)
@@ -0,0 +1,180 @@
+""" A persistent, on-disk cache of parsed WSDL documents. Each entry holds the definitions and every schema (local
+ or imported) of a WSDL as soapy.wsdl.node.Node trees, so a warm start can skip downloading and parsing the WSDL and
+ its imports. The model objects (services, ports, bindings, types) are still built lazily from those Nodes, as they
+ are from a parsed document. Entries are keyed by the URL of the WSDL, and are validated against the content hash and
+ the HTTP validators (ETag/Last-Modified) or file modification time of every document they were built from. The total
+ size of the cache directory is bounded; the least recently used entries are evicted first.
+
+ Entries are stored as JSON, so reading a cache entry can never execute code. A writable cache directory still lets
+ its writers change the WSDL model other processes load, so only share a directory with trusted users. """
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from soapy.wsdl.node import Node
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+
+class Document:
+    """ Records where a WSDL or schema document was loaded from, and the information needed to tell if it changed """
+
+    fields = ("url", "digest", "etag", "last_modified", "mtime")
+
+    def __init__(self, url, digest, etag=None, last_modified=None, mtime=None):
+        self.url = url
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+        self.mtime = mtime
+
+    @staticmethod
+    def hash(content) -> str:
+        """ Hash the content of a document, given as a str or a bytes-like buffer """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return hashlib.sha1(content).hexdigest()
+
+
+class CachedWsdl:
+    """ The cached documents of a WSDL: the definitions Node, a tuple of (schema Node, is_local) pairs, and the
+    Documents everything was built from """
+
+    def __init__(self, url, definitions, schemas, documents):
+        self.url = url
+        self.definitions = definitions
+        self.schemas = tuple(schemas)
+        self.documents = tuple(documents)
+
+    def dumps(self) -> str:
+
+        """ Serialize to JSON. Each Node is written once, and later references to it (like the local schemas, which
+        are also part of the definitions) are written as {"ref": index} """
+
+        ids = {}
+
+        def encode(node):
+            if id(node) in ids:
+                return {"ref": ids[id(node)]}
+            ids[id(node)] = len(ids)
+            return {"name": node.name,
+                    "prefix": node.prefix,
+                    "namespace": node.namespace,
+                    "attrs": node.attrs,
+                    "string": node.string,
+                    "contents": [encode(child) for child in node.contents]}
+
+        return json.dumps({"url": self.url,
+                           "definitions": encode(self.definitions),
+                           "schemas": [[encode(schema), is_local] for schema, is_local in self.schemas],
+                           "documents": [dict((field, getattr(document, field)) for field in Document.fields)
+                                         for document in self.documents]})
+
+    @classmethod
+    def loads(cls, text: str):
+        nodes = []
+
+        def decode(value):
+            if "ref" in value:
+                return nodes[value["ref"]]
+            node = Node(value["name"], value["attrs"], value["namespace"], value["prefix"], string=value["string"])
+            nodes.append(node)
+            node.contents = [decode(child) for child in value["contents"]]
+            return node
+
+        entry = json.loads(text)
+        return cls(entry["url"],
+                   decode(entry["definitions"]),
+                   [(decode(schema), is_local) for schema, is_local in entry["schemas"]],
+                   [Document(**document) for document in entry["documents"]])
+
+
+class WsdlCache:
+    """ Directory of cached WSDL entries, bounded to max_size bytes """
+
+    extension = ".wsdlc"
+
+    def __init__(self, directory, max_size=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, url) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest() + self.extension)
+
+    def load(self, url):
+
+        """ Return the CachedWsdl stored for the url, or None if there is no (readable) entry. The caller is
+        responsible for validating the documents of the entry before using it """
+
+        path = self.path(url)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = CachedWsdl.loads(f.read())
+        except FileNotFoundError:
+            logger.debug("No cache entry for %s", url)
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Discarding unreadable cache entry %s: %s", path, e)
+            self.discard(url)
+            return None
+        if entry.url != url:
+            logger.warning("Discarding cache entry %s as it does not belong to %s", path, url)
+            self.discard(url)
+            return None
+        # Touch the entry so eviction sees it as recently used
+        os.utime(path)
+        return entry
+
+    def store(self, entry: CachedWsdl) -> None:
+        path = self.path(entry.url)
+        # Write to a temporary file and rename it into place, so concurrent readers never see a partial entry
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(entry.dumps())
+            os.replace(temp, path)
+        except BaseException:
+            os.remove(temp)
+            raise
+        logger.info("Stored WSDL documents for %s in %s", entry.url, path)
+        self.evict()
+
+    def discard(self, url) -> None:
+        try:
+            os.remove(self.path(url))
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> None:
+
+        """ Remove the least recently used entries until the cache fits in max_size """
+
+        entries = list()
+        for name in os.listdir(self.directory):
+            if name.endswith(self.extension):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    # Another process evicted it first
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            logger.info("Evicting cache entry %s", name)
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    @property
+    def size(self) -> int:
+        return sum(os.path.getsize(os.path.join(self.directory, name))
+                   for name in os.listdir(self.directory) if name.endswith(self.extension))
@@ -0,0 +1,133 @@
+""" A local catalog of WSDL and schema documents, in the style of an OASIS XML catalog, so documents usually fetched
+ over the network are read from local files instead. A Catalog maps
+
+ - URLs, or the target namespaces of imported schemas, to local files (<uri name="..." uri="..."/> entries)
+ - URL prefixes to local directories (<rewriteURI uriStartString="..." rewritePrefix="..."/> entries)
+
+ and may have a directory of documents, stored by URL. Documents that aren't in the catalog are fetched from the
+ network as usual, and written through to that directory, so the next start reads them locally. With offline set,
+ documents not in the catalog raise an error instead of being fetched. """
+
+import hashlib
+import logging
+import os
+import tempfile
+from urllib.parse import urlsplit
+
+from lxml import etree
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+
+class Catalog:
+    """ Maps the URLs and namespaces of documents to local files
+
+    :param uris: dict of URL or namespace to the path of a local file
+    :param rewrites: dict of URL prefix to the path of a local directory. A URL starting with the prefix is read from
+    the rest of the URL, below the directory
+    :param directory: A directory of documents stored by URL, e.g. http://host/a/b.xsd is stored as
+    directory/http/host/a/b.xsd. It may be populated ahead of time (e.g. for tests or deployments without network)
+    :param write_through: If True (and there is a directory), documents fetched from the network are stored in it
+    :param offline: If True, documents not in the catalog are never fetched from the network
+    """
+
+    xmlns = "urn:oasis:names:tc:entity:xmlns:xml:catalog"
+
+    def __init__(self, uris=None, rewrites=None, directory=None, write_through=True, offline=False):
+        self.uris = dict(uris or {})
+        self.rewrites = dict(rewrites or {})
+        self.directory = directory
+        self.write_through = write_through
+        self.offline = offline
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+
+        """ Load the uri, system, rewriteURI and rewriteSystem entries of an XML catalog file. Relative paths are
+        relative to the directory of the catalog file """
+
+        base = os.path.dirname(os.path.abspath(path))
+
+        def local(uri):
+            if uri.startswith("file://"):
+                uri = uri[len("file://"):]
+            return os.path.join(base, uri)
+
+        uris = dict()
+        rewrites = dict()
+        root = etree.parse(path, etree.XMLParser(resolve_entities=False, no_network=True)).getroot()
+        for entry in root.iter("{%s}*" % cls.xmlns):
+            tag = etree.QName(entry).localname
+            if tag == "uri":
+                uris[entry.get("name")] = local(entry.get("uri"))
+            elif tag == "system":
+                uris[entry.get("systemId")] = local(entry.get("uri"))
+            elif tag == "rewriteURI":
+                rewrites[entry.get("uriStartString")] = local(entry.get("rewritePrefix"))
+            elif tag == "rewriteSystem":
+                rewrites[entry.get("systemIdStartString")] = local(entry.get("rewritePrefix"))
+        logger.info("Loaded %s uri and %s rewrite entries from catalog %s", len(uris), len(rewrites), path)
+        return cls(uris, rewrites, **kwargs)
+
+    def resolve_namespace(self, namespace) -> str:
+        """ Return the path of the local file for the schema of the namespace, or None if there isn't one """
+        path = self.uris.get(namespace)
+        if path is not None and os.path.isfile(path):
+            return path
+        return None
+
+    def path(self, url) -> str:
+
+        """ The path a URL is stored under in the directory of the catalog. The query, if any, is hashed into the
+        name, as are paths that would otherwise name a directory """
+
+        parts = urlsplit(url)
+        segments = self._segments(parts.path)
+        if not segments or parts.path.endswith("/"):
+            segments.append("index")
+        if parts.query:
+            segments[-1] += "-" + hashlib.sha1(parts.query.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.directory, parts.scheme, parts.netloc.replace(":", "_"), *segments)
+
+    @staticmethod
+    def _segments(path) -> list:
+        """ The segments of a URL path, without the empty and dot segments, so a path never leaves its directory """
+        return [segment for segment in path.split("/") if segment not in ("", ".", "..")]
+
+    def find(self, url) -> str:
+
+        """ Return the path of the local file for the URL, or None if the catalog has none """
+
+        candidates = list()
+        if url in self.uris:
+            candidates.append(self.uris[url])
+        for prefix in sorted(self.rewrites, key=len, reverse=True):
+            if url.startswith(prefix):
+                candidates.append(os.path.join(self.rewrites[prefix], *self._segments(url[len(prefix):])))
+                break
+        if self.directory is not None:
+            candidates.append(self.path(url))
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def store(self, url, content) -> None:
+
+        """ Write the content fetched for the URL through to the directory of the catalog, if writing through """
+
+        if self.directory is None or not self.write_through:
+            return
+        path = self.path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file and rename it into place, so concurrent readers never see a partial document
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(temp, path)
+        except BaseException:
+            os.remove(temp)
+            raise
+        logger.info("Stored %s in catalog as %s", url, path)
@@ -6,6 +6,8 @@ import logging
 
 from bs4 import Tag
 
+from soapy.wsdl.node import Node
+
 # Initialize logger for this module
 logger = logging.getLogger(__name__)
 
@@ -16,7 +18,7 @@ class Namespace:
 
     def __init__(self, parent):
         self.__parent = parent
-        logger.debug("Initializing Namespace object for element {0}".format(parent.name))
+        logger.debug("Initializing Namespace object for element %s", parent.name)
 
         # Values that are evaluated lazy
         self.__names = None
@@ -29,13 +31,13 @@ class Namespace:
     def names(self) -> tuple:
 
         if self.__names is None:
-            logger.debug("Initializing list of namespaces names for {0} element".format(self.parent.name))
+            logger.debug("Initializing list of namespaces names for %s element", self.parent.name)
             attrs = list()
             for key in self.parent.attrs.keys():
                 if key.startswith('xmlns'):
                     try:
                         attrs.append(key.split(":")[1])
-                        logger.info("Found namespace '{0}'".format(key.split(":")[1]))
+                        logger.info("Found namespace '%s'", key.split(":")[1])
                     except IndexError:
                         pass
             self.__names = tuple(attrs)
@@ -61,31 +63,21 @@ class Element:
         self.__parent = wsdl
         self.__schema = schema
         self.__is_local = is_local
-        logger.info("Initialized {0} with name of {1}".format(self.__bs_element.name, self.name))
+        logger.info("Initialized %s with name of %s", self.__bs_element.name, self.name)
 
         # Values that are evaluated lazy
         self.__namespace = None
         self.__children = None
 
-        # Below is a provision utilized by TypeElements to prevent recursion on recursive XSD types
-        # As bsElements are shared across TypeElements/Elements when they refer to the same element in the WSDL
-        if self.bs_element.counter is None:
-            self.bs_element.counter = 1
-        else:
-            self.bs_element.counter += 1
-
     @classmethod
     def from_name(cls, name, parent):
 
-        """ Searches the wsdl for an element with matching name and tag, returns appropriate object """
+        """ Looks up the top-level wsdl definition with matching name and tag, returns appropriate object """
 
         tag = cls.__name__
         tag = tag[:1].lower() + tag[1:]  # Lowercase the first letter of the class name
-        ports = parent.wsdl(tag, recursive=False)
-        logger.debug("Searching for {1} element with name matching {0}".format(name, cls.__name__))
-        for port in ports:
-            if port.get('name') == name:
-                return cls(port, parent)
+        logger.debug("Searching for %s element with name matching %s", cls.__name__, name)
+        return parent.find_definition(cls, tag, name)
 
     @property
     def schema(self):
@@ -120,10 +112,10 @@ class Element:
     @property
     def children(self) -> tuple:
         if self.__children is None:
-            logger.debug("Retrieving list of children for Element {}".format(self.name))
+            logger.debug("Retrieving list of children for Element %s", self.name)
             children = list()
             for each in self.bs_element.children:
-                if not isinstance(each, Tag):
+                if not isinstance(each, (Tag, Node)):
                     continue
                 children.append(self.parent.type_factory(each, self.schema))
             self.__children = tuple(children)
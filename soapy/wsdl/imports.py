@@ -0,0 +1,129 @@
+""" Resolution of the schemas imported by a WSDL. The documents referenced by <import location=""/> and
+ <import schemaLocation=""/> are fetched concurrently, a branch of the import graph at a time as soon as its parent
+ document is parsed, and each document is fetched and parsed once however many times it's imported, so diamond and
+ cyclic imports are handled. Documents are identified by their normalised URL. """
+
+import logging
+import os
+import posixpath
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+
+class ImportResolver:
+    """ Resolves imports with read(url), which returns the parsed document at a (normalised) url, from a pool of
+    max_workers threads. If a soapy.wsdl.catalog.Catalog is provided, imports of a namespace it has a local file for
+    are read from that file, whatever their location """
+
+    default_ports = {"http": 80, "https": 443}
+
+    def __init__(self, read, max_workers=8, catalog=None):
+        self.__read = read
+        self.__max_workers = max_workers
+        self.__catalog = catalog
+
+    @classmethod
+    def normalise(cls, url) -> str:
+
+        """ Normalise a URL, so that the different spellings of the URL of a document compare equal: the scheme and
+        host are lower-cased, default ports, fragments and dot segments of the path are removed """
+
+        if url.startswith("file://"):
+            return "file://" + os.path.normpath(url[len("file://"):])
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc.lower()
+        if parts.port is not None and parts.port == cls.default_ports.get(scheme):
+            netloc = netloc.rsplit(":", 1)[0]
+        path = posixpath.normpath(parts.path) if parts.path else "/"
+        if parts.path.endswith("/") and not path.endswith("/"):
+            path += "/"
+        return urlunsplit((scheme, netloc, path, parts.query, ""))
+
+    @classmethod
+    def join(cls, base, location) -> str:
+
+        """ Resolve the location of an import against the URL of the document it's in. file:// locations are paths,
+        which may not be valid URLs (backslashes and spaces are allowed), so they are joined as paths """
+
+        if "://" in location:
+            url = location
+        elif base.startswith("file://"):
+            url = "file://" + os.path.join(os.path.dirname(base[len("file://"):]), location)
+        else:
+            url = urljoin(base, location)
+        return cls.normalise(url)
+
+    def locations(self, tag) -> list:
+        """ The locations imported by the tag, a schema or the definitions of a WSDL """
+        locations = list()
+        for each in tag("import", recursive=False):
+            location = each.get("location", each.get("schemaLocation"))
+            if self.__catalog is not None and each.get("namespace") is not None:
+                path = self.__catalog.resolve_namespace(each["namespace"])
+                if path is not None:
+                    location = "file://" + os.path.abspath(path)
+            if location is not None:
+                locations.append(location)
+            else:
+                """ Assume (for now) that it's a local schema being imported into this one """
+        return locations
+
+    def fetch(self, base_url, importers) -> dict:
+
+        """ Fetch and parse every document imported by the importers (tags in the document at base_url), and by the
+        schemas of those documents, recursively. Returns a dict mapping each normalised URL to its parsed document """
+
+        documents = dict()
+        pending = dict()
+        seen = {self.normalise(base_url)}
+
+        def submit(base, tag):
+            for location in self.locations(tag):
+                url = self.join(base, location)
+                if url not in seen:
+                    seen.add(url)
+                    logger.debug("Importing schema from url: %s", url)
+                    pending[executor.submit(self.__read, url)] = url
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers, thread_name_prefix="soapy-import") as executor:
+            for importer in importers:
+                submit(base_url, importer)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = pending.pop(future)
+                    documents[url] = future.result()
+                    for schema in documents[url]("schema", recursive=False):
+                        submit(url, schema)
+        return documents
+
+    def resolve(self, base_url, schemas=(), importers=()) -> list:
+
+        """ Return (schema tag, is_local) for the local schemas, and for each schema imported by them or by the
+        importers, recursively, in depth first order (each schema followed by those it imports). Each imported
+        document is included once, where it is first imported """
+
+        documents = self.fetch(base_url, tuple(schemas) + tuple(importers))
+        resolved = list()
+        visited = {self.normalise(base_url)}
+
+        def follow(base, tag):
+            for location in self.locations(tag):
+                url = self.join(base, location)
+                if url in visited:
+                    continue
+                visited.add(url)
+                for schema in documents[url]("schema", recursive=False):
+                    resolved.append((schema, False))
+                    follow(url, schema)
+
+        for schema in schemas:
+            resolved.append((schema, True))
+            follow(base_url, schema)
+        for importer in importers:
+            follow(base_url, importer)
+        return resolved
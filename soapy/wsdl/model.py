@@ -19,7 +19,7 @@ class Service(Element):
     @property
     def ports(self) -> tuple:
         if self.__ports is None:
-            logger.debug("Initializing list of ports defined for service {0}".format(self.name))
+            logger.debug("Initializing list of ports defined for service %s", self.name)
             ports = list()
             for port in self.bs_element('port', recursive=False):
                 ports.append(Port(port, self.parent))
@@ -37,7 +37,7 @@ class PortType(Element):
     @property
     def operations(self) -> tuple:
         if self.__operations is None:
-            logger.debug("Initializing operations for portType {0} from wsdl".format(self.name))
+            logger.debug("Initializing operations for portType %s from wsdl", self.name)
             operations = list()
             for operation in self.bs_element('operation', recursive=False):
                 operations.append(Operation(operation, self.parent))
@@ -65,11 +65,12 @@ class Binding(Element):
 
         # Attributes to be evaluated lazy
         self.__type = None
+        self.__soap_actions = None
 
     @property
     def type(self) -> PortType:
         if self.__type is None:
-            logger.debug("Initializing portType from binding {0}".format(self.name))
+            logger.debug("Initializing portType from binding %s", self.name)
             (ns, name) = self.bs_element['type'].split(":")
             self.__type = PortType.from_name(name, self.parent)
         return self.__type
@@ -78,21 +79,42 @@ class Binding(Element):
     def ns(self) -> str:
         return self.__ns
 
+    @property
+    def soap_actions(self) -> dict:
+
+        """ Map of the name of each operation in the binding to its soapAction, or None if it has none """
+
+        if self.__soap_actions is None:
+            logger.debug("Initializing soap actions for binding %s", self.name)
+            soap_actions = dict()
+            for operation in self.bs_element('operation', recursive=False):
+                if operation['name'] not in soap_actions:
+                    # soap:operation is optional in a binding operation
+                    tags = operation('operation', recursive=False)
+                    soap_actions[operation['name']] = tags[0].get('soapAction') if tags else None
+            self.__soap_actions = soap_actions
+        return self.__soap_actions
+
     def get_soap_action(self, op_name) -> str:
 
         """ Given the name of an operation, return the soap action """
 
-        operations = self.bs_element('operation', recursive=False)
-        for operation in operations:
-            if operation['name'] == op_name:
-                soap_op = operation('operation')[0]
-                try:
-                    return soap_op['soapAction']
-                except KeyError:
-                    logger.warning("Binding operation does not contain a soapAction element")
-                    return None
+        try:
+            soap_action = self.soap_actions[op_name]
+        except KeyError:
+            logger.warning("Could not find matching operation, %s in binding %s", op_name, self.name)
+            return None
+        if soap_action is None:
+            logger.warning("Binding operation does not contain a soapAction element")
+        return soap_action
+
+    def soap_action_header(self, op_name) -> str:
+
+        """ Given the name of an operation, return the value of the SOAPAction HTTP header to call it with: the quoted
+        soap action, or "" if it has none """
 
-        logger.warning("Could not find matching operation, {0} in binding {1}".format(op_name, self.name), 2)
+        soap_action = self.get_soap_action(op_name)
+        return '"' + (soap_action or "") + '"'
 
 
 class Port(Element):
@@ -106,7 +128,7 @@ class Port(Element):
     @property
     def binding(self) -> Binding:
         if self.__binding is None:
-            logger.debug("Initializing binding attribute for port {0}".format(self.name))
+            logger.debug("Initializing binding attribute for port %s", self.name)
             binding = self.bs_element['binding']
             (ns, name) = binding.split(':')
             self.__binding = Binding.from_name(name, self.parent)
@@ -117,7 +139,7 @@ class Port(Element):
         if self.__location is None:
             logger.debug("Initializing location of Port based on address element")
             self.__location = self.bs_element('address', recursive=False)[0]['location']
-            logger.info("Initialized location to {0}".format(self.__location))
+            logger.info("Initialized location to %s", self.__location)
         return self.__location
 
     @location.setter
@@ -134,7 +156,7 @@ class Message(Element):
     @property
     def parts(self) -> tuple:
         if self.__parts is None:
-            logger.debug("Initializing parts for message {0}".format(self.name))
+            logger.debug("Initializing parts for message %s", self.name)
             parts = list()
             for part in self.bs_element('part', recursive=False):
                 parts.append(Part(part, self.parent))
@@ -151,7 +173,7 @@ class Part(Element):
     @property
     def type(self) -> Element:
         if self.__type is None:
-            self.__type = self.parent.find_type_by_name(self.bs_element['element'])
+            self.__type = self.parent.find_type_by_name(self.bs_element['element'], kinds=("element",))
         return self.__type
 
     @property
@@ -0,0 +1,156 @@
+""" Nodes are a compact, BeautifulSoup-free representation of the XML tags in a WSDL or schema document. They
+ implement the small subset of the bs4 Tag interface that the wsdl model relies on (attribute access, find_all
+ style calls by tag name, children and text), so model objects can wrap either a Tag or a Node interchangeably.
+ Unlike Tags, Nodes hold no parser or sibling references and are cheap to pickle. """
+
+from xml.sax.saxutils import escape, quoteattr
+
+from bs4 import Comment, Declaration, Doctype, NavigableString, ProcessingInstruction, Tag
+from lxml import etree
+
+
+class Node:
+    """ A single XML element, its attributes and its element children """
+
+    __slots__ = ("name", "prefix", "namespace", "attrs", "contents", "string")
+
+    def __init__(self, name, attrs=None, namespace=None, prefix=None, contents=None, string=""):
+        self.name = name
+        self.prefix = prefix
+        self.namespace = namespace
+        self.attrs = dict(attrs or {})
+        self.contents = list(contents or [])
+        self.string = string
+
+    @classmethod
+    def from_tag(cls, tag, memo=None):
+
+        """ Convert a BeautifulSoup Tag, and all of its descendant Tags, into Nodes. If a memo dict is provided, it
+        maps id(Tag) to the converted Node so the same Tag converted twice yields the same Node """
+
+        if isinstance(tag, Node):
+            return tag
+        if memo is None:
+            memo = {}
+        try:
+            return memo[id(tag)]
+        except KeyError:
+            pass
+        node = cls(tag.name,
+                   dict((str(key), value) for key, value in tag.attrs.items()),
+                   tag.namespace,
+                   tag.prefix)
+        memo[id(tag)] = node
+        strings = list()
+        for child in tag.children:
+            if isinstance(child, Tag):
+                node.contents.append(cls.from_tag(child, memo))
+            elif isinstance(child, NavigableString) \
+                    and not isinstance(child, (Comment, Declaration, Doctype, ProcessingInstruction)):
+                strings.append(str(child))
+        # Text (including CDATA) is kept, unless it's only the whitespace between tags, which is insignificant
+        string = "".join(strings)
+        if string.strip():
+            node.string = string
+        return node
+
+    @classmethod
+    def from_element(cls, element):
+
+        """ Convert an lxml element, and all of its descendant elements, into Nodes. Attributes are named as they are
+        on a BeautifulSoup Tag, prefix:name, and include the namespaces declared on the element as xmlns:prefix """
+
+        qname = etree.QName(element)
+        parent = element.getparent()
+        inherited = parent.nsmap if parent is not None else {}
+        attrs = dict()
+        for prefix, namespace in element.nsmap.items():
+            if inherited.get(prefix) != namespace:
+                attrs["xmlns:" + prefix if prefix else "xmlns"] = namespace
+        prefixes = dict((namespace, prefix) for prefix, namespace in element.nsmap.items())
+        for key, value in element.attrib.items():
+            name = etree.QName(key)
+            prefix = prefixes.get(name.namespace) if name.namespace else None
+            attrs[prefix + ":" + name.localname if prefix else name.localname] = value
+        node = cls(qname.localname, attrs, qname.namespace, element.prefix)
+        strings = [element.text or ""]
+        for child in element:
+            # Comments and processing instructions are skipped, but not the text that follows them
+            if isinstance(child.tag, str):
+                node.contents.append(cls.from_element(child))
+            strings.append(child.tail or "")
+        string = "".join(strings)
+        if string.strip():
+            node.string = string
+        return node
+
+    def __getstate__(self):
+        return self.name, self.prefix, self.namespace, self.attrs, self.contents, self.string
+
+    def __setstate__(self, state):
+        self.name, self.prefix, self.namespace, self.attrs, self.contents, self.string = state
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    def __setitem__(self, key, value):
+        self.attrs[key] = value
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    @property
+    def children(self):
+        return iter(self.contents)
+
+    @property
+    def text(self) -> str:
+        """ The text of this Node and all of its descendants, like Tag.text """
+        return self.string + "".join(child.text for child in self.contents)
+
+    def _matches(self, name, attrs) -> bool:
+        if name and name != self.name and name != "{0}:{1}".format(self.prefix, self.name):
+            return False
+        for key, value in attrs.items():
+            if self.attrs.get(key) != value:
+                return False
+        return True
+
+    def find_all(self, name=None, attrs=None, recursive=True) -> list:
+
+        """ Return all descendant Nodes (or only children, if recursive is False) matching the tag name and
+        attribute values provided, in document order """
+
+        attrs = attrs or {}
+        results = list()
+        stack = list(reversed(self.contents))
+        while stack:
+            node = stack.pop()
+            if node._matches(name, attrs):
+                results.append(node)
+            if recursive:
+                stack.extend(reversed(node.contents))
+        return results
+
+    __call__ = find_all
+
+    def _render(self, indent=None, depth=0) -> str:
+        name = self.name if not self.prefix else "{0}:{1}".format(self.prefix, self.name)
+        attrs = "".join(" {0}={1}".format(key, quoteattr(str(value))) for key, value in self.attrs.items())
+        pad = "" if indent is None else indent * depth
+        end = "" if indent is None else "\n"
+        if not self.contents:
+            if self.string:
+                return "{0}<{1}{2}>{3}</{1}>{4}".format(pad, name, attrs, escape(self.string), end)
+            return "{0}<{1}{2}/>{3}".format(pad, name, attrs, end)
+        inner = "".join(child._render(indent, depth + 1) for child in self.contents)
+        return "{0}<{1}{2}>{5}{3}{0}</{1}>{4}".format(pad, name, attrs, inner, end, end)
+
+    def prettify(self) -> str:
+        return self._render(" ")
+
+    def __str__(self):
+        return self._render()
+
+    def __repr__(self):
+        return "<Node {0}>".format(self.name)
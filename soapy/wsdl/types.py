@@ -4,6 +4,7 @@
  correct XML elements"""
 
 import logging
+from types import MappingProxyType
 
 from soapy.wsdl.element import Element
 
@@ -27,7 +28,7 @@ class TypeBase(Element):
         parent should be the Element being updated. It will be passed to all children recursively to receive all
         their updates. If not provided, it will assume the element calling update is the parent. """
 
-    def _process_element_children(self, parents=list()) -> tuple:
+    def _process_element_children(self) -> tuple:
 
         # First, process any child updates specified by TypeContainer Children
 
@@ -35,23 +36,23 @@ class TypeBase(Element):
         try:
             c_update = self.update_child_elements()
             if c_update:
-                logger.info("Found update item(s) for Children: {0}".format(c_update))
+                logger.info("Found update item(s) for Children: %s", c_update)
                 child_updates.update(c_update)
         except AttributeError:
             """ Do nothing, we are in a TypeElement object """
 
-        # Next, Extend the list of children with each child's element children
+        # Next, Extend the list of children with each child's element children. Type nodes are shared by every
+        # element that references them, so the result can't depend on the path that reached this node: recursive
+        # types are left to the consumers (inputs.Factory and marshal.Template), which stop at their own ancestors
 
         children = list()
         for each in self.children:
             if isinstance(each, TypeElement):
-                if each.bs_element not in parents:
-                    children.append(each)
+                children.append(each)
             elif each is None:
                 continue
             else:
-                parents.append(self.bs_element)
-                children.extend(each._process_element_children(parents))
+                children.extend(each.element_children)
 
         # Lastly, apply all child updates to each child element
 
@@ -59,7 +60,7 @@ class TypeBase(Element):
             logger.debug("Processing all parent-induced updates for all children")
             for child in children:
                 for attr, value in child_updates.items():
-                    child.bs_element[attr] = value
+                    child.override(attr, value)
         self.__element_children = tuple(children)
         logger.debug("All TypeElement children identified")
         return self.__element_children
@@ -68,7 +69,7 @@ class TypeBase(Element):
     def element_children(self) -> tuple:
         if self.__element_children is None:
             logger.debug("In recursive process of isolating and updating TypeElement children")
-            self._process_element_children([self.bs_element])
+            self._process_element_children()
         return self.__element_children
 
 
@@ -81,7 +82,13 @@ class TypeContainer(TypeBase):
         self.__parent_attributes = None
 
     def update(self, parent=None, parent_updates=dict()):
-        parent_updates.update(self.update_parent_element(parent))
+        """ Merge the updates of this container, and of the containers inside it, into parent_updates. List values
+        (like enumerations) are accumulated, others replaced """
+        for key, value in self.update_parent_element(parent).items():
+            if isinstance(value, list):
+                parent_updates.setdefault(key, []).extend(value)
+            else:
+                parent_updates[key] = value
         for child in self.children:
             if isinstance(child, TypeContainer):
                 child.update(parent, parent_updates)
@@ -91,12 +98,12 @@ class TypeContainer(TypeBase):
         """ Returns the attributes defined within this tag, and any non-element children """
         if self.__parent_attributes is None:
             attrs = list()
-            logger.debug("In recursive process of consolidating attributes. Current object is '{0}' the {1}"
-                         .format(self.name, self.tag))
+            logger.debug("In recursive process of consolidating attributes. Current object is '%s' the %s",
+                         self.name, self.tag)
             attributes = self.bs_element('attribute', recursive=False)
             for attribute in attributes:
                 attr = Attribute(attribute, self.parent)
-                logger.debug("Created attribute {0}".format(attr))
+                logger.debug("Created attribute %s", attr)
                 attrs.append(attr)
             for child in self.children:
                 try:
@@ -130,27 +137,46 @@ class TypeElement(TypeBase):
     def __init__(self, bs_element, wsdl, schema=None, is_local=True):
         super().__init__(bs_element, wsdl, schema, is_local)
 
+        # Attribute values that replace those of the tag, e.g. minOccurs for the elements of a choice
+        self.__overrides = dict()
         # Attributes that are evaluated lazy
         self.__attributes = None
         self.__children = None
+        self.__facets = None
+
+    def update(self, parent=None, updates=None):
+        """ update for an Element means take the returned, consolidated values of children (the enumerations and
+        documentation of its type) and keep them as the facets of this element. This is done once, the first time the
+        facets are used, and never changes the parsed document, so calling it again does nothing """
+        if self.__facets is None:
+            facets = dict()
+            for child in self.children:
+                if isinstance(child, TypeContainer):
+                    child.update(self, facets)
+            logger.debug("Updating %s with attributes from child elements: %s", self.name, facets)
+            self.__facets = MappingProxyType(dict((key, tuple(value) if isinstance(value, list) else value)
+                                                  for key, value in facets.items()))
 
-    def update(self, parent=None, updates=dict()):
-        """ update for an Element means take the returned, consolidated values of children and apply them to self """
-        updates = dict()
-        for child in self.children:
-            if isinstance(child, TypeContainer):
-                child.update(self, updates)
-        logger.debug("Updating {} with attributes from child elements: {}".format(self.name, updates))
-        for key, value in updates.items():
-            try:
-                self.bs_element[key].append(value)
-            except (AttributeError, KeyError):
-                self.bs_element[key] = value
+    @property
+    def facets(self):
+        """ The read-only mapping of the consolidated facets of the element, e.g. "enum_hint" and "docstring" """
+        self.update()
+        return self.__facets
+
+    def override(self, attr, value) -> None:
+        """ Replace the value of an attribute of the element's tag (e.g. "minOccurs"), without changing the tag """
+        self.__overrides[attr] = value
+
+    def _get(self, attr, default):
+        try:
+            return self.__overrides[attr]
+        except KeyError:
+            return self.bs_element.get(attr, default)
 
     @property
     def attributes(self) -> tuple:
         if self.__attributes is None:
-            logger.debug("Initializing list of attributes for element {0}".format(self.name))
+            logger.debug("Initializing list of attributes for element %s", self.name)
             attributes = self.bs_element('attribute', recursive=False)
             for attribute in attributes:
                 attributes.append(Attribute(attribute, self.parent))
@@ -164,11 +190,11 @@ class TypeElement(TypeBase):
 
     @property
     def nillable(self) -> str:
-        return self.bs_element.get("nillable", "false")
+        return self._get("nillable", "false")
 
     @property
     def max_occurs(self) -> str:
-        return self.bs_element.get("maxOccurs", "1")
+        return self._get("maxOccurs", "1")
 
     @property
     def min_occurs(self) -> str:
@@ -177,22 +203,23 @@ class TypeElement(TypeBase):
         not appear at all in the rendered envelope -- however, some services use self-closing tags to identify which
         elements to return, so you may need an empty tag to appear, even if it's set to min_occurs=0. For this reason,
         you can override the behavior by setting min_occurs to 1 """
-        try:
-            return self.__min_occurs
-        except AttributeError:
-            return self.bs_element.get("minOccurs", "1")
+        return self._get("minOccurs", "1")
 
     @min_occurs.setter
     def min_occurs(self, value):
-        self.__min_occurs = str(value)
+        self.override("minOccurs", str(value))
 
     @property
     def form(self) -> str:
-        return self.bs_element.get("form", "qualified")
+        return self._get("form", "qualified")
 
     @property
     def enums(self) -> tuple:
-        return tuple(self.bs_element.get("enum_hint", []))
+        return self.facets.get("enum_hint", ())
+
+    @property
+    def docstring(self) -> str:
+        return self.facets.get("docstring", "")
 
     @property
     def type(self) -> str:
@@ -208,10 +235,11 @@ class TypeElement(TypeBase):
         if self.__children is None:
             children = list(super().children)
             if self.type:
-                soft_child = self.parent.find_type_by_name(self.type, self.schema.name)
+                # The type is shared by every element of that type. For a recursive type, this makes the type graph
+                # cyclic; see soapy.inputs.Factory for how that is traversed
+                soft_child = self.parent.find_type_by_name(self.type, self.schema.name, self.parent.type_kinds)
                 if soft_child is not None:
-                    if self.bs_element.counter < 2:
-                        children.append(soft_child)
+                    children.append(soft_child)
             self.__children = tuple(children)
         return self.__children
 
@@ -266,7 +294,7 @@ class Extension(TypeContainer):
         children = list()
         try:
             # Add children for each element in the base type, specified in the Extension tag
-            child = self.parent.find_type_by_name(self.bs_element['base'])
+            child = self.parent.find_type_by_name(self.bs_element['base'], kinds=self.parent.type_kinds)
             children.append(child)
         except KeyError:
             pass
@@ -297,15 +325,22 @@ class Restriction(TypeContainer):
 
     @property
     def children(self) -> tuple:
-        logger.debug("Adding base child of Restriction type '{}'".format(self.name))
+        logger.debug("Adding base child of Restriction type '%s'", self.name)
         children = list()
         try:
-            child = self.parent.find_type_by_name(self.bs_element['base'])
+            child = self.parent.find_type_by_name(self.bs_element['base'], kinds=self.parent.type_kinds)
             children.append(child)
         except KeyError:
             pass
         return tuple(children)
 
+    def update(self, parent=None, parent_updates=dict()):
+        """ The facets of a restriction (its enumerations) are its own tags, which aren't among its children """
+        super().update(parent, parent_updates)
+        for child in Element.children.fget(self):
+            if isinstance(child, TypeContainer):
+                child.update(parent, parent_updates)
+
 
 class Choice(TypeContainer):
     """ Class representing a tag containing a choice of Elements. May need to update to provide choice hints to